@@ -0,0 +1,245 @@
+"""SSH Config Studio: the GTK application."""
+
+import sys
+import time
+import threading
+from concurrent.futures import Future
+import gi
+import logging
+from gettext import gettext as _
+import gettext
+
+import os
+
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import Gtk, Gio, GLib, Gdk, Adw
+
+try:
+    from ssh_config_studio.resource_cache import ResourceLocations, GRESOURCE, CSS
+except ImportError:
+    from resource_cache import ResourceLocations, GRESOURCE, CSS
+
+# Keep in step with meson.build; cached resource locations are only reused by the same version
+VERSION = "1.1.0"
+
+class SSHConfigStudioApp(Adw.Application):
+    def __init__(self, started_at: float = None):
+        super().__init__(
+            application_id="com.sshconfigstudio.app",
+            flags=Gio.ApplicationFlags.FLAGS_NONE
+        )
+        
+        self.parser = None
+        # Resolves to the parsed SSHConfig; the window waits on it instead of parsing again
+        self.parse_future = None
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.main_window = None
+        # Opt-in pool of ssh master connections used by connection tests
+        self.control_pool = None
+        self._resource_locations = None
+        self._resource_registered = False
+        
+    def do_activate(self):
+        try:
+            from ssh_config_studio.ui.main_window import MainWindow
+        except ImportError:
+            from ui.main_window import MainWindow
+        
+        if not self.main_window:
+            self.main_window = MainWindow(self)
+            self.main_window.present()
+        else:
+            self.main_window.present()
+    
+    def do_startup(self):
+        Adw.Application.do_startup(self)
+
+        # Start parsing first so it overlaps with resource and CSS loading
+        try:
+            from ssh_config_studio.ssh_config_parser import SSHConfigParser
+        except ImportError:
+            from ssh_config_parser import SSHConfigParser
+        self.parser = SSHConfigParser()
+        self.parse_future = self._start_parse()
+
+        try:
+            locale_dir = os.path.join(GLib.get_user_data_dir(), 'locale')
+            gettext.bindtextdomain('ssh-config-studio', locale_dir)
+            gettext.textdomain('ssh-config-studio')
+        except Exception:
+            pass
+
+        self._resource_locations = ResourceLocations(VERSION, os.path.dirname(os.path.abspath(__file__)))
+        self._resource_registered = self._register_resources()
+        self._load_css_styles()
+        self._add_actions()
+
+    def do_shutdown(self):
+        if self.control_pool is not None:
+            self.control_pool.close()
+            self.control_pool = None
+        # The runner only exists if a probe ran; do not import it just to find that out
+        probe_runner = sys.modules.get("ssh_config_studio.probe_runner") or sys.modules.get("probe_runner")
+        if probe_runner is not None:
+            probe_runner.ProbeRunner.shutdown_default()
+        Adw.Application.do_shutdown(self)
+
+    def _start_parse(self) -> Future:
+        """Parse the config on a worker thread; the future holds the SSHConfig or the error."""
+        future = Future()
+        parser = self.parser
+
+        def run():
+            started = time.perf_counter()
+            try:
+                config = parser.parse(use_cache=True)
+            except Exception as e:
+                logging.error(f"Failed to parse SSH config: {e}")
+                future.set_exception(e)
+                return
+            logging.info(f"Parsed SSH config in {(time.perf_counter() - started) * 1000:.1f} ms")
+            future.set_result(config)
+
+        threading.Thread(target=run, name="config-parse", daemon=True).start()
+        return future
+    
+    def _add_actions(self):
+        search_action = Gio.SimpleAction.new("search", None)
+        search_action.connect("activate", self._on_search_action)
+        self.add_action(search_action)
+
+        add_host_action = Gio.SimpleAction.new("add-host", None)
+        add_host_action.connect("activate", self._on_add_host_action)
+        self.add_action(add_host_action)
+
+        reload_action = Gio.SimpleAction.new("reload", None)
+        reload_action.connect("activate", self._on_reload_action)
+        self.add_action(reload_action)
+    
+    def _on_search_action(self, action, param):
+        if self.main_window:
+            self.main_window._toggle_search()
+    
+    def _on_add_host_action(self, action, param):
+        if self.main_window and self.main_window.host_list:
+            self.main_window.host_list.add_host()
+    
+    
+    def _on_reload_action(self, action, param):
+        if self.main_window:
+            self.main_window.reload_config()
+    
+    def _register_resources(self) -> bool:
+        """Register the GResource bundle; the install locations are only probed when the recorded one is gone."""
+        if os.getenv('FLATPAK_ID'):
+            return self._register_resource_file('/app/share/com.sshconfigstudio.app/ssh-config-studio-resources.gresource')
+
+        cached = self._resource_locations.get(GRESOURCE)
+        if cached is not None and self._register_resource_file(cached):
+            return True
+        resource_candidates = [
+            os.path.join(GLib.get_user_data_dir(), 'com.sshconfigstudio.app', 'ssh-config-studio-resources.gresource'),
+            os.path.join(GLib.get_user_data_dir(), 'ssh-config-studio-resources.gresource'),
+            '/app/share/com.sshconfigstudio.app/ssh-config-studio-resources.gresource',
+            '/app/share/ssh-config-studio-resources.gresource',
+            os.path.join(GLib.get_home_dir(), '.local', 'share', 'com.sshconfigstudio.app', 'ssh-config-studio-resources.gresource'),
+            'data/ssh-config-studio-resources.gresource',
+        ]
+        for candidate in resource_candidates:
+            if os.path.abspath(candidate) == cached or not os.path.exists(candidate):
+                continue
+            if self._register_resource_file(candidate):
+                self._resource_locations.put(GRESOURCE, candidate)
+                return True
+        self._resource_locations.put(GRESOURCE, None)
+        return False
+
+    @staticmethod
+    def _register_resource_file(path: str) -> bool:
+        try:
+            resource = Gio.Resource.load(path)
+            Gio.resources_register(resource)
+        except Exception:
+            return False
+        logging.info(f"Registered GResource from: {path}")
+        return True
+
+    def _load_css_styles(self):
+        if self._resource_registered:
+            try:
+                css_provider = Gtk.CssProvider()
+                css_provider.load_from_resource('/com/sshconfigstudio/app/ssh-config-studio.css')
+                self._add_css_provider(css_provider)
+                logging.info("Loaded CSS styles from GResource bundle")
+                return
+            except Exception as e:
+                logging.warning(f"Failed to load CSS from GResource: {e}")
+        if os.getenv('FLATPAK_ID'):
+            return
+
+        # Without the bundle, look for the stylesheet next to where it would be installed
+        cached = self._resource_locations.get(CSS)
+        if cached is not None and self._load_css_file(cached):
+            return
+        css_candidates = [
+            os.path.join(GLib.get_user_data_dir(), 'com.sshconfigstudio.app', 'ssh-config-studio.css'),
+            os.path.join(GLib.get_user_data_dir(), 'ssh-config-studio.css'),
+            '/app/share/com.sshconfigstudio.app/ssh-config-studio.css',
+            '/app/share/ssh-config-studio.css',
+            os.path.join(GLib.get_home_dir(), '.local', 'share', 'com.sshconfigstudio.app', 'ssh-config-studio.css'),
+            'data/ssh-config-studio.css',
+        ]
+        for candidate in css_candidates:
+            if os.path.abspath(candidate) == cached or not os.path.exists(candidate):
+                continue
+            if self._load_css_file(candidate):
+                self._resource_locations.put(CSS, candidate)
+                return
+        self._resource_locations.put(CSS, None)
+
+    def _load_css_file(self, path: str) -> bool:
+        try:
+            css_provider = Gtk.CssProvider()
+            css_provider.load_from_path(path)
+            self._add_css_provider(css_provider)
+        except Exception as e:
+            logging.warning(f"Failed to load CSS from {path}: {e}")
+            return False
+        logging.info(f"Loaded CSS styles from: {path}")
+        return True
+
+    @staticmethod
+    def _add_css_provider(css_provider):
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(),
+            css_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+        )
+    
+    def _show_error_dialog(self, title: str, message: str):
+        dialog = Gtk.MessageDialog(
+            transient_for=self.main_window,
+            message_type=Gtk.MessageType.ERROR,
+            buttons=Gtk.ButtonsType.OK,
+            text=title,
+            secondary_text=message
+        )
+        dialog.connect("response", lambda d, r: d.destroy())
+        dialog.present()
+
+    def _show_error(self, message: str):
+        """Displays an error message to the user, typically from HostEditor or other components."""
+        logging.error(f"Application Error: {message}")
+        self._show_error_dialog(_("Error"), message)
+
+    def _show_toast(self, message: str):
+        """Displays a transient toast message to the user."""
+        logging.info(f"Toast: {message}")
+        if self.main_window and hasattr(self.main_window, "show_toast"):
+            try:
+                self.main_window.show_toast(message)
+                return
+            except Exception:
+                pass
+        self._show_error_dialog(_("Info"), message)
@@ -0,0 +1,100 @@
+"""Edits applied to many hosts at once."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+from typing import Iterable, List
+
+try:
+    from ssh_config_studio.ssh_config_parser import SSHHost
+except ImportError:
+    from ssh_config_parser import SSHHost
+
+SET_OPTION = "set"
+REPLACE_VALUE = "replace"
+REMOVE_OPTION = "remove"
+RENAME_PATTERN = "rename"
+
+# Actions in the order they appear in the bulk edit dialog
+ACTIONS = (SET_OPTION, REPLACE_VALUE, REMOVE_OPTION, RENAME_PATTERN)
+
+
+@dataclass(frozen=True)
+class BulkEdit:
+    """One edit for a set of hosts.
+
+    SET_OPTION sets key to value. REPLACE_VALUE substitutes the regular
+    expression pattern with replacement inside the values of key.
+    REMOVE_OPTION drops every occurrence of key. RENAME_PATTERN substitutes
+    pattern with replacement inside each Host pattern.
+    """
+    action: str
+    key: str = ""
+    value: str = ""
+    pattern: str = ""
+    replacement: str = ""
+
+    def validate(self) -> None:
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unknown bulk action: {self.action}")
+        if self.action != RENAME_PATTERN and not self.key.strip():
+            raise ValueError("Option name is required")
+        if self.action == SET_OPTION and not self.value.strip():
+            raise ValueError("Option value is required")
+        if self.action in (REPLACE_VALUE, RENAME_PATTERN):
+            try:
+                regex = re.compile(self.pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {e}") from e
+            # The template is parsed up front, so bad group references or escapes fail here
+            try:
+                regex.sub(self.replacement, "")
+            except (re.error, IndexError) as e:
+                raise ValueError(f"Invalid replacement: {e}") from e
+
+
+def _replace_values(host: SSHHost, key: str, regex, replacement: str) -> bool:
+    changed = False
+    for index, opt in enumerate(host.options):
+        if opt.key.lower() != key:
+            continue
+        value = regex.sub(replacement, opt.value)
+        if value != opt.value:
+            host.options[index] = replace(opt, value=value)
+            changed = True
+    return changed
+
+
+def apply_bulk_edit(hosts: Iterable[SSHHost], edit: BulkEdit) -> List[SSHHost]:
+    """Apply edit to every host and return the hosts that actually changed.
+
+    The edit is validated and its expression compiled once, before any host
+    is touched, so an invalid edit leaves every host as it was.
+    """
+    edit.validate()
+    key = edit.key.strip()
+    regex = re.compile(edit.pattern) if edit.action in (REPLACE_VALUE, RENAME_PATTERN) else None
+
+    changed: List[SSHHost] = []
+    for host in hosts:
+        if edit.action == SET_OPTION:
+            before = host.get_option(key)
+            host.set_option(key, edit.value.strip())
+            modified = before != edit.value.strip()
+        elif edit.action == REPLACE_VALUE:
+            modified = _replace_values(host, key.lower(), regex, edit.replacement)
+        elif edit.action == REMOVE_OPTION:
+            kept = [opt for opt in host.options if opt.key.lower() != key.lower()]
+            modified = len(kept) != len(host.options)
+            if modified:
+                host.options = kept
+        else:
+            patterns = [regex.sub(edit.replacement, pattern) for pattern in host.patterns]
+            patterns = [pattern for pattern in patterns if pattern]
+            modified = bool(patterns) and patterns != host.patterns
+            if modified:
+                host.patterns = patterns
+        if modified:
+            changed.append(host)
+    return changed
@@ -0,0 +1,227 @@
+"""Command line interface to SSH config files, for scripts.
+
+It is built on the parser alone and never imports GTK. Results are
+written to stdout as JSON objects, one per line; problems go to stderr
+the same way, as {"error": ...}, and {"warning": ...} for problems that do
+not stop a command, such as unknown keywords. Exit status is 0 on success,
+1 when the command failed (unknown host, invalid value, validation errors,
+fmt --check finding changes) and 2 on usage errors. set and rm only rewrite
+the lines of the hosts they change, and fmt only changes whitespace, so
+comments and Include lines stay where they are.
+
+    ssh-config-studio list ['web-*']
+    ssh-config-studio get web [HostName ...]
+    ssh-config-studio set web HostName 10.0.0.5 User deploy
+    ssh-config-studio rm web [IdentityFile ...]
+    ssh-config-studio validate
+    ssh-config-studio resolve web.example.com
+    ssh-config-studio fmt [--check]
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from ssh_config_studio.ssh_config_parser import SSHConfigParser, SSHHost
+    from ssh_config_studio.ssh_keywords import lookup, validate_option
+except ImportError:
+    from ssh_config_parser import SSHConfigParser, SSHHost
+    from ssh_keywords import lookup, validate_option
+
+
+class CommandError(Exception):
+    """A command that cannot be carried out; reported on stderr with exit status 1."""
+
+
+def _emit(record: dict, stream=None) -> None:
+    stream = stream or sys.stdout
+    stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _host_record(host: SSHHost) -> dict:
+    return {
+        "patterns": host.patterns,
+        "options": [{"key": opt.key, "value": opt.value} for opt in host.options],
+    }
+
+
+def _load(args, for_write: bool = False) -> SSHConfigParser:
+    parser = SSHConfigParser(Path(args.config).expanduser() if args.config else None)
+    if not parser.config_path.exists():
+        if for_write:
+            return parser
+        raise CommandError(f"{parser.config_path} does not exist")
+    # The snapshot would be replaced right after a mutation, so only reads use it
+    parser.parse(use_cache=not for_write)
+    return parser
+
+
+def _find_host(parser: SSHConfigParser, alias: str) -> SSHHost:
+    host = parser.config.get_host(alias)
+    if host is None:
+        raise CommandError(f"no Host block with the alias {alias}")
+    return host
+
+
+def _save(parser: SSHConfigParser, args) -> None:
+    # Only the lines of the hosts a command touched are rewritten
+    parser.write_changes(backup=not args.no_backup)
+
+
+def cmd_list(args) -> int:
+    parser = _load(args)
+    for host in parser.config.hosts:
+        if args.pattern and not any(fnmatch.fnmatchcase(p, args.pattern) for p in host.patterns):
+            continue
+        _emit(_host_record(host))
+    return 0
+
+
+def cmd_get(args) -> int:
+    parser = _load(args)
+    host = _find_host(parser, args.host)
+    if not args.keys:
+        _emit(_host_record(host))
+        return 0
+    missing = False
+    for key in args.keys:
+        value = host.get_option(key)
+        missing = missing or value is None
+        _emit({"host": args.host, "key": key, "value": value})
+    return 1 if missing else 0
+
+
+def cmd_set(args) -> int:
+    if len(args.pairs) % 2:
+        raise CommandError("expected KEY VALUE pairs")
+    pairs = list(zip(args.pairs[0::2], args.pairs[1::2]))
+    for key, value in pairs:
+        if lookup(key) is None:
+            _emit({"warning": f"Unknown option {key}"}, sys.stderr)
+        error = validate_option(key, value)
+        if error and not args.force:
+            raise CommandError(error)
+    parser = _load(args, for_write=True)
+    host = parser.config.get_host(args.host)
+    if host is None:
+        host = SSHHost(patterns=[args.host], raw_lines=[f"Host {args.host}"])
+        parser.config.add_host(host)
+    for key, value in pairs:
+        host.set_option(key, value)
+    _save(parser, args)
+    _emit(_host_record(host))
+    return 0
+
+
+def cmd_rm(args) -> int:
+    parser = _load(args, for_write=True)
+    host = _find_host(parser, args.host)
+    if args.keys:
+        records = [{"host": args.host, "key": key, "removed": host.remove_option(key)} for key in args.keys]
+    else:
+        parser.config.remove_host(host)
+        records = [{"host": args.host, "removed": True}]
+    _save(parser, args)
+    for record in records:
+        _emit(record)
+    return 0
+
+
+def cmd_validate(args) -> int:
+    parser = _load(args)
+    errors = parser.validate()
+    for error in errors:
+        _emit({"error": error})
+    for warning in parser.warnings():
+        _emit({"warning": warning})
+    return 1 if errors else 0
+
+
+def cmd_resolve(args) -> int:
+    parser = _load(args)
+    for opt, host in parser.config.resolve(args.host):
+        _emit({
+            "key": opt.key,
+            "value": opt.value,
+            "host": " ".join(host.patterns) if host is not None else None,
+        })
+    return 0
+
+
+def cmd_fmt(args) -> int:
+    parser = _load(args)
+    content = parser.formatted()
+    with parser.config_path.open("r", encoding="utf-8") as f:
+        changed = f.read() != content
+    if changed and not args.check:
+        parser.write_formatted(backup=not args.no_backup)
+    _emit({"path": str(parser.config_path), "changed": changed})
+    return 1 if changed and args.check else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", metavar="PATH", help="config file (default: ~/.ssh/config)")
+    writes = argparse.ArgumentParser(add_help=False)
+    writes.add_argument("--no-backup", action="store_true", help="do not back up the file before writing")
+
+    parser = argparse.ArgumentParser(
+        prog="ssh-config-studio",
+        description="Inspect and edit SSH config files; prints JSON lines.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    sub = commands.add_parser("list", parents=[common], help="list host blocks")
+    sub.add_argument("pattern", nargs="?", help="only hosts with a pattern matching this glob")
+    sub.set_defaults(run=cmd_list)
+
+    sub = commands.add_parser("get", parents=[common], help="show a host block or some of its options")
+    sub.add_argument("host")
+    # An explicit default keeps argparse from listing KEY as required when host is missing
+    sub.add_argument("keys", nargs="*", metavar="KEY", default=[])
+    sub.set_defaults(run=cmd_get)
+
+    sub = commands.add_parser("set", parents=[common, writes], help="set options, adding the host if needed")
+    sub.add_argument("host")
+    sub.add_argument("pairs", nargs="+", metavar="KEY VALUE")
+    sub.add_argument("--force", action="store_true", help="write values that fail validation")
+    sub.set_defaults(run=cmd_set)
+
+    sub = commands.add_parser("rm", parents=[common, writes], help="remove a host block or some of its options")
+    sub.add_argument("host")
+    sub.add_argument("keys", nargs="*", metavar="KEY", default=[])
+    sub.set_defaults(run=cmd_rm)
+
+    sub = commands.add_parser("validate", parents=[common], help="report problems in the config")
+    sub.set_defaults(run=cmd_validate)
+
+    sub = commands.add_parser("resolve", parents=[common], help="options ssh would use for a host name")
+    sub.add_argument("host")
+    sub.set_defaults(run=cmd_resolve)
+
+    sub = commands.add_parser("fmt", parents=[common, writes], help="normalize whitespace and indentation")
+    sub.add_argument("--check", action="store_true", help="only report whether it would change")
+    sub.set_defaults(run=cmd_fmt)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except CommandError as e:
+        _emit({"error": str(e)}, sys.stderr)
+        return 1
+    except OSError as e:
+        _emit({"error": f"{e.filename or args.command}: {e.strerror or e}"}, sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Prefix tries for completing keywords, host aliases, hostnames and identity files."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from ssh_config_studio.ssh_keywords import keyword_names
+except ImportError:
+    from ssh_keywords import keyword_names
+
+KEYWORDS = "keywords"
+ALIASES = "aliases"
+HOSTNAMES = "hostnames"
+IDENTITIES = "identities"
+
+
+class _Node:
+    __slots__ = ("children", "word", "count")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.word: Optional[str] = None
+        self.count = 0
+
+
+class PrefixTrie:
+    """Case-insensitive prefix trie over a multiset of words.
+
+    Each word carries a reference count so the same value contributed by
+    several hosts is stored once and only disappears when its last host
+    drops it. The original spelling of the first insertion is returned.
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root = _Node()
+        self._size = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word.lower())
+        return node is not None and node.count > 0
+
+    def add(self, word: str) -> None:
+        if not word:
+            return
+        node = self._root
+        for char in word.lower():
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+        if node.count == 0:
+            node.word = word
+            self._size += 1
+        node.count += 1
+
+    def remove(self, word: str) -> None:
+        if not word:
+            return
+        key = word.lower()
+        path: List[Tuple[_Node, str]] = []
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                return
+            path.append((node, char))
+            node = child
+        if node.count == 0:
+            return
+        node.count -= 1
+        if node.count:
+            return
+        node.word = None
+        self._size -= 1
+        # Prune the branch back up to the nearest node that is still in use
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.count or child.children:
+                break
+            del parent.children[char]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Return the first limit words starting with prefix, in case-insensitive order."""
+        node = self._find(prefix.lower())
+        if node is None:
+            return []
+        # A depth-first walk that visits a node before its children, and the
+        # children in key order, meets the words sorted, so it can stop at
+        # limit. Every leaf holds a word, so each descent ends in a result and
+        # the walk visits about limit * depth nodes however large the trie is
+        results: List[str] = []
+        stack = [node]
+        while stack and len(results) < limit:
+            current = stack.pop()
+            if current.count:
+                results.append(current.word)
+            stack.extend(current.children[char] for char in sorted(current.children, reverse=True))
+        return results
+
+    def _find(self, key: str) -> Optional[_Node]:
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+
+def _host_terms(host) -> Dict[str, Counter]:
+    terms = {ALIASES: Counter(), HOSTNAMES: Counter(), IDENTITIES: Counter()}
+    for pattern in host.patterns:
+        if not any(char in pattern for char in "*?!"):
+            terms[ALIASES][pattern] += 1
+    for opt in host.options:
+        key = opt.key.lower()
+        if key == "hostname":
+            terms[HOSTNAMES][opt.value] += 1
+        elif key == "identityfile":
+            terms[IDENTITIES][opt.value] += 1
+    return terms
+
+
+class CompletionIndex:
+    """Completion tries for a configuration, kept in step with host edits.
+
+    Hosts are tracked by identity. update_host only applies the difference
+    between the host's previous and current terms, so editing one host
+    never rebuilds the tries.
+    """
+
+    def __init__(self) -> None:
+        self._tries: Dict[str, PrefixTrie] = {
+            KEYWORDS: PrefixTrie(keyword_names()),
+            ALIASES: PrefixTrie(),
+            HOSTNAMES: PrefixTrie(),
+            IDENTITIES: PrefixTrie(),
+        }
+        self._terms: Dict[int, Dict[str, Counter]] = {}
+
+    def load(self, hosts: Iterable) -> None:
+        for kind in (ALIASES, HOSTNAMES, IDENTITIES):
+            self._tries[kind] = PrefixTrie()
+        self._terms.clear()
+        for host in hosts:
+            self.add_host(host)
+
+    def add_host(self, host) -> None:
+        if id(host) in self._terms:
+            self.update_host(host)
+            return
+        terms = _host_terms(host)
+        self._terms[id(host)] = terms
+        self._apply(terms, {})
+
+    def remove_host(self, host) -> None:
+        terms = self._terms.pop(id(host), None)
+        if terms is not None:
+            self._apply({}, terms)
+
+    def update_host(self, host) -> None:
+        old = self._terms.get(id(host))
+        if old is None:
+            self.add_host(host)
+            return
+        new = _host_terms(host)
+        self._terms[id(host)] = new
+        self._apply(new, old)
+
+    def complete(self, kind: str, prefix: str, limit: int = 10) -> List[str]:
+        return self._tries[kind].complete(prefix, limit)
+
+    def _apply(self, added: Dict[str, Counter], removed: Dict[str, Counter]) -> None:
+        for kind in (ALIASES, HOSTNAMES, IDENTITIES):
+            trie = self._tries[kind]
+            new = added.get(kind, Counter())
+            old = removed.get(kind, Counter())
+            for word, count in (old - new).items():
+                for _ in range(count):
+                    trie.remove(word)
+            for word, count in (new - old).items():
+                for _ in range(count):
+                    trie.add(word)
@@ -0,0 +1,107 @@
+"""On-disk snapshots of parsed configurations, reused while the files are unchanged."""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import logging
+import marshal
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot layout or the parser's output changes
+SNAPSHOT_VERSION = 1
+
+Fingerprint = Tuple[str, int, int, int]
+
+
+def app_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "ssh-config-studio"
+
+
+def cache_dir() -> Path:
+    return app_cache_dir() / "snapshots"
+
+
+def fingerprint(path: Path) -> Optional[Fingerprint]:
+    """Identity of a file's current contents: path, size, modification time and inode."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return str(path), st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def expand_includes(config_path: Path, directives: List[str]) -> List[str]:
+    """Files matched by the Include directives, in the order the parser reads them."""
+    paths = []
+    base_dir = config_path.parent
+    for pattern in directives:
+        expanded = os.path.expanduser(pattern)
+        if not os.path.isabs(expanded):
+            expanded = str(base_dir / expanded)
+        paths.extend(glob.glob(expanded, recursive=True))
+    return paths
+
+
+class SnapshotCache:
+    """Marshal snapshots of an SSHConfig, one file per config path.
+
+    A snapshot records the fingerprint of the config file and of every
+    included file, plus the list of files the Include globs matched. It is
+    used only when all of them still match, so an edited, replaced or newly
+    matching file sends the caller back to the parser.
+    """
+
+    def __init__(self, directory: Path = None):
+        self.directory = directory or cache_dir()
+
+    def _path_for(self, config_path: Path) -> Path:
+        key = hashlib.sha1(str(Path(config_path).resolve()).encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.snapshot"
+
+    def load(self, config_path: Path) -> Optional[dict]:
+        """The snapshot of config_path as stored by store(), or None when it is missing or stale."""
+        try:
+            # loads on the whole file is many times faster than load on the file object
+            with open(self._path_for(config_path), "rb") as f:
+                data = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return None
+        for recorded in data["fingerprints"]:
+            if fingerprint(Path(recorded[0])) != tuple(recorded):
+                return None
+        if expand_includes(Path(config_path), data["include_directives"]) != data["include_paths"]:
+            return None
+        return data
+
+    def store(self, config_path: Path, data: dict, include_paths: List[str],
+              main_fingerprint: Fingerprint = None) -> None:
+        """Write a snapshot; data holds the plain tuples and lists built by the parser.
+
+        main_fingerprint is the config file's fingerprint from before it was
+        read; when the file changed since, nothing is stored.
+        """
+        files = [Path(config_path)] + [Path(path) for path in include_paths]
+        fingerprints = [fingerprint(path) for path in files]
+        if any(entry is None for entry in fingerprints):
+            return
+        if main_fingerprint is not None and fingerprints[0] != main_fingerprint:
+            return
+        payload = dict(data, version=SNAPSHOT_VERSION, fingerprints=fingerprints, include_paths=include_paths)
+        target = self._path_for(config_path)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.directory), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(payload, f)
+            os.replace(tmp, target)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to write config snapshot: %s", e)
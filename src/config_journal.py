@@ -0,0 +1,280 @@
+"""Undo/redo journal of invertible edits to an SSH configuration."""
+
+from __future__ import annotations
+
+import itertools
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+# Generations are unique across configurations so a reload can never reuse one
+_generations = itertools.count(1)
+
+
+class Command:
+    """An invertible edit. apply() performs it, revert() undoes it.
+
+    Both cost O(size of the edit). structural is True when hosts are added
+    to or removed from the configuration rather than changed in place.
+    """
+    label = ""
+    structural = False
+
+    def hosts(self) -> list:
+        raise NotImplementedError
+
+    def apply(self, config) -> None:
+        raise NotImplementedError
+
+    def revert(self, config) -> None:
+        raise NotImplementedError
+
+    def absorb(self, other: "Command") -> bool:
+        """Extend this already applied command by other, which follows it; False if they cannot merge."""
+        return False
+
+
+class ReplaceHostState(Command):
+    """Swap a host between two snapshots; used for edits made outside the journal.
+
+    Snapshots share their frozen options with the host, so both directions
+    only copy references.
+    """
+    label = "Edit host"
+
+    def __init__(self, host, before, after):
+        self.host = host
+        self.before = before
+        self.after = after
+
+    def hosts(self) -> list:
+        return [self.host]
+
+    def apply(self, config) -> None:
+        self.host.restore(self.after)
+
+    def revert(self, config) -> None:
+        self.host.restore(self.before)
+
+    def absorb(self, other: Command) -> bool:
+        if not isinstance(other, ReplaceHostState) or other.host is not self.host:
+            return False
+        self.after = other.after
+        return True
+
+
+class ReplaceConfig(Command):
+    """Swap every host and global option at once; used when the whole file was parsed again.
+
+    The states hold the host objects themselves, so hosts edited before the
+    re-parse come back as they were and older journal entries still apply.
+    """
+    label = "Edit configuration"
+    structural = True
+
+    def __init__(self, before: tuple, after: tuple):
+        self.before = before
+        self.after = after
+
+    @staticmethod
+    def capture(config) -> tuple:
+        """The parts of config a re-parse replaces."""
+        return (list(config.hosts), list(config.global_options),
+                list(config.include_directives), dict(config.includes_resolved))
+
+    def hosts(self) -> list:
+        seen = {}
+        for host in self.before[0] + self.after[0]:
+            seen.setdefault(id(host), host)
+        return list(seen.values())
+
+    def _set(self, config, state: tuple) -> None:
+        # Filled in place because views hold the lists
+        hosts, global_options, include_directives, includes_resolved = state
+        config.hosts[:] = hosts
+        config.global_options[:] = global_options
+        config.include_directives[:] = include_directives
+        config.includes_resolved = dict(includes_resolved)
+
+    def apply(self, config) -> None:
+        self._set(config, self.after)
+
+    def revert(self, config) -> None:
+        self._set(config, self.before)
+
+    def absorb(self, other: Command) -> bool:
+        if not isinstance(other, ReplaceConfig):
+            return False
+        self.after = other.after
+        return True
+
+
+class AddHosts(Command):
+    label = "Add hosts"
+    structural = True
+
+    def __init__(self, hosts: list):
+        self.added = list(hosts)
+
+    def hosts(self) -> list:
+        return self.added
+
+    def apply(self, config) -> None:
+        config.add_hosts(self.added)
+
+    def revert(self, config) -> None:
+        count = len(self.added)
+        tail = config.hosts[-count:] if count else []
+        if len(tail) == count and all(a is b for a, b in zip(tail, self.added)):
+            del config.hosts[-count:]
+        else:
+            config.remove_hosts(self.added)
+
+
+class RemoveHosts(Command):
+    label = "Remove hosts"
+    structural = True
+
+    def __init__(self, hosts: list):
+        self.removed = list(hosts)
+        self.positions: List[Tuple[int, object]] = []
+
+    def hosts(self) -> list:
+        return self.removed
+
+    def apply(self, config) -> None:
+        wanted = {id(host) for host in self.removed}
+        self.positions = [(index, host) for index, host in enumerate(config.hosts) if id(host) in wanted]
+        config.remove_hosts(self.removed)
+
+    def revert(self, config) -> None:
+        # Ascending order puts each host back at the index it was removed from
+        for index, host in self.positions:
+            config.hosts.insert(index, host)
+
+
+class Batch(Command):
+    """Several commands undone and redone as one step, e.g. a bulk edit."""
+
+    def __init__(self, commands: List[Command], label: str = "Bulk edit"):
+        self.commands = list(commands)
+        self.label = label
+        self.structural = any(command.structural for command in self.commands)
+
+    def hosts(self) -> list:
+        seen = {}
+        for command in self.commands:
+            for host in command.hosts():
+                seen.setdefault(id(host), host)
+        return list(seen.values())
+
+    def apply(self, config) -> None:
+        for command in self.commands:
+            command.apply(config)
+
+    def revert(self, config) -> None:
+        for command in reversed(self.commands):
+            command.revert(config)
+
+
+class _Entry:
+    __slots__ = ("command", "generations", "recorded", "sealed")
+
+    def __init__(self, command: Command):
+        self.command = command
+        # (host, generation before, generation after) for every affected host
+        self.generations: List[Tuple[object, int, int]] = []
+        self.recorded = time.monotonic()
+        self.sealed = False
+
+
+class ConfigJournal:
+    """Undo and redo stacks of commands applied to one SSHConfig.
+
+    Every entry bumps the generation of the hosts it touches and remembers
+    the previous value; undo and redo put those generations back, so a host
+    undone to the state it was loaded in reports the generation it was
+    loaded with.
+    """
+
+    # Consecutive edits of the same host within this many seconds merge into one step
+    COALESCE_SECONDS = 1.0
+
+    def __init__(self, limit: int = 500):
+        self._undo: Deque[_Entry] = deque(maxlen=limit)
+        self._redo: List[_Entry] = []
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+
+    def seal(self) -> None:
+        """End coalescing; the next recorded edit starts a new undo step."""
+        if self._undo:
+            self._undo[-1].sealed = True
+
+    def execute(self, config, command: Command) -> Command:
+        """Apply command to config and record it."""
+        command.apply(config)
+        self._push(command)
+        return command
+
+    def record(self, command: Command, coalesce: bool = False) -> None:
+        """Record a command whose effect has already been applied.
+
+        With coalesce, a command the previous step can absorb, such as a
+        ReplaceHostState following one for the same host, extends that step
+        instead of adding a new one, so typing in a field undoes as a single
+        edit.
+        """
+        if coalesce and self._undo:
+            top = self._undo[-1]
+            if (not top.sealed and time.monotonic() - top.recorded < self.COALESCE_SECONDS
+                    and top.command.absorb(command)):
+                loaded = {id(host): before for host, before, _after in top.generations}
+                top.generations = []
+                for host in top.command.hosts():
+                    generation = next(_generations)
+                    top.generations.append((host, loaded.get(id(host), host.generation), generation))
+                    host.generation = generation
+                top.recorded = time.monotonic()
+                self._redo.clear()
+                return
+        self._push(command)
+
+    def undo(self, config) -> Optional[Command]:
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        entry.command.revert(config)
+        for host, before, _after in entry.generations:
+            host.generation = before
+        entry.sealed = True
+        self._redo.append(entry)
+        return entry.command
+
+    def redo(self, config) -> Optional[Command]:
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        entry.command.apply(config)
+        for host, _before, after in entry.generations:
+            host.generation = after
+        self._undo.append(entry)
+        return entry.command
+
+    def _push(self, command: Command) -> None:
+        entry = _Entry(command)
+        for host in command.hosts():
+            generation = next(_generations)
+            entry.generations.append((host, host.generation, generation))
+            host.generation = generation
+        self.seal()
+        self._undo.append(entry)
+        self._redo.clear()
@@ -0,0 +1,147 @@
+"""Shared ssh master connections for repeated connection tests."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:
+    from ssh_config_studio.probe_runner import PROBE_OPTIONS, ssh_destination, ssh_invocation
+except ImportError:
+    from probe_runner import PROBE_OPTIONS, ssh_destination, ssh_invocation
+
+logger = logging.getLogger(__name__)
+
+
+def control_socket_dir() -> Path:
+    """Directory for the master sockets, private to the app.
+
+    Inside Flatpak the sockets are created by the host's ssh, so they go to
+    the app's runtime directory, which the host and the sandbox share.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    flatpak_id = os.environ.get("FLATPAK_ID")
+    if flatpak_id:
+        return Path(runtime) / "app" / flatpak_id / "control"
+    return Path(runtime) / "ssh-config-studio" / "control"
+
+
+class ControlPool:
+    """Per-host master connections that repeated tests of a host go through.
+
+    ssh names each socket after a hash of the connection (%C), so every
+    host gets its own master, started by ensure_master() before the first
+    test and reused by the following ones. A master that stays unused for
+    idle_timeout seconds exits by itself; close() stops the rest.
+
+    Tests never start a master themselves: a master forked from a verbose
+    test would keep the test's stderr pipe open, and the test would only
+    end at its timeout. Masters are started detached, with no pipes, and
+    tests connect with ControlMaster=no, falling back to a connection of
+    their own when there is no master to use.
+    """
+
+    def __init__(self, idle_timeout: int = 300, directory: Path = None, ssh_binary: str = None):
+        self.idle_timeout = idle_timeout
+        self.directory = directory or control_socket_dir()
+        self.ssh_binary = ssh_binary
+        self.directory.mkdir(parents=True, exist_ok=True)
+        os.chmod(self.directory, 0o700)
+        # One master start at a time per destination, on the probe loop
+        self._starting: Dict[Tuple[str, ...], asyncio.Lock] = {}
+
+    def client_options(self) -> List[str]:
+        """ssh options that make a connection go through the host's master when there is one."""
+        return [
+            "-o", "ControlMaster=no",
+            "-o", f"ControlPath={self.directory}/%C",
+            "-o", "ControlPersist=no",
+        ]
+
+    def master_options(self) -> List[str]:
+        """ssh options for a master that listens on the host's socket until idle_timeout."""
+        return [
+            "-o", "ControlMaster=yes",
+            "-o", f"ControlPath={self.directory}/%C",
+            "-o", f"ControlPersist={self.idle_timeout}",
+        ]
+
+    async def ensure_master(self, host, timeout: float = 20.0) -> bool:
+        """Start a master for host unless one is running; whether one is running afterwards.
+
+        The master authenticates in the foreground and then forks into the
+        background, so this returns once the connection is up or has failed.
+        """
+        destination = ssh_destination(host)
+        if destination is None:
+            return False
+        lock = self._starting.setdefault(tuple(destination), asyncio.Lock())
+        async with lock:
+            check = [*ssh_invocation(self.ssh_binary), "-o", f"ControlPath={self.directory}/%C",
+                     "-O", "check", *destination]
+            if await self._run_detached(check, timeout) == 0:
+                return True
+            start = [*ssh_invocation(self.ssh_binary), "-q", "-N", "-f", *PROBE_OPTIONS,
+                     *self.master_options(), *destination]
+            return await self._run_detached(start, timeout) == 0
+
+    async def _run_detached(self, command: List[str], timeout: float) -> int:
+        """Run command with no pipes in a session of its own; its exit status, or -1."""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as e:
+            logger.warning("Failed to run %s: %s", command[0], e)
+            return -1
+        try:
+            return await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            return -1
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+    @staticmethod
+    async def _kill(process) -> None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+    def sockets(self) -> List[Path]:
+        try:
+            return [path for path in self.directory.iterdir() if path.is_socket()]
+        except FileNotFoundError:
+            return []
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Ask every master to exit and remove the socket directory."""
+        processes = []
+        for socket_path in self.sockets():
+            # With a literal ControlPath the destination is only a placeholder
+            command = [*ssh_invocation(self.ssh_binary), "-o", f"ControlPath={socket_path}", "-O", "exit", "master"]
+            try:
+                processes.append(subprocess.Popen(
+                    command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                ))
+            except OSError as e:
+                logger.warning("Failed to stop ssh master %s: %s", socket_path, e)
+        for process in processes:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,101 @@
+"""Cache of HostName resolutions, filled asynchronously from a thread pool."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+
+def is_ip_address(name: str) -> bool:
+    try:
+        ipaddress.ip_address(name.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class Resolution:
+    hostname: str
+    addresses: Tuple[str, ...] = ()
+    error: str = ""
+    resolved_at: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.addresses)
+
+
+class DnsCache:
+    """Resolutions by hostname, kept ttl seconds, or negative_ttl seconds for failures.
+
+    getaddrinfo does not report the TTL of the records it returns, so fixed
+    lifetimes stand in for them. Lookups are blocking calls and run on a
+    small thread pool; concurrent resolve() calls for one name share a
+    single lookup. lookup() may be called from any thread, resolve() only
+    from the loop it is awaited on.
+    """
+
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 30.0, workers: int = 8,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dns")
+        self._results: Dict[str, Resolution] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, hostname: str) -> Optional[Resolution]:
+        """The cached resolution of hostname while it is fresh, without resolving."""
+        key = hostname.lower()
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                return None
+            lifetime = self.ttl if result.ok else self.negative_ttl
+            if self._clock() - result.resolved_at >= lifetime:
+                del self._results[key]
+                return None
+            return result
+
+    async def resolve(self, hostname: str) -> Resolution:
+        if is_ip_address(hostname):
+            return Resolution(hostname, (hostname.strip("[]"),), resolved_at=self._clock())
+        cached = self.lookup(hostname)
+        if cached is not None:
+            return cached
+        key = hostname.lower()
+        pending = self._inflight.get(key)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(self._executor, self._getaddrinfo, hostname)
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the lookup for the others
+        return await asyncio.shield(pending)
+
+    def _getaddrinfo(self, hostname: str) -> Resolution:
+        try:
+            infos = socket.getaddrinfo(hostname, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError) as e:
+            result = Resolution(hostname, error=str(e.args[-1] if e.args else e), resolved_at=self._clock())
+        else:
+            addresses = tuple(dict.fromkeys(info[4][0] for info in infos))
+            result = Resolution(hostname, addresses, resolved_at=self._clock())
+        with self._lock:
+            self._results[hostname.lower()] = result
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
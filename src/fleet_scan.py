@@ -0,0 +1,166 @@
+"""Reachability scans of many hosts at once, with a cache of recent results."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from ssh_config_studio.probe_runner import ProbeRunner, build_ssh_test_command, ssh_destination
+    from ssh_config_studio.preflight import preflight_target
+except ImportError:
+    from probe_runner import ProbeRunner, build_ssh_test_command, ssh_destination
+    from preflight import preflight_target
+
+REACHABLE = "reachable"
+UNREACHABLE = "unreachable"
+TIMED_OUT = "timeout"
+PENDING = "pending"
+
+
+def command_fingerprint(command: List[str]) -> str:
+    """Key of a probe command.
+
+    The command carries every option that decides where and how ssh
+    connects, so two hosts, or two versions of one host, that produce the
+    same command share a cache entry, and any edit that matters misses it.
+    """
+    return hashlib.sha1("\0".join(command).encode("utf-8")).hexdigest()
+
+
+def scannable(hosts: Iterable) -> List:
+    """The hosts a scan probes: those with a name to connect to, not only wildcard or negated patterns."""
+    return [host for host in hosts if ssh_destination(host) is not None]
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    status: str
+    returncode: Optional[int]
+    # Seconds from spawning ssh to its exit
+    latency: float
+    checked_at: float
+
+
+class ScanCache:
+    """Scan results by command fingerprint, forgotten ttl seconds after they were taken."""
+
+    def __init__(self, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._results: Dict[str, ScanResult] = {}
+
+    def get(self, key: str) -> Optional[ScanResult]:
+        result = self._results.get(key)
+        if result is None:
+            return None
+        if self._clock() - result.checked_at >= self.ttl:
+            del self._results[key]
+            return None
+        return result
+
+    def put(self, key: str, result: ScanResult) -> None:
+        self._results[key] = result
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+class ScanHandle:
+    """A scan in flight; cancel() kills the probes still running."""
+
+    def __init__(self, future):
+        self._future = future
+
+    def cancel(self) -> None:
+        self._future.cancel()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+
+class FleetScanner:
+    """Probes many hosts concurrently on the shared probe runner loop.
+
+    At most `concurrency` probes run at once, so a scan of N hosts takes
+    about the slowest probe times ceil(N / concurrency). Hosts whose probe
+    command has a fresh cached result are not probed again. With preflight,
+    hosts that do not accept a TCP connection fail without starting ssh.
+    """
+
+    def __init__(self, runner: ProbeRunner = None, concurrency: int = 32, ttl: float = 300.0,
+                 timeout: float = 20.0, ssh_binary: str = None, preflight: bool = True):
+        self.runner = runner or ProbeRunner.default()
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.ssh_binary = ssh_binary
+        self.preflight = preflight
+        self.cache = ScanCache(ttl)
+
+    def scan(self, hosts: Iterable, on_result: Callable[[object, ScanResult], None],
+             on_finished: Callable[[], None] = None) -> ScanHandle:
+        """Probe hosts; on_result(host, result) and on_finished() are called on the probe thread.
+
+        Hosts left out by scannable() get no result. on_finished is not
+        called when the scan is cancelled.
+        """
+        jobs = []
+        for host in hosts:
+            command = build_ssh_test_command(host, ssh_binary=self.ssh_binary)
+            if command is not None:
+                target = preflight_target(host) if self.preflight else None
+                jobs.append((host, command, command_fingerprint(command), target))
+        future = self.runner.run_coroutine(self._scan(jobs, on_result, on_finished))
+        return ScanHandle(future)
+
+    async def _scan(self, jobs, on_result, on_finished):
+        limit = asyncio.Semaphore(self.concurrency)
+        # Hosts with the same command are probed once
+        waiting: Dict[str, List[object]] = {}
+        for host, _command, key, _target in jobs:
+            cached = self.cache.get(key)
+            if cached is not None:
+                on_result(host, cached)
+            elif key in waiting:
+                waiting[key].append(host)
+            else:
+                waiting[key] = [host]
+
+        commands = {key: (command, target) for _host, command, key, target in jobs}
+
+        async def probe(key):
+            command, target = commands[key]
+            try:
+                result = await self.runner.probe(command, timeout=self.timeout, limit=limit, preflight=target)
+            except OSError:
+                # ssh itself could not be started
+                scanned = ScanResult(UNREACHABLE, None, 0.0, time.monotonic())
+                for host in waiting[key]:
+                    on_result(host, scanned)
+                return
+            if result.timed_out:
+                status = TIMED_OUT
+            elif result.ok:
+                status = REACHABLE
+            else:
+                status = UNREACHABLE
+            latency = result.phases.get("exit", result.phases.get("preflight", 0.0))
+            scanned = ScanResult(status, result.returncode, latency, time.monotonic())
+            self.cache.put(key, scanned)
+            for host in waiting[key]:
+                on_result(host, scanned)
+
+        tasks = [asyncio.ensure_future(probe(key)) for key in waiting]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        if on_finished is not None:
+            on_finished()
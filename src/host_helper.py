@@ -0,0 +1,129 @@
+"""Client of the long-lived probe helper running on the Flatpak host."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+try:
+    from ssh_config_studio.probe_helper import encode_frame, read_frame
+except ImportError:
+    from probe_helper import encode_frame, read_frame
+
+logger = logging.getLogger(__name__)
+
+# How the helper is started on the host; tests use (sys.executable,) as a local stand-in
+FLATPAK_LAUNCHER = ("flatpak-spawn", "--host", "python3")
+LOCAL_LAUNCHER = (sys.executable,)
+
+
+class HelperUnavailable(OSError):
+    """The helper could not be started or went away; the caller should run the command itself."""
+
+
+class HostHelper:
+    """Sends probe commands to one helper process and collects their events.
+
+    The helper is started on first use and shared by every probe. All
+    methods must be called from the loop of the runner that owns it.
+    """
+
+    def __init__(self, launcher: Sequence[str] = FLATPAK_LAUNCHER):
+        self.launcher = tuple(launcher)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._starting: Optional[asyncio.Lock] = None
+        self._ids = itertools.count(1)
+        self._waiting: Dict[int, asyncio.Queue] = {}
+
+    async def _ensure_started(self) -> None:
+        if self._starting is None:
+            self._starting = asyncio.Lock()
+        async with self._starting:
+            if self._process is not None and self._process.returncode is None:
+                return
+            # The helper runs from source so the host does not need the app installed
+            source = (Path(__file__).with_name("probe_helper.py")).read_text(encoding="utf-8")
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    *self.launcher, "-c", source,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                )
+            except OSError as e:
+                raise HelperUnavailable(f"cannot start probe helper: {e}") from e
+            self._reader_task = asyncio.ensure_future(self._read_events(self._process))
+
+    async def _read_events(self, process) -> None:
+        try:
+            while True:
+                event = await read_frame(process.stdout)
+                if event is None:
+                    break
+                queue = self._waiting.get(event.get("id"))
+                if queue is not None:
+                    queue.put_nowait(event)
+        except (ValueError, OSError) as e:
+            logger.warning("Probe helper protocol error: %s", e)
+        # The helper is gone; wake every caller still waiting, their commands are lost with it
+        for queue in self._waiting.values():
+            queue.put_nowait(None)
+        if process is self._process:
+            self._process = None
+
+    def _send(self, message) -> None:
+        if self._process is None or self._process.stdin is None:
+            raise HelperUnavailable("probe helper is not running")
+        self._process.stdin.write(encode_frame(message))
+
+    async def run(self, argv: Sequence[str], timeout: float,
+                  on_event: Callable[[dict], None]) -> dict:
+        """Run argv through the helper, passing each event to on_event, and return the exit event.
+
+        Raises HelperUnavailable when the helper cannot run the command at
+        all, and OSError when the command itself fails to start.
+        """
+        await self._ensure_started()
+        request_id = next(self._ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._waiting[request_id] = queue
+        try:
+            self._send({"op": "run", "id": request_id, "argv": list(argv), "timeout": timeout})
+            while True:
+                event = await queue.get()
+                if event is None:
+                    raise HelperUnavailable("probe helper exited")
+                kind = event.get("event")
+                if kind == "error":
+                    raise OSError(event.get("message", "command failed to start"))
+                if kind == "exit":
+                    return event
+                on_event(event)
+        except asyncio.CancelledError:
+            try:
+                self._send({"op": "cancel", "id": request_id})
+            except HelperUnavailable:
+                pass
+            raise
+        finally:
+            del self._waiting[request_id]
+
+    async def close(self) -> None:
+        """Close the helper's stdin; it kills its running commands and exits."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.stdin is not None:
+            process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), 2.0)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
@@ -0,0 +1,171 @@
+"""Incremental line diffing for highlighting edited SSH config text."""
+
+from __future__ import annotations
+
+import difflib
+from bisect import bisect_left
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+ADDED = "added"
+CHANGED = "changed"
+
+_STATUS_FOR_TAG = {"equal": None, "insert": ADDED, "replace": CHANGED, "delete": None}
+
+
+def _common_affixes(old: Sequence[int], new: Sequence[int]) -> Tuple[int, int]:
+    """Return the lengths of the common prefix and the non-overlapping common suffix."""
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return prefix, suffix
+
+
+def line_edits(old: Sequence[Hashable], new: Sequence[Hashable]) -> List[Tuple[int, int, list]]:
+    """Return the edits that turn old lines (or any hashable items) into new ones.
+
+    Each edit is (start, end, replacement): old lines start..end are replaced
+    by the replacement lines. Edits are ordered and do not overlap, so they
+    can be applied back to front without recomputing positions.
+    """
+    prefix, suffix = _common_affixes([hash(line) for line in old], [hash(line) for line in new])
+    old_mid = old[prefix:len(old) - suffix]
+    new_mid = new[prefix:len(new) - suffix]
+    if not old_mid and not new_mid:
+        return []
+    if not old_mid or not new_mid:
+        return [(prefix, prefix + len(old_mid), list(new_mid))]
+
+    matcher = difflib.SequenceMatcher(None, old_mid, new_mid, autojunk=False)
+    return [
+        (i1 + prefix, i2 + prefix, list(new_mid[j1:j2]))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+class IncrementalLineDiff:
+    """Tracks the alignment of edited lines against a fixed original.
+
+    Lines are compared by hash. On each update only the span touched by the
+    edit, widened to the opcodes it overlaps, is diffed again; the rest of
+    the previous alignment is reused with shifted offsets.
+    """
+
+    def __init__(self, original_lines: Sequence[str]) -> None:
+        self._original: List[int] = [hash(line) for line in original_lines]
+        self._current: List[int] = []
+        self._status: List[Optional[str]] = []
+        if self._original:
+            self._opcodes: List[Tuple[str, int, int, int, int]] = [
+                ("delete", 0, len(self._original), 0, 0)
+            ]
+        else:
+            self._opcodes = []
+
+    @property
+    def statuses(self) -> List[Optional[str]]:
+        """Status of every current line: ADDED, CHANGED or None."""
+        return self._status
+
+    def update(self, lines: Sequence[str]) -> List[Tuple[int, Optional[str]]]:
+        """Align new current lines and return the lines whose highlight must be redone.
+
+        Each entry is (line_index, status). Lines inside the edited span are
+        always reported; lines next to it only when their status changed.
+        """
+        new = [hash(line) for line in lines]
+        old = self._current
+        prefix, suffix = _common_affixes(old, new)
+        if prefix == len(old) == len(new):
+            return []
+
+        old_end = len(old) - suffix
+        delta = len(new) - len(old)
+        head = tail = None
+
+        k0 = self._first_opcode_at(prefix)
+        k1 = self._last_opcode_at(old_end)
+        if not self._opcodes:
+            i_lo, i_hi, j_lo, j_hi = 0, len(self._original), 0, len(old)
+            before, after = [], []
+        elif k0 > k1:
+            # Insertion exactly between two opcodes; both neighbours stay intact
+            i_lo = i_hi = self._opcodes[k0][1]
+            j_lo = j_hi = prefix
+            before, after = self._opcodes[:k0], self._opcodes[k0:]
+        else:
+            tag, i1, _i2, j1, _j2 = self._opcodes[k0]
+            if tag == "equal":
+                i_lo, j_lo = i1 + (prefix - j1), prefix
+                if j_lo > j1:
+                    head = ("equal", i1, i_lo, j1, j_lo)
+            else:
+                i_lo, j_lo = i1, j1
+            tag, i1, i2, j1, j2 = self._opcodes[k1]
+            if tag == "equal":
+                i_hi, j_hi = i1 + (old_end - j1), old_end
+                if j_hi < j2:
+                    tail = ("equal", i_hi, i2, j_hi + delta, j2 + delta)
+            else:
+                i_hi, j_hi = i2, j2
+            before, after = self._opcodes[:k0], self._opcodes[k1 + 1:]
+
+        matcher = difflib.SequenceMatcher(None, self._original[i_lo:i_hi], new[j_lo:j_hi + delta])
+        middle = [
+            (tag, i1 + i_lo, i2 + i_lo, j1 + j_lo, j2 + j_lo)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        ]
+
+        opcodes = list(before)
+        if head:
+            opcodes.append(head)
+        opcodes.extend(middle)
+        if tail:
+            opcodes.append(tail)
+        opcodes.extend((tag, i1, i2, j1 + delta, j2 + delta) for tag, i1, i2, j1, j2 in after)
+        self._opcodes = opcodes
+
+        region_status: List[Optional[str]] = []
+        for tag, i1, i2, j1, j2 in middle:
+            region_status.extend([_STATUS_FOR_TAG[tag]] * (j2 - j1))
+
+        old_status = self._status
+        self._status = old_status[:j_lo] + region_status + old_status[j_hi:]
+        self._current = new
+
+        changes: List[Tuple[int, Optional[str]]] = []
+        edited_end = len(new) - suffix
+        for index in range(j_lo, j_hi + delta):
+            status = self._status[index]
+            if prefix <= index < edited_end:
+                changes.append((index, status))
+                continue
+            previous_index = index if index < prefix else index - delta
+            previous = old_status[previous_index] if previous_index < len(old_status) else None
+            if previous != status:
+                changes.append((index, status))
+        return changes
+
+    def _first_opcode_at(self, line: int) -> int:
+        """Index of the first opcode whose current-line span reaches line."""
+        k = bisect_left(self._opcodes, line, key=lambda op: op[4])
+        while k < len(self._opcodes):
+            tag, _i1, _i2, _j1, j2 = self._opcodes[k]
+            if not (tag == "equal" and j2 == line):
+                return k
+            k += 1
+        return len(self._opcodes) - 1
+
+    def _last_opcode_at(self, line: int) -> int:
+        """Index of the last opcode whose current-line span starts at or before line."""
+        k = bisect_left(self._opcodes, line + 1, key=lambda op: op[3]) - 1
+        while k >= 0:
+            tag, _i1, _i2, j1, _j2 = self._opcodes[k]
+            if not (tag == "equal" and j1 == line):
+                return k
+            k -= 1
+        return -1
@@ -0,0 +1,154 @@
+"""TCP preflight checks and rolling connect latency histograms."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Upper bounds of the histogram buckets, in milliseconds; the last bucket is open
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+
+def preflight_target(host) -> Optional[Tuple[str, int]]:
+    """The address ssh would open a TCP connection to, or None when it cannot be checked directly.
+
+    Hosts reached through ProxyJump or ProxyCommand are skipped: the first
+    hop, not the host, is what this machine connects to.
+    """
+    if host.get_option('ProxyJump') or host.get_option('ProxyCommand'):
+        return None
+    hostname = (host.get_option('HostName') or "").strip()
+    if not hostname and host.patterns:
+        hostname = host.patterns[0]
+    if not hostname or any(c in hostname for c in "*?!%"):
+        return None
+    port = (host.get_option('Port') or "22").strip()
+    if not port.isdigit():
+        return None
+    return hostname, int(port)
+
+
+@dataclass(frozen=True)
+class PreflightResult:
+    target: Tuple[str, int]
+    ok: bool
+    # Seconds until the connection was accepted or refused
+    latency: float
+    error: str = ""
+
+
+async def tcp_preflight(hostname: str, port: int, timeout: float = 3.0, resolver=None) -> PreflightResult:
+    """Open and immediately close a TCP connection to hostname:port.
+
+    With a resolver, a DnsCache, the name is resolved through it and each
+    address is tried in turn; latency then covers the connect alone.
+    """
+    started = time.perf_counter()
+    addresses = (hostname,)
+    if resolver is not None:
+        resolution = await resolver.resolve(hostname)
+        if not resolution.ok:
+            return PreflightResult((hostname, port), False, 0.0, f"cannot resolve {hostname}: {resolution.error}")
+        addresses = resolution.addresses
+    deadline = started + timeout
+    error = "no address"
+    for address in addresses:
+        connect_started = time.perf_counter()
+        try:
+            _reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(address, port), max(0.0, deadline - connect_started)
+            )
+        except asyncio.TimeoutError:
+            return PreflightResult((hostname, port), False, time.perf_counter() - connect_started, "timed out")
+        except OSError as e:
+            error = e.strerror or str(e)
+            continue
+        latency = time.perf_counter() - connect_started
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return PreflightResult((hostname, port), True, latency)
+    return PreflightResult((hostname, port), False, time.perf_counter() - started, error)
+
+
+class LatencyHistogram:
+    """The last `window` connect latencies of one target, bucketed for display."""
+
+    def __init__(self, window: int = 64):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def counts(self) -> List[int]:
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for seconds in self._samples:
+            counts[bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        return counts
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def render(self, width: int = 30) -> List[str]:
+        """One text bar per non-empty bucket, e.g. "<= 20 ms  ######  6"."""
+        counts = self.counts()
+        peak = max(counts) or 1
+        lines = []
+        for index, count in enumerate(counts):
+            if not count:
+                continue
+            if index < len(LATENCY_BUCKETS_MS):
+                label = f"<= {LATENCY_BUCKETS_MS[index]} ms"
+            else:
+                label = f"> {LATENCY_BUCKETS_MS[-1]} ms"
+            bar = "#" * max(1, count * width // peak)
+            lines.append(f"{label:>11}  {bar} {count}")
+        return lines
+
+
+class LatencyStore:
+    """Histograms by "host:port" target.
+
+    Samples are added from the probe thread and read from the UI thread,
+    hence the lock.
+    """
+
+    def __init__(self, window: int = 64):
+        self.window = window
+        self._histograms: Dict[Tuple[str, int], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, target: Tuple[str, int], seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(target)
+            if histogram is None:
+                histogram = self._histograms[target] = LatencyHistogram(self.window)
+            histogram.add(seconds)
+
+    def median(self, target: Tuple[str, int]) -> Optional[float]:
+        with self._lock:
+            histogram = self._histograms.get(target)
+            return histogram.percentile(0.5) if histogram is not None else None
+
+    def summary(self, target: Tuple[str, int]) -> List[str]:
+        """Sample count, median and 95th percentile followed by the histogram bars."""
+        with self._lock:
+            histogram = self._histograms.get(target)
+            if histogram is None or not len(histogram):
+                return []
+            p50, p95 = histogram.percentile(0.5), histogram.percentile(0.95)
+            header = f"{len(histogram)} samples, p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms"
+            return [header] + histogram.render()
@@ -0,0 +1,146 @@
+"""Helper process that runs probe commands on behalf of the app.
+
+Under Flatpak the app starts this module once on the host, as
+`flatpak-spawn --host python3 -c <source>`, instead of paying for a
+flatpak-spawn per probe. It only uses the standard library, since it runs
+on whatever Python the host has.
+
+Requests and replies are frames: a 4-byte big-endian length followed by
+that many bytes of UTF-8 JSON. The app sends
+
+    {"op": "run", "id": 1, "argv": [...], "timeout": 20.0}
+    {"op": "cancel", "id": 1}
+
+and the helper answers each run with
+
+    {"id": 1, "event": "spawned", "elapsed": 0.002}
+    {"id": 1, "event": "line", "stream": "stderr", "data": "..."}   (any number)
+    {"id": 1, "event": "exit", "returncode": 0, "timed_out": false}
+
+or a single {"id": 1, "event": "error", "message": "..."} when the command
+could not be started. Commands run concurrently. When its stdin closes,
+the helper kills whatever is still running and exits.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import struct
+import sys
+import time
+
+_HEADER = struct.Struct(">I")
+# Larger frames are a protocol error, not a real message
+MAX_FRAME = 16 * 1024 * 1024
+
+
+def encode_frame(message) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader):
+    """The next message from reader, or None at end of stream."""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError("frame of %d bytes is too large" % length)
+    try:
+        body = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return json.loads(body.decode("utf-8"))
+
+
+class _Server:
+    def __init__(self, output):
+        self._output = output
+        self._tasks = {}
+
+    def send(self, message):
+        self._output.write(encode_frame(message))
+        self._output.flush()
+
+    async def serve(self, reader):
+        while True:
+            request = await read_frame(reader)
+            if request is None:
+                break
+            op = request.get("op")
+            if op == "run":
+                request_id = request["id"]
+                task = asyncio.ensure_future(self._run(request_id, request["argv"], request.get("timeout", 20.0)))
+                self._tasks[request_id] = task
+                task.add_done_callback(lambda _t, key=request_id: self._tasks.pop(key, None))
+            elif op == "cancel":
+                task = self._tasks.get(request.get("id"))
+                if task is not None:
+                    task.cancel()
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _run(self, request_id, argv, timeout):
+        started = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        except OSError as e:
+            self.send({"id": request_id, "event": "error", "message": str(e)})
+            return
+        self.send({"id": request_id, "event": "spawned", "elapsed": time.perf_counter() - started})
+
+        async def pump(stream, name):
+            while True:
+                raw = await stream.readline()
+                if not raw:
+                    return
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                self.send({"id": request_id, "event": "line", "stream": name, "data": line})
+
+        async def communicate():
+            await asyncio.gather(pump(process.stdout, "stdout"), pump(process.stderr, "stderr"), process.wait())
+
+        timed_out = False
+        try:
+            await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+        finally:
+            if process.returncode is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+            self.send({
+                "id": request_id, "event": "exit",
+                "returncode": process.returncode, "timed_out": timed_out,
+            })
+
+
+async def _main():
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    await _Server(sys.stdout.buffer).serve(reader)
+
+
+def main():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(_main())
+
+
+if __name__ == "__main__":
+    main()
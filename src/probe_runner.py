@@ -0,0 +1,376 @@
+"""Runs ssh connection probes on a background asyncio loop."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    from ssh_config_studio.preflight import LatencyStore, PreflightResult, tcp_preflight
+    from ssh_config_studio.dns_cache import DnsCache, Resolution
+    from ssh_config_studio.host_helper import HostHelper, HelperUnavailable
+except ImportError:
+    from preflight import LatencyStore, PreflightResult, tcp_preflight
+    from dns_cache import DnsCache, Resolution
+    from host_helper import HostHelper, HelperUnavailable
+
+logger = logging.getLogger(__name__)
+
+# Options that keep a probe non-interactive
+PROBE_OPTIONS = (
+    "-T",
+    "-o", "BatchMode=yes",
+    "-o", "ConnectTimeout=8",
+    "-o", "StrictHostKeyChecking=accept-new",
+    "-o", "PasswordAuthentication=no",
+    "-o", "KbdInteractiveAuthentication=no",
+    "-o", "NumberOfPasswordPrompts=0",
+)
+
+# Keeps a probe independent of shared connections, unless a ControlPool is used
+NO_MULTIPLEXING = (
+    "-o", "ControlMaster=no",
+    "-o", "ControlPath=none",
+    "-o", "ControlPersist=no",
+)
+
+# Lines of `ssh -v` output that mark the end of a phase
+_PHASE_MARKERS = (
+    ("connect", "Connection established"),
+    ("auth", "Authenticated to"),
+    ("auth", "Authentication succeeded"),
+)
+
+PHASES = ("preflight", "spawn", "connect", "auth", "exit")
+
+# Overridable so probes can be pointed at a fake ssh, e.g. in a test harness
+DEFAULT_SSH_BINARY = os.environ.get("SSH_CONFIG_STUDIO_SSH", "ssh")
+
+
+# Prefix that runs a command on the host system from inside Flatpak
+HOST_PREFIX = ["flatpak-spawn", "--host"]
+
+
+def ssh_invocation(ssh_binary: str = None) -> List[str]:
+    """The argv prefix that runs ssh, going through the host system inside Flatpak."""
+    ssh_binary = ssh_binary or DEFAULT_SSH_BINARY
+    if os.environ.get("FLATPAK_ID"):
+        return [*HOST_PREFIX, ssh_binary]
+    return [ssh_binary]
+
+
+def ssh_destination(host) -> Optional[List[str]]:
+    """The user, port, identity and jump flags followed by the host name ssh connects to.
+
+    None when the host has nothing to connect to: no HostName and no
+    pattern, or a pattern that is a wildcard or negation rather than a name.
+    """
+    hostname = (host.get_option('HostName') or "").strip()
+    if not hostname and host.patterns:
+        hostname = host.patterns[0]
+    if not hostname or any(c in hostname for c in "*?!"):
+        return None
+    arguments = []
+    for flag, key in (("-l", "User"), ("-p", "Port"), ("-i", "IdentityFile"), ("-J", "ProxyJump")):
+        value = (host.get_option(key) or "").strip()
+        if value:
+            arguments += [flag, value]
+    return arguments + [hostname]
+
+
+def build_ssh_test_command(host, ssh_binary: str = None, verbose: bool = False,
+                           control_options: List[str] = None) -> Optional[List[str]]:
+    """Build the ssh command that tests a host, or None when it has nothing to connect to.
+
+    With verbose, ssh reports its progress on stderr, which is what the
+    probe runner uses to time the connect and auth phases. control_options,
+    from ControlPool.client_options(), replace the options that turn off
+    connection sharing.
+    """
+    destination = ssh_destination(host)
+    if destination is None:
+        return None
+    command = [*ssh_invocation(ssh_binary), "-v" if verbose else "-q", *PROBE_OPTIONS]
+    command += control_options if control_options is not None else NO_MULTIPLEXING
+    return command + destination + ["exit"]
+
+
+@dataclass
+class ProbeResult:
+    command: List[str]
+    returncode: Optional[int] = None
+    timed_out: bool = False
+    # Seconds from the start of the probe to the end of each phase that was reached
+    phases: Dict[str, float] = field(default_factory=dict)
+    lines: List[Tuple[str, str]] = field(default_factory=list)
+    # Set when a TCP preflight ran; ssh is not started when it failed
+    preflight: Optional[PreflightResult] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+class ProbeHandle:
+    """A probe in flight; cancel() kills its ssh process."""
+
+    def __init__(self, future):
+        self._future = future
+
+    def cancel(self) -> None:
+        self._future.cancel()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def add_done_callback(self, callback: Callable[[Optional[ProbeResult]], None]) -> None:
+        """Call callback with the result, or None if the probe was cancelled or failed.
+
+        The callback runs on the probe thread; UI code has to hop back to
+        the main loop itself.
+        """
+        def on_done(future):
+            if future.cancelled():
+                callback(None)
+                return
+            error = future.exception()
+            if error is not None:
+                logger.warning("Probe failed: %s", error)
+                callback(None)
+                return
+            callback(future.result())
+        self._future.add_done_callback(on_done)
+
+
+class ProbeRunner:
+    """Runs probes on one asyncio loop in a daemon thread.
+
+    At most `concurrency` ssh processes run at once; further probes wait
+    for a free slot. Output is read line by line as it arrives. With a
+    HostHelper, commands are handed to the helper process instead of being
+    spawned here, without their flatpak-spawn prefix.
+    """
+
+    _default = None
+
+    def __init__(self, concurrency: int = 8, helper: HostHelper = None):
+        self.concurrency = concurrency
+        self.helper = helper
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        # Connect latencies measured by preflights, by target
+        self.latencies = LatencyStore()
+        # Shared by preflights and HostName prefetches
+        self.dns = DnsCache()
+
+    @classmethod
+    def default(cls) -> "ProbeRunner":
+        if cls._default is None:
+            cls._default = cls(helper=HostHelper() if os.environ.get("FLATPAK_ID") else None)
+        return cls._default
+
+    @classmethod
+    def shutdown_default(cls) -> None:
+        """Stop the shared runner, if it was ever started, killing probes still running."""
+        if cls._default is not None:
+            cls._default.shutdown()
+            cls._default = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="probe-runner", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, command: List[str], on_line: Callable[[str, str], None] = None,
+               timeout: float = 20.0, preflight: Tuple[str, int] = None,
+               prepare: Callable[[], Awaitable] = None) -> ProbeHandle:
+        """Start a probe; on_line(stream, line) is called on the probe thread for each output line.
+
+        prepare, when given, is called on the probe loop and what it returns
+        is awaited before ssh starts, e.g. ControlPool.ensure_master.
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self.probe(command, on_line, timeout, preflight=preflight, prepare=prepare), loop
+        )
+        return ProbeHandle(future)
+
+    def prefetch(self, hostname: str, on_resolved: Callable[[Resolution], None]) -> None:
+        """Resolve hostname through the DNS cache and pass the result to on_resolved.
+
+        A fresh cached result is passed at once, on the calling thread;
+        otherwise on_resolved runs on the probe thread once the lookup ends.
+        """
+        cached = self.dns.lookup(hostname)
+        if cached is not None:
+            on_resolved(cached)
+            return
+
+        def on_done(future):
+            if not future.cancelled() and future.exception() is None:
+                on_resolved(future.result())
+
+        self.run_coroutine(self.dns.resolve(hostname)).add_done_callback(on_done)
+
+    def run_coroutine(self, coroutine):
+        """Schedule another coroutine on the probe loop and return its concurrent future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+
+        async def stop():
+            current = asyncio.current_task()
+            tasks = [task for task in asyncio.all_tasks() if task is not current]
+            for task in tasks:
+                task.cancel()
+            # Let cancelled probes run their cleanup, which kills their processes
+            if tasks:
+                await asyncio.wait(tasks, timeout=3)
+            if self.helper is not None:
+                await self.helper.close()
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(stop(), loop)
+        thread.join(timeout=5)
+        self._semaphore = None
+        self.dns.shutdown()
+
+    async def probe(self, command: List[str], on_line: Callable[[str, str], None] = None,
+                    timeout: float = 20.0, limit: asyncio.Semaphore = None,
+                    preflight: Tuple[str, int] = None,
+                    prepare: Callable[[], Awaitable] = None) -> ProbeResult:
+        """Run one probe on the runner loop, waiting for a slot of limit or of the runner.
+
+        With a preflight target, a plain TCP connection is tried first; when
+        nothing answers, the probe fails without starting ssh.
+        """
+        if limit is None:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+            limit = self._semaphore
+        async with limit:
+            checked = None
+            if preflight is not None:
+                checked = await self._preflight(preflight, on_line)
+                if not checked.ok:
+                    result = ProbeResult(command=list(command), preflight=checked)
+                    result.phases["preflight"] = checked.latency
+                    return result
+            if prepare is not None:
+                await prepare()
+            result = await self._run_command(command, on_line, timeout)
+            if checked is not None:
+                result.preflight = checked
+                result.phases["preflight"] = checked.latency
+            return result
+
+    async def _preflight(self, target: Tuple[str, int], on_line) -> PreflightResult:
+        checked = await tcp_preflight(*target, resolver=self.dns)
+        if checked.ok:
+            self.latencies.record(target, checked.latency)
+            message = f"TCP connect to {target[0]}:{target[1]} took {checked.latency * 1000:.1f} ms"
+        else:
+            message = f"TCP connect to {target[0]}:{target[1]} failed: {checked.error}"
+        if on_line is not None:
+            on_line("preflight", message)
+        return checked
+
+    async def _run_command(self, command, on_line, timeout) -> ProbeResult:
+        if self.helper is not None:
+            argv = command[len(HOST_PREFIX):] if command[:len(HOST_PREFIX)] == HOST_PREFIX else command
+            try:
+                return await self._probe_via_helper(command, argv, on_line, timeout)
+            except HelperUnavailable as e:
+                logger.warning("Probe helper unavailable, spawning probes directly: %s", e)
+                self.helper = None
+        return await self._probe(command, on_line, timeout)
+
+    @staticmethod
+    def _record_line(result, started, name, line, on_line) -> None:
+        for phase, marker in _PHASE_MARKERS:
+            if phase not in result.phases and marker in line:
+                result.phases[phase] = time.perf_counter() - started
+        result.lines.append((name, line))
+        if on_line is not None:
+            on_line(name, line)
+
+    async def _probe_via_helper(self, command, argv, on_line, timeout) -> ProbeResult:
+        result = ProbeResult(command=list(command))
+        started = time.perf_counter()
+
+        def on_event(event):
+            if event["event"] == "spawned":
+                result.phases["spawn"] = time.perf_counter() - started
+            elif event["event"] == "line":
+                self._record_line(result, started, event["stream"], event["data"], on_line)
+
+        exit_event = await self.helper.run(argv, timeout, on_event)
+        result.returncode = exit_event.get("returncode")
+        result.timed_out = bool(exit_event.get("timed_out"))
+        result.phases["exit"] = time.perf_counter() - started
+        return result
+
+    async def _probe(self, command, on_line, timeout) -> ProbeResult:
+        result = ProbeResult(command=list(command))
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            # Own process group, so a kill also reaches ProxyCommand children holding the pipes
+            start_new_session=True,
+        )
+        result.phases["spawn"] = time.perf_counter() - started
+
+        async def pump(stream, name):
+            while True:
+                raw = await stream.readline()
+                if not raw:
+                    return
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                self._record_line(result, started, name, line, on_line)
+
+        async def communicate():
+            await asyncio.gather(pump(process.stdout, "stdout"), pump(process.stderr, "stderr"), process.wait())
+
+        try:
+            await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            result.timed_out = True
+        finally:
+            # Runs on timeout and on cancellation alike: never leave ssh behind
+            if process.returncode is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+        result.returncode = process.returncode
+        result.phases["exit"] = time.perf_counter() - started
+        return result
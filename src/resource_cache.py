@@ -0,0 +1,82 @@
+"""Remembered locations of the GResource bundle and stylesheet between launches."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    from ssh_config_studio.config_cache import app_cache_dir
+except ImportError:
+    from config_cache import app_cache_dir
+
+logger = logging.getLogger(__name__)
+
+GRESOURCE = "gresource"
+CSS = "css"
+
+
+class ResourceLocations:
+    """Where each resource was found last time, for one app version and install prefix.
+
+    Entries recorded by another version or another installation are
+    ignored, and an entry is only returned while the file it names still
+    exists, so callers fall back to probing exactly when the recorded
+    location went away.
+    """
+
+    def __init__(self, version: str, prefix: str, path: Path = None):
+        self.version = version
+        self.prefix = prefix
+        self.path = path or app_cache_dir() / "resources.json"
+        self._locations: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict[str, str]:
+        if self._locations is None:
+            self._locations = {}
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return self._locations
+            if isinstance(data, dict) and data.get("version") == self.version and data.get("prefix") == self.prefix:
+                locations = data.get("locations")
+                if isinstance(locations, dict):
+                    self._locations = {k: v for k, v in locations.items() if isinstance(v, str)}
+        return self._locations
+
+    def get(self, kind: str) -> Optional[str]:
+        """The recorded location of kind, if that file is still there."""
+        location = self._load().get(kind)
+        if location is None:
+            return None
+        try:
+            os.stat(location)
+        except OSError:
+            return None
+        return location
+
+    def put(self, kind: str, location: Optional[str]) -> None:
+        """Record location for kind, or forget it when None; the file is only rewritten on change."""
+        locations = self._load()
+        if location is not None:
+            location = os.path.abspath(location)
+        if locations.get(kind) == location:
+            return
+        if location is None:
+            del locations[kind]
+        else:
+            locations[kind] = location
+        payload = {"version": self.version, "prefix": self.prefix, "locations": locations}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to record resource locations: %s", e)
@@ -2,23 +2,55 @@
 
 from __future__ import annotations
 
+import difflib
 import fnmatch
-import glob
 import logging
 import os
 import re
-import shutil
 import stat
 import tempfile
-from dataclasses import dataclass, field
-from datetime import datetime
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, NamedTuple, Optional, Dict, Tuple
+
+try:
+    from ssh_config_studio.ssh_keywords import unknown_keywords, validate_hosts
+    from ssh_config_studio.config_journal import ConfigJournal, ReplaceConfig
+    from ssh_config_studio.config_cache import SnapshotCache, expand_includes, fingerprint
+except ImportError:
+    from ssh_keywords import unknown_keywords, validate_hosts
+    from config_journal import ConfigJournal, ReplaceConfig
+    from config_cache import SnapshotCache, expand_includes, fingerprint
 
 logger = logging.getLogger(__name__)
 
+# Keywords ssh collects from every matching block instead of keeping the first value
+ACCUMULATING_OPTIONS = frozenset({
+    "certificatefile", "dynamicforward", "identityfile", "localforward",
+    "remoteforward", "sendenv", "setenv",
+})
 
-@dataclass
+_OPTION_RE = re.compile(r"^(\S+)\s+(.+)$")
+
+
+def host_matches(patterns: List[str], alias: str) -> bool:
+    """Whether a Host line with these patterns applies to alias.
+
+    Like ssh, a block applies when some pattern matches and no negated
+    ("!") pattern does; matching ignores case.
+    """
+    name = alias.lower()
+    matched = False
+    for pattern in patterns:
+        negated = pattern.startswith("!")
+        if fnmatch.fnmatchcase(name, (pattern[1:] if negated else pattern).lower()):
+            if negated:
+                return False
+            matched = True
+    return matched
+
+
+@dataclass(frozen=True)
 class SSHOption:
     key: str
     value: str
@@ -27,6 +59,17 @@ class SSHOption:
     def __str__(self) -> str:
         return f"{self.indentation}{self.key} {self.value}".rstrip()
 
+
+class HostSnapshot(NamedTuple):
+    """Immutable state of an SSHHost.
+
+    Options are frozen, so a snapshot shares them with the host instead of
+    copying them; only the containing tuples are new.
+    """
+    patterns: Tuple[str, ...]
+    options: Tuple[SSHOption, ...]
+    raw_lines: Tuple[str, ...]
+
 @dataclass
 class SSHHost:
     patterns: List[str] = field(default_factory=list)
@@ -34,6 +77,8 @@ class SSHHost:
     start_line: int = -1
     end_line: int = -1
     raw_lines: List[str] = field(default_factory=list)
+    # Bumped by the journal on every recorded edit and restored by undo
+    generation: int = field(default=0, compare=False)
 
     @classmethod
     def from_raw_lines(cls, lines: List[str]) -> "SSHHost":
@@ -69,6 +114,10 @@ class SSHHost:
         
         return host
 
+    def to_lines(self) -> List[str]:
+        """Lines written to the config file for this host, without the trailing blank."""
+        return [f"Host {' '.join(self.patterns)}"] + [str(opt) for opt in self.options]
+
     def get_option(self, key: str) -> Optional[str]:
         for opt in self.options:
             if opt.key.lower() == key.lower():
@@ -76,9 +125,10 @@ class SSHHost:
         return None
 
     def set_option(self, key: str, value: str) -> None:
-        for opt in self.options:
+        for i, opt in enumerate(self.options):
             if opt.key.lower() == key.lower():
-                opt.value = value
+                if opt.value != value:
+                    self.options[i] = replace(opt, value=value)
                 return
         self.options.append(SSHOption(key=key, value=value))
 
@@ -89,6 +139,16 @@ class SSHHost:
                 return True
         return False
 
+    def snapshot(self) -> HostSnapshot:
+        return HostSnapshot(tuple(self.patterns), tuple(self.options), tuple(self.raw_lines))
+
+    def restore(self, snapshot: HostSnapshot) -> None:
+        """Return the host to a snapshot; the shared option objects are reused as-is."""
+        self.patterns = list(snapshot.patterns)
+        self.options = list(snapshot.options)
+        self.raw_lines = list(snapshot.raw_lines)
+
+
 @dataclass
 class SSHConfig:
     file_path: Path
@@ -97,6 +157,7 @@ class SSHConfig:
     include_directives: List[str] = field(default_factory=list)
     includes_resolved: Dict[Path, List[str]] = field(default_factory=dict)
     original_lines: List[str] = field(default_factory=list)
+    journal: ConfigJournal = field(default_factory=ConfigJournal, compare=False, repr=False)
 
     def is_dirty(self) -> bool:
         current_content_lines = []
@@ -105,9 +166,7 @@ class SSHConfig:
         if self.global_options and (not current_content_lines or current_content_lines[-1].strip() != ""):
             current_content_lines.append("")
         for host in self.hosts:
-            current_content_lines.append(f"Host {' '.join(host.patterns)}")
-            for opt in host.options:
-                current_content_lines.append(str(opt))
+            current_content_lines.extend(host.to_lines())
             current_content_lines.append("")
         while current_content_lines and current_content_lines[-1] == "":
             current_content_lines.pop()
@@ -129,6 +188,27 @@ class SSHConfig:
                 return h
         return None
 
+    def resolve(self, alias: str) -> List[Tuple[SSHOption, Optional[SSHHost]]]:
+        """Options ssh would use for alias, each with the host block it came from.
+
+        Global options come first, then matching blocks in file order; the
+        first value of a keyword wins except for ACCUMULATING_OPTIONS. The
+        block is None for global options. Match blocks and the contents of
+        included files are not evaluated.
+        """
+        resolved: List[Tuple[SSHOption, Optional[SSHHost]]] = []
+        seen = set()
+        sources = [(None, self.global_options)]
+        sources.extend((host, host.options) for host in self.hosts if host_matches(host.patterns, alias))
+        for host, options in sources:
+            for opt in options:
+                key = opt.key.lower()
+                if key in seen and key not in ACCUMULATING_OPTIONS:
+                    continue
+                seen.add(key)
+                resolved.append((opt, host))
+        return resolved
+
     def add_host(self, host: SSHHost) -> None:
         self.hosts.append(host)
 
@@ -139,6 +219,33 @@ class SSHConfig:
         except ValueError:
             return False
 
+    def add_hosts(self, hosts: List[SSHHost]) -> None:
+        self.hosts.extend(hosts)
+
+    def remove_hosts(self, hosts: List[SSHHost]) -> int:
+        """Remove hosts by identity in a single pass; returns how many were removed.
+
+        The list is filtered in place because views may hold a reference to it.
+        """
+        removed = {id(host) for host in hosts}
+        before = len(self.hosts)
+        self.hosts[:] = [host for host in self.hosts if id(host) not in removed]
+        return before - len(self.hosts)
+
+def _option_lines(lines: List[str], start: int, end: int) -> List[Tuple[int, SSHOption]]:
+    """The options of the Host block at lines[start..end], with their line numbers, read like a parse."""
+    found = []
+    for idx in range(start + 1, end + 1):
+        line = lines[idx]
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or stripped.lower().startswith("include "):
+            continue
+        m = _OPTION_RE.match(stripped)
+        if m:
+            found.append((idx, SSHOption(m.group(1), m.group(2), line[:len(line) - len(line.lstrip())])))
+    return found
+
+
 class SSHConfigParser:
     def __init__(self, config_path: Optional[Path] = None) -> None:
         self.config_path: Path = config_path or Path.home() / ".ssh" / "config"
@@ -147,22 +254,202 @@ class SSHConfigParser:
         self.auto_backup_enabled: bool = True
         self.backup_dir: Optional[Path] = None
 
-    def parse(self) -> SSHConfig:
+    def parse(self, use_cache: bool = False) -> SSHConfig:
+        """Read the config file and its includes.
+
+        With use_cache, a snapshot left by an earlier parse is loaded instead
+        when neither the file nor any include changed since, and a fresh
+        parse leaves a snapshot for the next time.
+        """
         if not self.config_path.exists():
             logger.warning("SSH config file not found: %s", self.config_path)
             return self.config
 
+        cache = SnapshotCache() if use_cache else None
+        if cache is not None:
+            data = cache.load(self.config_path)
+            if data is not None:
+                self._restore_snapshot(data)
+                self.config.journal.clear()
+                return self.config
+
+        # Taken before reading, so a write racing the parse cannot be cached as current
+        main_fingerprint = fingerprint(self.config_path)
         with self.config_path.open("r", encoding="utf-8") as f:
             lines = f.readlines()
         self.config.original_lines = [l.rstrip("\n") for l in lines]
 
         self._parse_main_lines(self.config.original_lines)
         self._resolve_includes()
+        self.config.journal.clear()
+        if cache is not None:
+            cache.store(
+                self.config_path, self._snapshot_data(),
+                expand_includes(self.config_path, self.config.include_directives),
+                main_fingerprint,
+            )
+        return self.config
+
+    def _snapshot_data(self) -> dict:
+        config = self.config
+        return {
+            "original_lines": config.original_lines,
+            "global_options": [(o.key, o.value, o.indentation) for o in config.global_options],
+            "include_directives": config.include_directives,
+            "includes_resolved": {str(path): lines for path, lines in config.includes_resolved.items()},
+            "hosts": [
+                (host.patterns, [(o.key, o.value, o.indentation) for o in host.options],
+                 host.start_line, host.end_line, host.raw_lines)
+                for host in config.hosts
+            ],
+        }
+
+    def _restore_snapshot(self, data: dict) -> None:
+        config = self.config
+        # Options are frozen, so equal ones, like "User root" on every host, can share one object
+        shared: Dict[tuple, SSHOption] = {}
+
+        def option(fields: tuple) -> SSHOption:
+            opt = shared.get(fields)
+            if opt is None:
+                opt = shared[fields] = SSHOption(*fields)
+            return opt
+
+        config.original_lines = data["original_lines"]
+        config.global_options[:] = [option(o) for o in data["global_options"]]
+        config.include_directives[:] = data["include_directives"]
+        config.includes_resolved = {Path(path): lines for path, lines in data["includes_resolved"].items()}
+        # Filled in place, like a parse, because views hold the host list
+        config.hosts[:] = [
+            SSHHost(patterns=patterns, options=[option(o) for o in options],
+                    start_line=start, end_line=end, raw_lines=raw_lines)
+            for patterns, options, start, end, raw_lines in data["hosts"]
+        ]
+
+    def parse_lines(self, lines: List[str], coalesce: bool = False) -> SSHConfig:
+        """Rebuild the hosts from edited text as one undoable step.
+
+        The on-disk baseline used by is_dirty is kept. coalesce is passed on
+        to ConfigJournal.record.
+        """
+        before = ReplaceConfig.capture(self.config)
+        self._parse_main_lines(lines)
+        self._resolve_includes()
+        self.config.journal.record(ReplaceConfig(before, ReplaceConfig.capture(self.config)), coalesce=coalesce)
         return self.config
 
     def write(self, backup: bool = True) -> None:
-        content = self._generate_content()
+        self._write_content(self._generate_content(), backup)
+
+    def write_changes(self, backup: bool = True) -> None:
+        """Write the hosts into the file as it was read, rewriting only the lines of changed hosts.
+
+        Unlike write(), which regenerates the whole file, comments, blank
+        lines and Include lines stay where they are, and so does every
+        unchanged block. Added hosts are appended at the end and removed
+        ones are cut out; global options are kept as they were read. The
+        model is read back from the new text afterwards.
+        """
+        lines = self._changed_lines()
+        self._write_content("\n".join(lines) + "\n", backup)
+        self.config.original_lines = lines
+        self._parse_main_lines(lines)
+
+    def write_formatted(self, backup: bool = True) -> None:
+        """Write formatted() to the file."""
+        self._write_content(self.formatted(), backup)
+
+    def formatted(self) -> str:
+        """The file as read, in canonical layout.
+
+        Keywords and values are separated by one space, the lines of a Host
+        or Match block are indented by four spaces, each block is preceded
+        by a blank line and runs of blank lines are collapsed. Only
+        whitespace changes: comments, Include lines and the order of all
+        lines are kept, so the file means the same to ssh.
+        """
+        out: List[str] = []
+        in_block = False
+        for line in self.config.original_lines:
+            stripped = line.strip()
+            if not stripped:
+                if out and out[-1] != "":
+                    out.append("")
+                continue
+            indent = "    " if in_block and line[:1].isspace() else ""
+            if stripped.startswith("#"):
+                out.append(indent + stripped)
+                continue
+            m = _OPTION_RE.match(stripped)
+            if m and m.group(1).lower() in ("host", "match"):
+                if out and out[-1] != "" and not out[-1].startswith("#"):
+                    out.append("")
+                value = " ".join(m.group(2).split()) if m.group(1).lower() == "host" else m.group(2)
+                out.append(f"{m.group(1).capitalize()} {value}")
+                in_block = True
+                continue
+            indent = "    " if in_block else ""
+            out.append(indent + (f"{m.group(1)} {m.group(2)}" if m else stripped))
+        while out and out[-1] == "":
+            out.pop()
+        return "\n".join(out) + "\n"
+
+    def _changed_lines(self) -> List[str]:
+        lines = self.config.original_lines
+        current = {host.start_line: host for host in self.config.hosts if host.start_line >= 0}
+        starts = [idx for idx, line in enumerate(lines) if line.strip().lower().startswith("host ")]
+        # Edits are recorded against the original line numbers and applied in one pass
+        replaced: Dict[int, List[str]] = {}
+        inserted_before: Dict[int, List[str]] = {}
+        inserted_after: Dict[int, List[str]] = {}
+
+        for number, start in enumerate(starts):
+            end = starts[number + 1] - 1 if number + 1 < len(starts) else len(lines) - 1
+            found = _option_lines(lines, start, end)
+            host = current.get(start)
+            if host is None:
+                # Removed: the Host line through its last option; later comments and Includes stay
+                last = found[-1][0] if found else start
+                for idx in range(start, last + 1):
+                    replaced[idx] = []
+                if last + 1 < len(lines) and not lines[last + 1].strip() and (start == 0 or not lines[start - 1].strip()):
+                    replaced[last + 1] = []
+                continue
+
+            patterns = lines[start].strip().split(None, 1)[1].split()
+            if host.patterns != patterns:
+                host_line = lines[start]
+                replaced[start] = [host_line[:len(host_line) - len(host_line.lstrip())] + f"Host {' '.join(host.patterns)}"]
+
+            positions = [idx for idx, _opt in found]
+            old = [opt for _idx, opt in found]
+            matcher = difflib.SequenceMatcher(None, old, host.options, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == "equal":
+                    continue
+                new_lines = [str(opt) for opt in host.options[j1:j2]]
+                if i1 < i2:
+                    replaced[positions[i1]] = new_lines
+                    for idx in positions[i1 + 1:i2]:
+                        replaced[idx] = []
+                elif i1 < len(positions):
+                    inserted_before.setdefault(positions[i1], []).extend(new_lines)
+                else:
+                    inserted_after.setdefault(positions[-1] if positions else start, []).extend(new_lines)
 
+        out: List[str] = []
+        for idx, line in enumerate(lines):
+            out.extend(inserted_before.get(idx, ()))
+            out.extend(replaced.get(idx, [line]))
+            out.extend(inserted_after.get(idx, ()))
+        for host in self.config.hosts:
+            if host.start_line < 0:
+                if out and out[-1].strip():
+                    out.append("")
+                out.extend(host.to_lines())
+        return out
+
+    def _write_content(self, content: str, backup: bool) -> None:
         if self.config_path.exists():
             try:
                 with self.config_path.open("r", encoding="utf-8") as f:
@@ -188,15 +475,7 @@ class SSHConfigParser:
                     errors.append(f"Duplicate host alias: {pat}")
                 else:
                     seen[pat] = host
-        for host in self.config.hosts:
-            port = host.get_option("Port")
-            if port:
-                try:
-                    p = int(port)
-                    if p < 1 or p > 65535:
-                        errors.append(f"Invalid port for host {host.patterns[0]}: {port}")
-                except ValueError:
-                    errors.append(f"Port is not an integer for host {host.patterns[0]}: {port}")
+        errors.extend(validate_hosts(self.config.hosts))
         for host in self.config.hosts:
             ident = host.get_option("IdentityFile")
             if ident:
@@ -207,6 +486,10 @@ class SSHConfigParser:
                     errors.append(f"IdentityFile not found for host {host.patterns[0]}: {ident}")
         return errors
 
+    def warnings(self) -> List[str]:
+        """Problems ssh tolerates, such as unknown keywords; validate() reports the rest."""
+        return unknown_keywords(self.config.hosts, self.config.global_options)
+
     def _parse_main_lines(self, lines: List[str]) -> None:
         self.config.hosts.clear()
         self.config.global_options.clear()
@@ -257,22 +540,21 @@ class SSHConfigParser:
 
     def _resolve_includes(self) -> None:
         resolved: Dict[Path, List[str]] = {}
-        base_dir = self.config_path.parent
-        for pattern in self.config.include_directives:
-            expanded = os.path.expanduser(pattern)
-            if not os.path.isabs(expanded):
-                expanded = str(base_dir / expanded)
-            for path_str in glob.glob(expanded, recursive=True):
-                p = Path(path_str)
-                try:
-                    with p.open("r", encoding="utf-8") as f:
-                        resolved[p] = f.readlines()
-                except Exception:
-                    # Failed to read include, gracefully ignore
-                    continue
+        for path_str in expand_includes(self.config_path, self.config.include_directives):
+            p = Path(path_str)
+            try:
+                with p.open("r", encoding="utf-8") as f:
+                    resolved[p] = f.readlines()
+            except Exception:
+                # Failed to read include, gracefully ignore
+                continue
         self.config.includes_resolved = resolved
 
     def _backup_file(self) -> None:
+        # Only writes back up; the command line reads far more often than it writes
+        import shutil
+        from datetime import datetime
+
         ts = datetime.now().strftime("%Y%m%d-%H%M%S")
         if self.backup_dir:
             target_dir = Path(self.backup_dir).expanduser()
@@ -289,6 +571,10 @@ class SSHConfigParser:
         except Exception as e:
             logger.warning("Failed to create backup: %s", e)
 
+    def generate(self) -> str:
+        """The file content write() would produce for the current hosts."""
+        return self._generate_content()
+
     def _generate_content(self) -> str:
         lines: List[str] = []
         for opt in self.config.global_options:
@@ -296,9 +582,7 @@ class SSHConfigParser:
         if self.config.global_options and (not lines or lines[-1] != ""):
             lines.append("")
         for host in self.config.hosts:
-            lines.append(f"Host {' '.join(host.patterns)}")
-            for opt in host.options:
-                lines.append(str(opt))
+            lines.extend(host.to_lines())
             lines.append("")
         while lines and lines[-1] == "":
             lines.pop()
@@ -0,0 +1,360 @@
+"""Schema of OpenSSH client keywords and the validators for their values."""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Tokens accepted after "%" in path-like ssh_config values (ssh_config(5), TOKENS)
+PERCENT_TOKENS = frozenset("%CdfHhIijKkLlnprTtu")
+
+LOG_LEVELS = ("QUIET", "FATAL", "ERROR", "INFO", "VERBOSE", "DEBUG", "DEBUG1", "DEBUG2", "DEBUG3")
+SYSLOG_FACILITIES = ("DAEMON", "USER", "AUTH", "LOCAL0", "LOCAL1", "LOCAL2", "LOCAL3",
+                     "LOCAL4", "LOCAL5", "LOCAL6", "LOCAL7")
+
+
+@dataclass(frozen=True)
+class Keyword:
+    """One ssh_config keyword.
+
+    kind names the value type; alternatives are separated by "|" and a value
+    is valid when any of them accepts it. choices lists the words accepted by
+    an "enum" kind, minimum/maximum bound an "int" kind.
+    """
+    name: str
+    kind: str
+    choices: Tuple[str, ...] = ()
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+
+
+_SCHEMA = (
+    Keyword("AddKeysToAgent", "enum|duration|string", ("yes", "no", "ask", "confirm")),
+    Keyword("AddressFamily", "enum", ("any", "inet", "inet6")),
+    Keyword("BatchMode", "flag"),
+    Keyword("BindAddress", "string"),
+    Keyword("BindInterface", "string"),
+    Keyword("CanonicalDomains", "string"),
+    Keyword("CanonicalizeFallbackLocal", "flag"),
+    Keyword("CanonicalizeHostname", "enum", ("yes", "no", "always", "none")),
+    Keyword("CanonicalizeMaxDots", "int", minimum=0),
+    Keyword("CanonicalizePermittedCNAMEs", "list"),
+    Keyword("CASignatureAlgorithms", "list"),
+    Keyword("CertificateFile", "path"),
+    Keyword("ChannelTimeout", "string"),
+    Keyword("CheckHostIP", "flag"),
+    Keyword("Ciphers", "list"),
+    Keyword("ClearAllForwardings", "flag"),
+    Keyword("Compression", "flag"),
+    Keyword("ConnectionAttempts", "int", minimum=1),
+    Keyword("ConnectTimeout", "duration"),
+    Keyword("ControlMaster", "enum", ("yes", "no", "ask", "auto", "autoask")),
+    Keyword("ControlPath", "enum|path", ("none",)),
+    Keyword("ControlPersist", "enum|duration", ("yes", "no")),
+    Keyword("DynamicForward", "forward"),
+    Keyword("EnableEscapeCommandline", "flag"),
+    Keyword("EnableSSHKeysign", "flag"),
+    Keyword("EscapeChar", "string"),
+    Keyword("ExitOnForwardFailure", "flag"),
+    Keyword("FingerprintHash", "enum", ("md5", "sha256")),
+    Keyword("ForkAfterAuthentication", "flag"),
+    Keyword("ForwardAgent", "flag|path"),
+    Keyword("ForwardX11", "flag"),
+    Keyword("ForwardX11Timeout", "duration"),
+    Keyword("ForwardX11Trusted", "flag"),
+    Keyword("GatewayPorts", "flag"),
+    Keyword("GlobalKnownHostsFile", "path"),
+    Keyword("GSSAPIAuthentication", "flag"),
+    Keyword("GSSAPIDelegateCredentials", "flag"),
+    Keyword("HashKnownHosts", "flag"),
+    Keyword("Host", "string"),
+    Keyword("HostbasedAcceptedAlgorithms", "list"),
+    Keyword("HostbasedAuthentication", "flag"),
+    Keyword("HostKeyAlgorithms", "list"),
+    Keyword("HostKeyAlias", "string"),
+    Keyword("HostName", "path"),
+    Keyword("IdentitiesOnly", "flag"),
+    Keyword("IdentityAgent", "enum|path", ("none", "SSH_AUTH_SOCK")),
+    Keyword("IdentityFile", "path"),
+    Keyword("IgnoreUnknown", "list"),
+    Keyword("Include", "path"),
+    Keyword("IPQoS", "string"),
+    Keyword("KbdInteractiveAuthentication", "flag"),
+    Keyword("KbdInteractiveDevices", "list"),
+    Keyword("KexAlgorithms", "list"),
+    Keyword("KnownHostsCommand", "string"),
+    Keyword("LocalCommand", "string"),
+    Keyword("LocalForward", "forward"),
+    Keyword("LogLevel", "enum", LOG_LEVELS),
+    Keyword("LogVerbose", "string"),
+    Keyword("MACs", "list"),
+    Keyword("Match", "string"),
+    Keyword("NoHostAuthenticationForLocalhost", "flag"),
+    Keyword("NumberOfPasswordPrompts", "int", minimum=0),
+    Keyword("ObscureKeystrokeTiming", "string"),
+    Keyword("PasswordAuthentication", "flag"),
+    Keyword("PermitLocalCommand", "flag"),
+    Keyword("PermitRemoteOpen", "string"),
+    Keyword("PKCS11Provider", "enum|path", ("none",)),
+    Keyword("Port", "port"),
+    Keyword("PreferredAuthentications", "list"),
+    Keyword("ProxyCommand", "string"),
+    Keyword("ProxyJump", "string"),
+    Keyword("ProxyUseFdpass", "flag"),
+    Keyword("PubkeyAcceptedAlgorithms", "list"),
+    Keyword("PubkeyAuthentication", "enum", ("yes", "no", "unbound", "host-bound")),
+    Keyword("RekeyLimit", "string"),
+    Keyword("RemoteCommand", "string"),
+    Keyword("RemoteForward", "forward"),
+    Keyword("RequestTTY", "enum", ("yes", "no", "force", "auto")),
+    Keyword("RequiredRSASize", "int", minimum=1024),
+    Keyword("RevokedHostKeys", "path"),
+    Keyword("SecurityKeyProvider", "path"),
+    Keyword("SendEnv", "string"),
+    Keyword("ServerAliveCountMax", "int", minimum=0),
+    Keyword("ServerAliveInterval", "duration"),
+    Keyword("SessionType", "enum", ("none", "subsystem", "default")),
+    Keyword("SetEnv", "string"),
+    Keyword("StdinNull", "flag"),
+    Keyword("StreamLocalBindMask", "string"),
+    Keyword("StreamLocalBindUnlink", "flag"),
+    Keyword("StrictHostKeyChecking", "enum", ("yes", "no", "ask", "accept-new", "off")),
+    Keyword("SyslogFacility", "enum", SYSLOG_FACILITIES),
+    Keyword("Tag", "string"),
+    Keyword("TCPKeepAlive", "flag"),
+    Keyword("Tunnel", "enum", ("yes", "no", "point-to-point", "ethernet")),
+    Keyword("TunnelDevice", "string"),
+    Keyword("UpdateHostKeys", "enum", ("yes", "no", "ask")),
+    Keyword("User", "string"),
+    Keyword("UserKnownHostsFile", "path"),
+    Keyword("VerifyHostKeyDNS", "enum", ("yes", "no", "ask")),
+    Keyword("VisualHostKey", "flag"),
+    Keyword("XAuthLocation", "path"),
+    # Deprecated names that ssh still accepts, and keywords of widely shipped
+    # ssh builds (UseKeychain on macOS, GSSAPIKeyExchange in distribution patches)
+    Keyword("ChallengeResponseAuthentication", "flag"),
+    Keyword("GSSAPIKeyExchange", "flag"),
+    Keyword("PubkeyAcceptedKeyTypes", "list"),
+    Keyword("UseKeychain", "flag"),
+)
+
+KEYWORDS: Dict[str, Keyword] = {kw.name.lower(): kw for kw in _SCHEMA}
+
+_DURATION_RE = re.compile(r"^(\d+[sSmMhHdDwW]?)+$")
+_PERCENT_RE = re.compile(r"%(.?)")
+_PORT_RE = re.compile(r"^\d+$")
+_HOST_PORT_RE = re.compile(r"^(\[[^\]]+\]|[^:\s]*):(\d+)$")
+_BIND_PORT_RE = re.compile(r"^(?:(\[[^\]]+\]|[^\s]*):)?(\d+)$")
+
+
+def _check_port_number(text: str) -> Optional[str]:
+    if not _PORT_RE.match(text):
+        return "Port is not an integer"
+    if not 1 <= int(text) <= 65535:
+        return "Port must be between 1 and 65535"
+    return None
+
+
+# readconf accepts true and false wherever it accepts yes and no
+_YES_NO_ALIASES = {"yes": "true", "no": "false"}
+
+
+def _check_flag(value: str) -> Optional[str]:
+    if value.lower() in ("yes", "no", "true", "false"):
+        return None
+    return "Expected yes or no"
+
+
+def _check_duration(value: str) -> Optional[str]:
+    if _DURATION_RE.match(value):
+        return None
+    return "Expected a time interval such as 30, 10m or 1h30m"
+
+
+def _check_path(value: str) -> Optional[str]:
+    for match in _PERCENT_RE.finditer(value):
+        token = match.group(1)
+        if token not in PERCENT_TOKENS:
+            return f"Unknown token %{token}" if token else "Dangling % at end of value"
+    return None
+
+
+def _check_forward_endpoint(text: str, need_host: bool) -> Optional[str]:
+    if text.startswith("/") or text.startswith("~"):
+        return None
+    match = (_HOST_PORT_RE if need_host else _BIND_PORT_RE).match(text)
+    if not match:
+        return f"Expected {'host:port' if need_host else '[bind_address:]port'} or a socket path"
+    return _check_port_number(match.group(2))
+
+
+def _check_string(value: str) -> Optional[str]:
+    return None if value.strip() else "Value is empty"
+
+
+def _check_list(value: str) -> Optional[str]:
+    items = value.split(",")
+    if any(not item.strip() for item in items):
+        return "List contains an empty item"
+    return None
+
+
+def _compile_kind(keyword: Keyword, kind: str) -> Callable[[str], Optional[str]]:
+    if kind == "flag":
+        return _check_flag
+    if kind == "enum":
+        allowed = {choice.lower() for choice in keyword.choices}
+        allowed |= {alias for word, alias in _YES_NO_ALIASES.items() if word in allowed}
+        expected = ", ".join(keyword.choices)
+
+        def check_enum(value: str) -> Optional[str]:
+            return None if value.lower() in allowed else f"Expected one of: {expected}"
+        return check_enum
+    if kind == "int":
+        minimum, maximum = keyword.minimum, keyword.maximum
+
+        def check_int(value: str) -> Optional[str]:
+            if not _PORT_RE.match(value):
+                return "Expected a whole number"
+            number = int(value)
+            if minimum is not None and number < minimum:
+                return f"Must be at least {minimum}"
+            if maximum is not None and number > maximum:
+                return f"Must be at most {maximum}"
+            return None
+        return check_int
+    if kind == "port":
+        return _check_port_number
+    if kind == "duration":
+        return _check_duration
+    if kind == "path":
+        return _check_path
+    if kind == "list":
+        return _check_list
+    if kind == "forward":
+        # DynamicForward takes a single bind spec, Local/RemoteForward may add a target
+        single = keyword.name == "DynamicForward"
+
+        def check_forward(value: str) -> Optional[str]:
+            parts = value.split()
+            if single or (keyword.name == "RemoteForward" and len(parts) == 1):
+                if len(parts) != 1:
+                    return "Expected [bind_address:]port"
+                return _check_forward_endpoint(parts[0], need_host=False)
+            if len(parts) != 2:
+                return "Expected [bind_address:]port host:hostport"
+            return (_check_forward_endpoint(parts[0], need_host=False)
+                    or _check_forward_endpoint(parts[1], need_host=True))
+        return check_forward
+    return _check_string
+
+
+def _compile(keyword: Keyword) -> Callable[[str], Optional[str]]:
+    checks = [_compile_kind(keyword, kind) for kind in keyword.kind.split("|")]
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_any(value: str) -> Optional[str]:
+        first_error = None
+        for check in checks:
+            error = check(value)
+            if error is None:
+                return None
+            first_error = first_error or error
+        return first_error
+    return check_any
+
+
+# Validators are built once at import time and shared by the editor and the parser
+VALIDATORS: Dict[str, Callable[[str], Optional[str]]] = {
+    name: _compile(keyword) for name, keyword in KEYWORDS.items()
+}
+
+
+def lookup(key: str) -> Optional[Keyword]:
+    return KEYWORDS.get(key.lower())
+
+
+def keyword_names() -> List[str]:
+    return [kw.name for kw in _SCHEMA]
+
+
+def validate_option(key: str, value: str) -> Optional[str]:
+    """Return an error message for one option, or None when it is valid.
+
+    The values of unknown keywords are not checked; unknown_keywords()
+    reports the keywords themselves, as warnings.
+    """
+    validator = VALIDATORS.get(key.lower())
+    if validator is None:
+        return None
+    value = value.strip()
+    if not value:
+        return "Value is empty"
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return validator(value)
+
+
+def validate_hosts(hosts: Iterable) -> List[str]:
+    """Validate every option of every host in a single pass.
+
+    Each distinct (keyword, value) pair is checked once, so repeated values
+    across a large config cost a dictionary lookup rather than a validation.
+    """
+    errors: List[str] = []
+    results: Dict[Tuple[str, str], Optional[str]] = {}
+    for host in hosts:
+        name = host.patterns[0] if host.patterns else "?"
+        for opt in host.options:
+            pair = (opt.key.lower(), opt.value)
+            if pair not in results:
+                results[pair] = validate_option(opt.key, opt.value)
+            error = results[pair]
+            if error is not None:
+                errors.append(f"{error} for host {name}: {opt.key} {opt.value}")
+    return errors
+
+
+def ignored_keywords(options: Iterable) -> List[str]:
+    """The patterns of the IgnoreUnknown options among options."""
+    patterns: List[str] = []
+    for opt in options:
+        if opt.key.lower() == "ignoreunknown":
+            patterns += [item.strip().lower() for item in opt.value.strip('"').split(",") if item.strip()]
+    return patterns
+
+
+def _is_ignored(key: str, patterns: List[str]) -> bool:
+    name = key.lower()
+    matched = False
+    for pattern in patterns:
+        negated = pattern.startswith("!")
+        if fnmatch.fnmatchcase(name, pattern[1:] if negated else pattern):
+            if negated:
+                return False
+            matched = True
+    return matched
+
+
+def unknown_keywords(hosts: Iterable, global_options: Iterable = ()) -> List[str]:
+    """Warnings for keywords missing from the schema, as ssh would report them.
+
+    Keywords matched by IgnoreUnknown, set globally or in the host's own
+    block, are left out: ssh skips those instead of failing.
+    """
+    warnings: List[str] = []
+    ignored = ignored_keywords(global_options)
+    for host in hosts:
+        name = host.patterns[0] if host.patterns else "?"
+        patterns = None
+        for opt in host.options:
+            if opt.key.lower() in KEYWORDS:
+                continue
+            if patterns is None:
+                patterns = ignored + ignored_keywords(host.options)
+            if not _is_ignored(opt.key, patterns):
+                warnings.append(f"Unknown option for host {name}: {opt.key}")
+    return warnings
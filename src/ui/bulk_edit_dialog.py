@@ -0,0 +1,85 @@
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import Gtk, GObject, Adw
+from gettext import gettext as _
+
+try:
+	from ssh_config_studio.bulk_edit import (
+		ACTIONS, BulkEdit, SET_OPTION, REPLACE_VALUE, REMOVE_OPTION, RENAME_PATTERN,
+	)
+except ImportError:
+	from bulk_edit import (
+		ACTIONS, BulkEdit, SET_OPTION, REPLACE_VALUE, REMOVE_OPTION, RENAME_PATTERN,
+	)
+
+# Entries shown for each action
+_FIELDS = {
+    SET_OPTION: ("key", "value"),
+    REPLACE_VALUE: ("key", "pattern", "replacement"),
+    REMOVE_OPTION: ("key",),
+    RENAME_PATTERN: ("pattern", "replacement"),
+}
+
+
+@Gtk.Template(resource_path="/com/sshconfigstudio/app/ui/bulk_edit_dialog.ui")
+class BulkEditDialog(Adw.Window):
+    """Collects one bulk edit for the hosts selected in the list."""
+
+    __gtype_name__ = "BulkEditDialog"
+
+    cancel_button = Gtk.Template.Child()
+    apply_button = Gtk.Template.Child()
+    summary_group = Gtk.Template.Child()
+    action_row = Gtk.Template.Child()
+    key_entry = Gtk.Template.Child()
+    value_entry = Gtk.Template.Child()
+    pattern_entry = Gtk.Template.Child()
+    replacement_entry = Gtk.Template.Child()
+    error_label = Gtk.Template.Child()
+
+    __gsignals__ = {
+        'edit-requested': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+    }
+
+    def __init__(self, parent, host_count: int):
+        super().__init__(transient_for=parent, modal=True)
+        self.summary_group.set_description(_(f"Applies to {host_count} selected hosts"))
+        self.cancel_button.connect("clicked", lambda b: self.close())
+        self.apply_button.connect("clicked", self._on_apply_clicked)
+        self.action_row.connect("notify::selected", self._on_action_changed)
+        self._on_action_changed(self.action_row, None)
+
+    def _action(self) -> str:
+        index = self.action_row.get_selected()
+        return ACTIONS[index] if index < len(ACTIONS) else SET_OPTION
+
+    def _on_action_changed(self, row, _pspec):
+        fields = _FIELDS[self._action()]
+        self.key_entry.set_visible("key" in fields)
+        self.value_entry.set_visible("value" in fields)
+        self.pattern_entry.set_visible("pattern" in fields)
+        self.replacement_entry.set_visible("replacement" in fields)
+        self.error_label.set_visible(False)
+
+    def get_edit(self) -> BulkEdit:
+        return BulkEdit(
+            action=self._action(),
+            key=self.key_entry.get_text(),
+            value=self.value_entry.get_text(),
+            pattern=self.pattern_entry.get_text(),
+            replacement=self.replacement_entry.get_text(),
+        )
+
+    def show_error(self, message: str):
+        self.error_label.set_text(message)
+        self.error_label.set_visible(True)
+
+    def _on_apply_clicked(self, button):
+        edit = self.get_edit()
+        try:
+            edit.validate()
+        except ValueError as e:
+            self.show_error(str(e))
+            return
+        self.emit("edit-requested", edit)
@@ -0,0 +1,123 @@
+import gi
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, Gdk
+
+
+class CompletionPopover(Gtk.Popover):
+    """Suggestion list shown under an editable while the user types.
+
+    provider is called with the text being completed and returns the
+    suggestions. With a separator only the last separated segment is
+    completed, as needed for comma separated ProxyJump chains.
+    """
+
+    __gtype_name__ = "CompletionPopover"
+
+    MAX_ROWS = 8
+
+    def __init__(self, editable, provider, separator=None):
+        super().__init__()
+        self._editable = editable
+        self._provider = provider
+        self._separator = separator
+        self._inserting = False
+        self._has_focus = False
+
+        self.set_autohide(False)
+        self.set_has_arrow(False)
+        self.set_position(Gtk.PositionType.BOTTOM)
+        self.set_halign(Gtk.Align.START)
+
+        self._list_box = Gtk.ListBox()
+        self._list_box.set_selection_mode(Gtk.SelectionMode.BROWSE)
+        # Clicking a suggestion must not steal focus from the editable
+        self._list_box.set_focusable(False)
+        self._list_box.connect("row-activated", self._on_row_activated)
+        self.set_child(self._list_box)
+        self.set_parent(editable)
+
+        editable.connect("changed", self._on_changed)
+        editable.connect("destroy", self._on_editable_destroy)
+
+        focus = Gtk.EventControllerFocus.new()
+        focus.connect("enter", self._on_focus_enter)
+        focus.connect("leave", self._on_focus_leave)
+        editable.add_controller(focus)
+
+        keys = Gtk.EventControllerKey.new()
+        keys.set_propagation_phase(Gtk.PropagationPhase.CAPTURE)
+        keys.connect("key-pressed", self._on_key_pressed)
+        editable.add_controller(keys)
+
+    def _segment(self):
+        text = self._editable.get_text()
+        if self._separator and self._separator in text:
+            head, _sep, tail = text.rpartition(self._separator)
+            return head + self._separator, tail.lstrip()
+        return "", text
+
+    def _on_changed(self, editable):
+        # Programmatic loads happen without focus and never open the popover
+        if self._inserting or not self._has_focus:
+            return
+        _head, prefix = self._segment()
+        suggestions = [s for s in self._provider(prefix) if s != prefix] if prefix else []
+        self._show(suggestions[:self.MAX_ROWS])
+
+    def _show(self, suggestions):
+        self._list_box.remove_all()
+        if not suggestions:
+            self.popdown()
+            return
+        for suggestion in suggestions:
+            label = Gtk.Label(label=suggestion, xalign=0)
+            row = Gtk.ListBoxRow()
+            row.set_child(label)
+            row.set_focusable(False)
+            row.suggestion = suggestion
+            self._list_box.append(row)
+        self._list_box.select_row(self._list_box.get_row_at_index(0))
+        self.popup()
+
+    def _accept(self, row):
+        head, _prefix = self._segment()
+        self._inserting = True
+        try:
+            self._editable.set_text(head + row.suggestion)
+            self._editable.set_position(-1)
+        finally:
+            self._inserting = False
+        self.popdown()
+
+    def _on_row_activated(self, list_box, row):
+        self._accept(row)
+        self._editable.grab_focus()
+
+    def _on_key_pressed(self, controller, keyval, keycode, state):
+        if not self.get_visible():
+            return False
+        selected = self._list_box.get_selected_row()
+        if keyval in (Gdk.KEY_Down, Gdk.KEY_Up):
+            index = selected.get_index() if selected else -1
+            index += 1 if keyval == Gdk.KEY_Down else -1
+            row = self._list_box.get_row_at_index(max(0, index))
+            if row is not None:
+                self._list_box.select_row(row)
+            return True
+        if keyval in (Gdk.KEY_Return, Gdk.KEY_KP_Enter, Gdk.KEY_Tab) and selected is not None:
+            self._accept(selected)
+            return True
+        if keyval == Gdk.KEY_Escape:
+            self.popdown()
+            return True
+        return False
+
+    def _on_focus_enter(self, controller):
+        self._has_focus = True
+
+    def _on_focus_leave(self, controller):
+        self._has_focus = False
+        self.popdown()
+
+    def _on_editable_destroy(self, editable):
+        self.unparent()
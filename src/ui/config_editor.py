@@ -0,0 +1,330 @@
+import gi
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, GObject, Pango
+from gettext import gettext as _
+from bisect import bisect_right
+
+try:
+	from ssh_config_studio.ssh_config_parser import SSHHost
+	from ssh_config_studio.config_journal import ReplaceHostState
+except ImportError:
+	from ssh_config_parser import SSHHost
+	from config_journal import ReplaceHostState
+from .frame_scheduler import FrameScheduler
+
+
+class _Block:
+    """A Host block of the buffer: its first line and the host it edits."""
+    __slots__ = ("start", "host")
+
+    def __init__(self, start: int, host: SSHHost):
+        self.start = start
+        self.host = host
+
+
+def _is_host_line(line: str) -> bool:
+    return line.strip().lower().startswith("host ")
+
+
+def _is_match_line(line: str) -> bool:
+    return line.strip().lower().startswith("match ")
+
+
+def _is_include_line(line: str) -> bool:
+    return line.strip().lower().startswith("include ")
+
+
+@Gtk.Template(resource_path="/com/sshconfigstudio/app/ui/config_editor.ui")
+class ConfigEditor(Gtk.Box):
+    """Raw editor for the whole configuration file.
+
+    Only the Host blocks touched by an edit are parsed again, through
+    SSHHost.from_raw_lines, and their hosts are updated in place. Edits that
+    add, remove or merge Host lines, or that touch the global options before
+    the first Host, rebuild the whole configuration instead, as one undoable
+    step. Syntax and diff highlighting only cover the visible lines plus a
+    margin.
+
+    Match blocks are not modelled: the parser keeps a Match line and the
+    options under it in the Host block above. A block holding a Match line is
+    therefore always parsed in full, and the line is marked as unsupported.
+    """
+
+    __gtype_name__ = "ConfigEditor"
+
+    save_button = Gtk.Template.Child()
+    scrolled_window = Gtk.Template.Child()
+    text_view = Gtk.Template.Child()
+
+    __gsignals__ = {
+        'host-changed': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+        'config-reparsed': (GObject.SignalFlags.RUN_LAST, None, ()),
+        'config-save': (GObject.SignalFlags.RUN_LAST, None, ()),
+    }
+
+    # Lines highlighted above and below the visible area
+    HIGHLIGHT_MARGIN = 100
+
+    def __init__(self):
+        super().__init__()
+        self.parser = None
+        self._blocks = []
+        self._dirty_blocks = {}
+        self._structure_changed = False
+        self._original_lines = {}
+        self._loading = False
+        self._highlight_on_map = False
+
+        self.buffer = self.text_view.get_buffer()
+        self.buffer.create_tag("header", weight=700)
+        self.buffer.create_tag("keyword", foreground="#1c71d8")
+        self.buffer.create_tag("comment", foreground="#77767b", style=Pango.Style.ITALIC)
+        self.buffer.create_tag("added", background="#aaffaa", foreground="black")
+        self.buffer.create_tag("changed", background="#ffffaa", foreground="black")
+        self.buffer.create_tag("unsupported", underline=Pango.Underline.ERROR)
+        self._tag_names = ("header", "keyword", "comment", "added", "changed", "unsupported")
+
+        self._scheduler = FrameScheduler(self, [
+            ("reparse", self._reparse_stage),
+            ("highlight", self._highlight_stage),
+        ])
+        self.buffer.connect("insert-text", self._on_insert_text)
+        self.buffer.connect("delete-range", self._on_delete_range)
+        vadjustment = self.scrolled_window.get_vadjustment()
+        vadjustment.connect("value-changed", lambda adj: self._scheduler.mark("highlight"))
+        vadjustment.connect("changed", lambda adj: self._scheduler.mark("highlight"))
+        self.save_button.connect("clicked", self._on_save_clicked)
+        self.text_view.set_has_tooltip(True)
+        self.text_view.connect("query-tooltip", self._on_query_tooltip)
+        self.connect("map", self._on_map)
+
+    def load(self, parser):
+        """Show the configuration held by parser, as it would be written."""
+        self.parser = parser
+        config = parser.config
+        lines = [str(opt) for opt in config.global_options]
+        if lines:
+            lines.append("")
+        self._blocks = []
+        for host in config.hosts:
+            self._blocks.append(_Block(len(lines), host))
+            lines.extend(host.to_lines())
+            lines.append("")
+        while lines and lines[-1] == "":
+            lines.pop()
+        lines.extend(f"Include {inc}" for inc in config.include_directives)
+
+        # Diff highlighting compares each block with the lines its host was loaded
+        # with; keyed by patterns so the baseline survives a full re-parse
+        self._original_lines = {
+            tuple(host.patterns): frozenset(host.to_lines()) for host in config.hosts
+        }
+        self._dirty_blocks.clear()
+        self._structure_changed = False
+        self._scheduler.cancel()
+        self._loading = True
+        try:
+            self.buffer.set_text("\n".join(lines))
+        finally:
+            self._loading = False
+        self._highlight_on_map = False
+        self.buffer.place_cursor(self.buffer.get_start_iter())
+        self._scheduler.mark("highlight")
+
+    def flush(self):
+        """Apply edits still waiting for the next frame to the model."""
+        self._scheduler.flush()
+
+    def _block_index_at(self, line: int) -> int:
+        """Index of the block containing line, or -1 for the lines before the first Host."""
+        return bisect_right(self._blocks, line, key=lambda block: block.start) - 1
+
+    def _mark_line_dirty(self, line: int):
+        index = self._block_index_at(line)
+        if index < 0:
+            self._structure_changed = True
+        else:
+            block = self._blocks[index]
+            self._dirty_blocks[id(block)] = block
+
+    def _shift_blocks(self, after: int, delta: int):
+        for index in range(self._block_index_at(after) + 1, len(self._blocks)):
+            self._blocks[index].start += delta
+
+    def _on_insert_text(self, buffer, location, text, length):
+        if self._loading:
+            return
+        line = location.get_line()
+        newlines = text.count("\n")
+        # Text typed in front of a Host line belongs to the block above it
+        if location.starts_line() and line > 0:
+            self._mark_line_dirty(line - 1)
+        self._mark_line_dirty(line)
+        if newlines:
+            self._shift_blocks(line - 1 if location.starts_line() else line, newlines)
+        self._scheduler.mark("reparse", "highlight")
+
+    def _on_delete_range(self, buffer, start, end):
+        if self._loading:
+            return
+        first, last = start.get_line(), end.get_line()
+        self._mark_line_dirty(first)
+        removed = last - first
+        if removed:
+            lo = self._block_index_at(first) + 1
+            hi = self._block_index_at(last) + 1
+            if hi > lo:
+                # Host lines inside the deleted range disappear or merge
+                self._structure_changed = True
+            self._shift_blocks(last, -removed)
+        self._scheduler.mark("reparse", "highlight")
+
+    def _line_text(self, line: int) -> str:
+        ok, start = self.buffer.get_iter_at_line(line)
+        if not ok:
+            return ""
+        end = start.copy()
+        if not end.ends_line():
+            end.forward_to_line_end()
+        return self.buffer.get_text(start, end, False)
+
+    def _block_lines(self, index: int) -> list[str]:
+        start = self._blocks[index].start
+        if index + 1 < len(self._blocks):
+            end_line = self._blocks[index + 1].start
+            end = self.buffer.get_iter_at_line(end_line)[1]
+        else:
+            end = self.buffer.get_end_iter()
+        begin = self.buffer.get_iter_at_line(start)[1]
+        return self.buffer.get_text(begin, end, False).split("\n")
+
+    def _reparse_stage(self):
+        if self.parser is None:
+            return
+        if not self._structure_changed:
+            for block in list(self._dirty_blocks.values()):
+                if not self._reparse_block(block):
+                    self._structure_changed = True
+                    break
+        self._dirty_blocks.clear()
+        if self._structure_changed:
+            self._reparse_all()
+
+    def _reparse_block(self, block: _Block) -> bool:
+        """Parse one block again; False when its Host line no longer matches the block map."""
+        index = self._blocks.index(block)
+        lines = self._block_lines(index)
+        if not lines or not _is_host_line(lines[0]):
+            return False
+        # A Match line starts a block ssh evaluates on its own; leave it to a full parse
+        if any(_is_host_line(line) or _is_match_line(line) for line in lines[1:]):
+            return False
+        # Include lines are global directives even when they sit inside a block
+        includes = [line.split(None, 1)[1].strip() for line in lines[1:] if _is_include_line(line)]
+        if includes and includes != self.parser.config.include_directives:
+            return False
+        body = [line for line in lines[1:] if not _is_include_line(line)]
+        while body and not body[-1].strip():
+            body.pop()
+        try:
+            parsed = SSHHost.from_raw_lines([lines[0]] + body)
+        except ValueError:
+            return False
+        host = block.host
+        if parsed.patterns == host.patterns and parsed.options == host.options:
+            return True
+        before = host.snapshot()
+        host.patterns = parsed.patterns
+        host.options = parsed.options
+        host.raw_lines = parsed.raw_lines
+        self.parser.config.journal.record(ReplaceHostState(host, before, host.snapshot()), coalesce=True)
+        self.emit("host-changed", host)
+        return True
+
+    def _reparse_all(self):
+        """Rebuild every host from the buffer after an edit changed the block layout.
+
+        The hosts are replaced; the journal records the swap as one step,
+        merged with the previous one while typing.
+        """
+        self._structure_changed = False
+        text = self.buffer.get_text(self.buffer.get_start_iter(), self.buffer.get_end_iter(), False)
+        lines = text.split("\n")
+        self.parser.parse_lines(lines, coalesce=True)
+        host_starts = [index for index, line in enumerate(lines) if _is_host_line(line)]
+        self._blocks = [
+            _Block(start, host) for start, host in zip(host_starts, self.parser.config.hosts)
+        ]
+        self.emit("config-reparsed")
+
+    def _visible_line_range(self):
+        rect = self.text_view.get_visible_rect()
+        top = self.text_view.get_line_at_y(rect.y)[0].get_line()
+        bottom = self.text_view.get_line_at_y(rect.y + rect.height)[0].get_line()
+        last = self.buffer.get_line_count() - 1
+        return max(0, top - self.HIGHLIGHT_MARGIN), min(last, bottom + self.HIGHLIGHT_MARGIN)
+
+    def _highlight_stage(self):
+        if not self.get_mapped():
+            # Without an allocation there is no viewport; highlight once shown
+            self._highlight_on_map = True
+            return
+        first, last = self._visible_line_range()
+        range_start = self.buffer.get_iter_at_line(first)[1]
+        range_end = self.buffer.get_iter_at_line(last)[1]
+        range_end.forward_to_line_end()
+        for name in self._tag_names:
+            self.buffer.remove_tag_by_name(name, range_start, range_end)
+
+        block_index = self._block_index_at(first)
+        for line in range(first, last + 1):
+            while block_index + 1 < len(self._blocks) and self._blocks[block_index + 1].start <= line:
+                block_index += 1
+            text = self._line_text(line)
+            stripped = text.strip()
+            if not stripped:
+                continue
+            start = self.buffer.get_iter_at_line(line)[1]
+            end = start.copy()
+            end.forward_to_line_end()
+            if stripped.startswith("#"):
+                self.buffer.apply_tag_by_name("comment", start, end)
+                continue
+            if _is_host_line(text):
+                self.buffer.apply_tag_by_name("header", start, end)
+            elif _is_match_line(text):
+                self.buffer.apply_tag_by_name("header", start, end)
+                self.buffer.apply_tag_by_name("unsupported", start, end)
+            else:
+                indent = len(text) - len(text.lstrip())
+                keyword_end = self.buffer.get_iter_at_line_offset(line, indent + len(stripped.split()[0]))[1]
+                keyword_start = self.buffer.get_iter_at_line_offset(line, indent)[1]
+                self.buffer.apply_tag_by_name("keyword", keyword_start, keyword_end)
+            if block_index >= 0:
+                original = self._original_lines.get(tuple(self._blocks[block_index].host.patterns))
+                if original is None:
+                    self.buffer.apply_tag_by_name("added", start, end)
+                elif text not in original:
+                    self.buffer.apply_tag_by_name("changed", start, end)
+
+    def _on_query_tooltip(self, text_view, x, y, keyboard_mode, tooltip):
+        if keyboard_mode:
+            location = self.buffer.get_iter_at_mark(self.buffer.get_insert())
+        else:
+            bx, by = text_view.window_to_buffer_coords(Gtk.TextWindowType.WIDGET, x, y)
+            found, location = text_view.get_iter_at_location(bx, by)
+            if not found:
+                return False
+        if not _is_match_line(self._line_text(location.get_line())):
+            return False
+        tooltip.set_text(_("Match blocks are not supported: their options count as part of the Host block above"))
+        return True
+
+    def _on_map(self, widget):
+        if self._highlight_on_map:
+            self._highlight_on_map = False
+            self._scheduler.mark("highlight")
+
+    def _on_save_clicked(self, button):
+        self.flush()
+        self.emit("config-save")
@@ -0,0 +1,73 @@
+import gi
+gi.require_version('Gtk', '4.0')
+from gi.repository import GLib
+
+
+class FrameScheduler:
+    """Coalesces pending work for a widget into one pass per frame.
+
+    Callers mark named stages dirty; on the next frame clock tick every dirty
+    stage runs once, in the order the stages were declared. A stage may mark
+    later stages and they run in the same pass. Widgets that are not mapped
+    receive no ticks, so an idle source is used for them instead.
+    """
+
+    def __init__(self, widget, stages):
+        self._widget = widget
+        self._stages = list(stages)
+        self._dirty = set()
+        self._tick_id = None
+        self._idle_id = None
+        self._flushing = False
+
+    def mark(self, *names: str):
+        self._dirty.update(names)
+        if not self._flushing:
+            self._schedule()
+
+    def is_pending(self, name: str) -> bool:
+        return name in self._dirty
+
+    def flush(self):
+        """Run every dirty stage now instead of waiting for the next frame."""
+        self._remove_sources()
+        self._flushing = True
+        try:
+            for name, callback in self._stages:
+                if name in self._dirty:
+                    self._dirty.discard(name)
+                    callback()
+        finally:
+            self._flushing = False
+        if self._dirty:
+            self._schedule()
+
+    def cancel(self):
+        self._remove_sources()
+        self._dirty.clear()
+
+    def _schedule(self):
+        if self._tick_id is not None or self._idle_id is not None:
+            return
+        if self._widget.get_mapped():
+            self._tick_id = self._widget.add_tick_callback(self._on_tick)
+        else:
+            self._idle_id = GLib.idle_add(self._on_idle)
+
+    def _remove_sources(self):
+        if self._tick_id is not None:
+            self._widget.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+        if self._idle_id is not None:
+            GLib.source_remove(self._idle_id)
+            self._idle_id = None
+
+    def _on_tick(self, widget, frame_clock):
+        self._tick_id = None
+        self.flush()
+        return GLib.SOURCE_REMOVE
+
+    def _on_idle(self):
+        self._idle_id = None
+        self.flush()
+        return GLib.SOURCE_REMOVE
@@ -1,17 +1,43 @@
 import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, GObject, Gio, Gdk, GLib, Adw
-import subprocess
-import threading
 
 try:
 	from ssh_config_studio.ssh_config_parser import SSHHost, SSHOption
+	from ssh_config_studio.line_diff import IncrementalLineDiff, ADDED, CHANGED, line_edits
+	from ssh_config_studio.ssh_keywords import lookup, validate_option
+	from ssh_config_studio.completion import KEYWORDS, ALIASES, HOSTNAMES, IDENTITIES
+	from ssh_config_studio.config_journal import ReplaceHostState
 except ImportError:
 	from ssh_config_parser import SSHHost, SSHOption
-import difflib
-import copy
+	from line_diff import IncrementalLineDiff, ADDED, CHANGED, line_edits
+	from ssh_keywords import lookup, validate_option
+	from completion import KEYWORDS, ALIASES, HOSTNAMES, IDENTITIES
+	from config_journal import ReplaceHostState
+from .frame_scheduler import FrameScheduler
+from .completion_popover import CompletionPopover
+
+# Options edited through dedicated fields; everything else is a custom option
+COMMON_OPTIONS = {
+    'HostName', 'User', 'Port', 'IdentityFile', 'ForwardAgent',
+    'ProxyJump', 'ProxyCommand', 'LocalForward', 'RemoteForward'
+}
+
+
+class CustomOptionItem(GObject.Object):
+    """Key/value pair backing one row of the custom options list."""
+
+    __gtype_name__ = "CustomOptionItem"
+
+    key = GObject.Property(type=str, default="")
+    value = GObject.Property(type=str, default="")
+
+    def __init__(self, key: str = "", value: str = ""):
+        super().__init__()
+        self.key = key
+        self.value = value
+
 from gettext import gettext as _
-import os
 
 @Gtk.Template(resource_path="/com/sshconfigstudio/app/ui/host_editor.ui")
 class HostEditor(Gtk.Box):
@@ -43,7 +69,8 @@ class HostEditor(Gtk.Box):
     __gsignals__ = {
         'host-changed': (GObject.SignalFlags.RUN_LAST, None, (object,)),
         'editor-validity-changed': (GObject.SignalFlags.RUN_LAST, None, (bool,)),
-        'host-save': (GObject.SignalFlags.RUN_LAST, None, (object,))
+        'host-save': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+        'connection-tested': (GObject.SignalFlags.RUN_LAST, None, (object, bool))
     }
 
     def __init__(self):
@@ -53,7 +80,22 @@ class HostEditor(Gtk.Box):
         self.current_host = None
         self.is_loading = False
         self._programmatic_raw_update = False
+        self._raw_diff = None
         self._editor_valid = True
+        self._completion_index = None
+        self._journal = None
+        self._tcp_preflight = True
+        self._control_pool = None
+        self._loaded_generation = None
+        # Field and raw edits only mark stages dirty; each runs at most once per frame
+        self._scheduler = FrameScheduler(self, [
+            ("raw-parse", self._parse_raw_stage),
+            ("validate", self._validate_stage),
+            ("model", self._model_stage),
+            ("raw", self._update_raw_text_from_host),
+            ("highlight", self._highlight_raw_diff),
+            ("buttons", self._update_button_sensitivity),
+        ])
         try:
             css = Gtk.CssProvider()
             css.load_from_data(b"""
@@ -65,6 +107,8 @@ class HostEditor(Gtk.Box):
             )
         except Exception:
             pass
+        self._custom_options_store = Gio.ListStore(item_type=CustomOptionItem)
+        self.custom_options_list.bind_model(self._custom_options_store, self._create_custom_option_row)
         self._connect_signals()
 
         self.buffer = self.raw_text_view.get_buffer()
@@ -78,6 +122,41 @@ class HostEditor(Gtk.Box):
     def set_app(self, app):
         self.app = app
 
+    def set_completion_index(self, index):
+        """Use index, a CompletionIndex kept up to date by the window, for suggestions."""
+        self._completion_index = index
+
+    def set_journal(self, journal):
+        """Record edits made in the editor in journal, the configuration's ConfigJournal."""
+        self._journal = journal
+
+    def set_tcp_preflight(self, enabled: bool):
+        """Check the TCP port before starting ssh when testing a connection."""
+        self._tcp_preflight = enabled
+
+    def set_control_pool(self, pool):
+        """Route connection tests through pool, a ControlPool, or through fresh connections when None."""
+        self._control_pool = pool
+
+    def _record_edit(self, before, coalesce: bool = True):
+        """Journal the change of the current host since the before snapshot, if any."""
+        if self._journal is None:
+            return
+        after = self.current_host.snapshot()
+        if after != before:
+            self._journal.record(ReplaceHostState(self.current_host, before, after), coalesce=coalesce)
+
+    def flush(self):
+        """Apply field edits still waiting for the next frame to the host."""
+        self._scheduler.flush()
+
+    def _completion_provider(self, kind):
+        def provide(prefix):
+            if self._completion_index is None:
+                return []
+            return self._completion_index.complete(kind, prefix)
+        return provide
+
     def _show_message(self, message: str):
         """Show a message using toast if app is available, otherwise print to console."""
         if self.app and hasattr(self.app, '_show_toast'):
@@ -100,6 +179,10 @@ class HostEditor(Gtk.Box):
         
         self._raw_changed_handler_id = self.raw_text_view.get_buffer().connect("changed", self._on_raw_text_changed)
 
+        CompletionPopover(self.hostname_entry, self._completion_provider(HOSTNAMES))
+        CompletionPopover(self.identity_entry, self._completion_provider(IDENTITIES))
+        CompletionPopover(self.proxy_jump_entry, self._completion_provider(ALIASES), separator=",")
+
         self._connect_buttons()
 
     def _connect_buttons(self):
@@ -111,9 +194,14 @@ class HostEditor(Gtk.Box):
         self.revert_button.connect("clicked", self._on_revert_clicked)
     
     def load_host(self, host: SSHHost):
+        # Apply edits still pending for the previous host before switching
+        self._scheduler.flush()
         self.is_loading = True
         self.current_host = host
-        self.original_host_state = copy.deepcopy(host)
+        self.original_host_state = host.snapshot() if host else None
+        self._loaded_generation = host.generation if host else None
+        if self._journal is not None:
+            self._journal.seal()
         
         if not host:
             self._clear_all_fields()
@@ -127,7 +215,7 @@ class HostEditor(Gtk.Box):
         self.identity_entry.set_text(host.get_option('IdentityFile') or "")
         
         forward_agent = host.get_option('ForwardAgent')
-        self.forward_agent_switch.set_active(forward_agent == 'yes')
+        self.forward_agent_switch.set_active((forward_agent or "").lower() in ('yes', 'true'))
         
         self.proxy_jump_entry.set_text(host.get_option('ProxyJump') or "")
         self.proxy_cmd_entry.set_text(host.get_option('ProxyCommand') or "")
@@ -137,16 +225,13 @@ class HostEditor(Gtk.Box):
         self._load_custom_options(host)
 
         self.raw_text_view.get_buffer().set_text("\n".join(host.raw_lines))
-        self.original_raw_content = "\n".join(host.raw_lines)
+        self._set_original_raw_content("\n".join(host.raw_lines))
         
         self.is_loading = False
         self.revert_button.set_sensitive(False)
 
-        self._programmatic_raw_update = True
-        try:
-            self._on_raw_text_changed(self.raw_text_view.get_buffer())
-        finally:
-            self._programmatic_raw_update = False
+        self._highlight_raw_diff()
+        self._scheduler.mark("validate")
     
     def _clear_all_fields(self):
         """Clears all input fields and custom options."""
@@ -163,25 +248,42 @@ class HostEditor(Gtk.Box):
         self._clear_custom_options()
     
     def _load_custom_options(self, host: SSHHost):
-        """Loads custom SSH options into the custom options list."""
-        self._clear_custom_options()
-        
-        common_options = {
-            'HostName', 'User', 'Port', 'IdentityFile', 'ForwardAgent',
-            'ProxyJump', 'ProxyCommand', 'LocalForward', 'RemoteForward'
-        }
-        
-        for option in host.options:
-            if option.key not in common_options:
-                self._add_custom_option_row(option.key, option.value)
+        """Loads custom SSH options into the custom options model.
+
+        The model is diffed against the host's options: rows whose key and
+        value are unchanged are left alone, changed rows get new property
+        values, and rows are only created or destroyed when the count changes.
+        """
+        store = self._custom_options_store
+        current = [(store.get_item(i).key, store.get_item(i).value) for i in range(store.get_n_items())]
+        desired = [(opt.key, opt.value) for opt in host.options if opt.key not in COMMON_OPTIONS]
+
+        for start, end, replacement in reversed(line_edits(current, desired)):
+            reused = min(end - start, len(replacement))
+            for offset in range(reused):
+                item = store.get_item(start + offset)
+                key, value = replacement[offset]
+                if item.key != key:
+                    item.key = key
+                if item.value != value:
+                    item.value = value
+            if end - start > reused:
+                store.splice(start + reused, end - start - reused, [])
+            elif len(replacement) > reused:
+                store.splice(start + reused, 0, [CustomOptionItem(k, v) for k, v in replacement[reused:]])
     
     def _clear_custom_options(self):
         """Clears all custom option rows from the list."""
-        while self.custom_options_list.get_first_child():
-            self.custom_options_list.remove(self.custom_options_list.get_first_child())
+        self._custom_options_store.remove_all()
+
+    def _custom_option_rows(self):
+        for index in range(self._custom_options_store.get_n_items()):
+            row = self.custom_options_list.get_row_at_index(index)
+            if row is not None:
+                yield row
     
-    def _add_custom_option_row(self, key: str = "", value: str = ""):
-        """Adds a new row for a custom option to the list."""
+    def _create_custom_option_row(self, item: CustomOptionItem):
+        """Builds the row widget for a custom option item of the model."""
         container_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         container_box.set_margin_start(12)
         container_box.set_margin_end(12)
@@ -197,14 +299,13 @@ class HostEditor(Gtk.Box):
         entry_box.set_hexpand(True)
         
         key_entry = Gtk.Entry()
-        key_entry.set_text(key)
         key_entry.set_placeholder_text("Option name")
         key_entry.set_size_request(140, -1)
         key_entry.add_css_class("custom-option-key")
+        CompletionPopover(key_entry, self._completion_provider(KEYWORDS))
         entry_box.append(key_entry)
         
         value_entry = Gtk.Entry()
-        value_entry.set_text(value)
         value_entry.set_placeholder_text("Option value")
         value_entry.set_hexpand(True)
         value_entry.add_css_class("custom-option-value")
@@ -217,37 +318,39 @@ class HostEditor(Gtk.Box):
         remove_button.add_css_class("flat")
         remove_button.add_css_class("destructive-action")
         remove_button.set_tooltip_text("Remove this custom option")
-        remove_button.connect("clicked", self._on_remove_custom_option, container_box)
+        remove_button.connect("clicked", self._on_remove_custom_option, item)
 
         action_row.add_suffix(remove_button)
 
         container_box.append(action_row)
 
-        container_box.key_entry = key_entry
-        container_box.value_entry = value_entry
-        
-        self.custom_options_list.append(container_box)
-        
+        flags = GObject.BindingFlags.SYNC_CREATE | GObject.BindingFlags.BIDIRECTIONAL
+        item.bind_property("key", key_entry, "text", flags)
+        item.bind_property("value", value_entry, "text", flags)
+
+        row = Gtk.ListBoxRow()
+        row.set_activatable(False)
+        row.set_child(container_box)
+        row.key_entry = key_entry
+        row.value_entry = value_entry
+
         key_entry.connect("changed", self._on_custom_option_changed)
         value_entry.connect("changed", self._on_custom_option_changed)
+        return row
     
     def _on_field_changed(self, widget, *args):
         """Handle changes in basic and networking fields to update host and dirty state."""
         if self.is_loading or not self.current_host:
             return
-        
-        self._update_button_sensitivity()
 
-        self._validate_and_update_host()
+        self._scheduler.mark("validate", "model", "buttons")
     
     def _on_custom_option_changed(self, widget, *args):
         """Handle changes in custom option fields to update host and dirty state."""
         if self.is_loading or not self.current_host:
             return
 
-        self._update_button_sensitivity()
-
-        self._validate_and_update_host()
+        self._scheduler.mark("validate", "model", "buttons")
 
     def _update_raw_text_from_host(self):
         """Updates the raw text view based on the current host's structured data."""
@@ -255,21 +358,57 @@ class HostEditor(Gtk.Box):
             return
 
         self.is_loading = True
+        try:
+            changed = self._sync_raw_buffer(self._generate_raw_lines_from_host())
+        finally:
+            self.is_loading = False
+
+        if changed:
+            self._scheduler.mark("highlight")
 
-        generated_raw_lines = self._generate_raw_lines_from_host()
+    def _sync_raw_buffer(self, lines: list[str]) -> bool:
+        """Bring the raw buffer to the given lines with the fewest line edits.
+
+        Only changed lines are deleted or inserted, inside one user action, so
+        the cursor, scroll position and tags on untouched lines survive.
+        Returns whether the buffer changed.
+        """
         buffer = self.raw_text_view.get_buffer()
+        current_lines = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), False).split("\n")
+        edits = line_edits(current_lines, lines)
+        if not edits:
+            return False
+
+        line_count = len(current_lines)
         if hasattr(self, "_raw_changed_handler_id"):
             buffer.handler_block(self._raw_changed_handler_id)
-        buffer.set_text("\n".join(generated_raw_lines))
-        if hasattr(self, "_raw_changed_handler_id"):
-            buffer.handler_unblock(self._raw_changed_handler_id)
-
-        self.is_loading = False
-
-        # Next change is programmatic; don't resync form fields
-        self._programmatic_raw_update = True
-        self._on_raw_text_changed(self.raw_text_view.get_buffer())
-        self._programmatic_raw_update = False
+        buffer.begin_user_action()
+        try:
+            for start, end, replacement in reversed(edits):
+                if start >= line_count:
+                    # Pure append after the last line: there is no newline to take, so delete nothing
+                    buffer.insert(buffer.get_end_iter(), "".join("\n" + line for line in replacement))
+                elif end < line_count:
+                    # Lines keep their newline; delete up to the start of the next kept line
+                    _ok, start_iter = buffer.get_iter_at_line(start)
+                    _ok, end_iter = buffer.get_iter_at_line(end)
+                    buffer.delete(start_iter, end_iter)
+                    _ok, insert_iter = buffer.get_iter_at_line(start)
+                    buffer.insert(insert_iter, "".join(line + "\n" for line in replacement))
+                elif start > 0:
+                    # The edit reaches the last line, so take the newline before it instead
+                    _ok, start_iter = buffer.get_iter_at_line(start)
+                    start_iter.backward_char()
+                    buffer.delete(start_iter, buffer.get_end_iter())
+                    buffer.insert(buffer.get_end_iter(), "".join("\n" + line for line in replacement))
+                else:
+                    buffer.delete(buffer.get_start_iter(), buffer.get_end_iter())
+                    buffer.insert(buffer.get_start_iter(), "\n".join(replacement))
+        finally:
+            buffer.end_user_action()
+            if hasattr(self, "_raw_changed_handler_id"):
+                buffer.handler_unblock(self._raw_changed_handler_id)
+        return True
 
     def _generate_raw_lines_from_host(self) -> list[str]:
         """Generates raw lines for the current host based on its structured data."""
@@ -290,64 +429,66 @@ class HostEditor(Gtk.Box):
 
 
     def _on_raw_text_changed(self, buffer):
-        """Handle changes in the raw text view, parse, validate, and apply diff highlighting."""
+        """Handle user edits in the raw text view by scheduling a parse and re-highlight."""
         if self.is_loading or not self.current_host:
             return
 
-        current_text = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), False)
-        current_lines = current_text.splitlines()
-        original_lines = self.original_raw_content.splitlines()
+        if self._programmatic_raw_update:
+            self._scheduler.mark("highlight")
+        else:
+            self._scheduler.mark("raw-parse", "validate", "highlight", "buttons")
+
+    def _set_original_raw_content(self, text: str):
+        """Set the text the raw view is diffed against and drop the previous alignment."""
+        self.original_raw_content = text
+        self._raw_diff = IncrementalLineDiff(text.splitlines())
+
+    def _highlight_raw_diff(self):
+        """Highlight raw lines that differ from the host as it was loaded.
+
+        Only lines touched by the edit, or whose status flipped next to it,
+        are re-tagged; tags elsewhere move with the text they cover.
+        """
+        if not self.current_host or self._raw_diff is None:
+            return
 
         if self.buffer is None:
             try:
                 self.buffer = self.raw_text_view.get_buffer()
             except Exception:
                 return
-        self.buffer.remove_all_tags(self.buffer.get_start_iter(), self.buffer.get_end_iter())
-
-        s = difflib.SequenceMatcher(None, original_lines, current_lines)
-
-        for opcode, i1, i2, j1, j2 in s.get_opcodes():
-            if opcode == 'equal':
-                pass
-            elif opcode == 'insert':
-                for line_idx in range(j1, j2):
-                    if line_idx >= len(current_lines):
-                        continue
-                    success, start_iter = self.buffer.get_iter_at_line(line_idx)
-                    if not success:
-                        continue
-                    end_iter = start_iter.copy()
-                    end_iter.forward_to_line_end()
-                    self.buffer.apply_tag(self.tag_add, start_iter, end_iter)
-            elif opcode == 'delete':
-                pass
-            elif opcode == 'replace':
-                for line_idx in range(j1, j2):
-                    if line_idx >= len(current_lines):
-                        continue
-                    success, start_iter = self.buffer.get_iter_at_line(line_idx)
-                    if not success:
-                        continue
-                    end_iter = start_iter.copy()
-                    end_iter.forward_to_line_end()
-                    self.buffer.apply_tag(self.tag_changed, start_iter, end_iter)
-
-        # Only parse and validate if the change was user-initiated, not programmatic
-        if not self._programmatic_raw_update:
-            self._parse_and_validate_raw_text(current_lines)
-            self._update_button_sensitivity()
+        current_text = self.buffer.get_text(self.buffer.get_start_iter(), self.buffer.get_end_iter(), False)
+
+        tags = {ADDED: self.tag_add, CHANGED: self.tag_changed}
+        for line_idx, status in self._raw_diff.update(current_text.splitlines()):
+            success, start_iter = self.buffer.get_iter_at_line(line_idx)
+            if not success:
+                continue
+            end_iter = start_iter.copy()
+            end_iter.forward_to_line_end()
+            self.buffer.remove_tag(self.tag_add, start_iter, end_iter)
+            self.buffer.remove_tag(self.tag_changed, start_iter, end_iter)
+            if status in tags:
+                self.buffer.apply_tag(tags[status], start_iter, end_iter)
+
+    def _parse_raw_stage(self):
+        if not self.current_host:
+            return
+        buffer = self.raw_text_view.get_buffer()
+        current_text = buffer.get_text(buffer.get_start_iter(), buffer.get_end_iter(), False)
+        self._parse_and_validate_raw_text(current_text.splitlines())
 
     def _parse_and_validate_raw_text(self, current_lines: list[str]):
         """Parses raw lines and updates current_host and UI fields if valid."""
         try:
             temp_host = SSHHost.from_raw_lines(current_lines)
+            before = self.current_host.snapshot()
             self.current_host.patterns = temp_host.patterns
             self.current_host.options = temp_host.options
             self.current_host.raw_lines = current_lines
+            self._record_edit(before)
             self.emit("host-changed", self.current_host)
             self._sync_fields_from_host()
-            self._update_button_sensitivity()
         except ValueError as e:
             self.app._show_error(f"Invalid raw host configuration: {e}")
         except Exception as e:
@@ -386,26 +527,16 @@ class HostEditor(Gtk.Box):
             self.current_host.remove_option(key)
     
     def _update_custom_options(self):
-        """Updates custom options on the current host based on the listbox content."""
-        common_options = {
-            'HostName', 'User', 'Port', 'IdentityFile', 'ForwardAgent',
-            'ProxyJump', 'ProxyCommand', 'LocalForward', 'RemoteForward'
-        }
-
-        self.current_host.options = [opt for opt in self.current_host.options if opt.key in common_options]
-        
-        for container_box in self.custom_options_list:
-            # Access the stored entry references
-            if hasattr(container_box, 'key_entry') and hasattr(container_box, 'value_entry'):
-                key_entry = container_box.key_entry
-                value_entry = container_box.value_entry
-                
-                if key_entry and value_entry:
-                    key = key_entry.get_text().strip()
-                    value = value_entry.get_text().strip()
-                        
-                    if key and value:
-                        self.current_host.set_option(key, value)
+        """Updates custom options on the current host based on the custom options model."""
+        self.current_host.options = [opt for opt in self.current_host.options if opt.key in COMMON_OPTIONS]
+
+        store = self._custom_options_store
+        for index in range(store.get_n_items()):
+            item = store.get_item(index)
+            key = item.key.strip()
+            value = item.value.strip()
+            if key and value:
+                self.current_host.set_option(key, value)
     
     def _on_identity_file_clicked(self, button):
         dialog = Gtk.FileChooserDialog(
@@ -436,15 +567,15 @@ class HostEditor(Gtk.Box):
             dialog.destroy()
         
     def _on_add_custom_option(self, button):
-        self._add_custom_option_row()
+        self._custom_options_store.append(CustomOptionItem())
     
-    def _on_remove_custom_option(self, button, row):
+    def _on_remove_custom_option(self, button, item):
         """Handle remove custom option button click."""
-        list_box_row = row.get_parent()
-        if list_box_row:
-            self.custom_options_list.remove(list_box_row)
-        self._update_host_from_fields()
-        self.emit("host-changed", self.current_host)
+        found, position = self._custom_options_store.find(item)
+        if found:
+            self._custom_options_store.remove(position)
+        if self.current_host:
+            self._scheduler.mark("validate", "model", "buttons")
     
     def _on_copy_ssh_command(self, button):
         """Copy the generated SSH command to the clipboard and show a toast."""
@@ -544,6 +675,11 @@ class HostEditor(Gtk.Box):
         if not self.current_host or not self.original_host_state:
             return False
 
+        # Journaled edits bump the generation and undo restores it, so an
+        # unchanged generation means the host is as it was loaded
+        if self._journal is not None and self.current_host.generation == self._loaded_generation:
+            return False
+
         if sorted(self.current_host.patterns) != sorted(self.original_host_state.patterns):
             return True
 
@@ -571,23 +707,38 @@ class HostEditor(Gtk.Box):
 
         port_text = self.port_entry.get_text().strip()
         if port_text:
-            try:
-                port = int(port_text)
-                if not (1 <= port <= 65535):
-                    errors['port'] = _("Port must be between 1 and 65535.")
-            except ValueError:
-                errors['port'] = _("Port must be numeric.")
-
-        # Mark invalid custom option keys with red border and tooltip
-        for container_box in self.custom_options_list:
-            if hasattr(container_box, 'key_entry'):
-                key_entry = container_box.key_entry
-                if key_entry and isinstance(key_entry, Gtk.Entry):
-                    key = key_entry.get_text().strip()
-                    key_entry.remove_css_class("entry-error")
-                    if not key:
-                        key_entry.add_css_class("entry-error")
-                        key_entry.set_tooltip_text(_("Custom option key cannot be empty."))
+            port_error = validate_option('Port', port_text)
+            if port_error:
+                errors['port'] = _(port_error)
+
+        for key, entry in self._schema_checked_entries():
+            value = entry.get_text().strip()
+            error = validate_option(key, value) if value else None
+            if error:
+                errors[key] = _(error)
+                entry.add_css_class("entry-error")
+                entry.set_tooltip_text(_(error))
+
+        # Mark invalid custom options with red border and tooltip
+        for row in self._custom_option_rows():
+            if not hasattr(row, 'key_entry'):
+                continue
+            key = row.key_entry.get_text().strip()
+            if not key:
+                row.key_entry.add_css_class("entry-error")
+                row.key_entry.set_tooltip_text(_("Custom option key cannot be empty."))
+                errors[f'custom:{row.get_index()}'] = _("Custom option key cannot be empty.")
+                continue
+            if lookup(key) is None:
+                # Unknown keywords are still written out; ssh decides whether to reject them
+                row.key_entry.set_tooltip_text(_(f"Unknown option {key}"))
+                continue
+            value = row.value_entry.get_text().strip()
+            error = validate_option(key, value) if value else None
+            if error:
+                row.value_entry.add_css_class("entry-error")
+                row.value_entry.set_tooltip_text(_(error))
+                errors[f'custom:{row.get_index()}'] = _(error)
 
         # Apply inline error texts
         if 'patterns' in errors:
@@ -614,31 +765,45 @@ class HostEditor(Gtk.Box):
             self.patterns_entry.remove_css_class("entry-error")
         if hasattr(self, 'port_entry'):
             self.port_entry.remove_css_class("entry-error")
-        for container_box in self.custom_options_list:
-            if hasattr(container_box, 'key_entry'):
-                key_entry = container_box.key_entry
-                if key_entry and isinstance(key_entry, Gtk.Entry):
-                    key_entry.remove_css_class("entry-error")
-
-    def _validate_and_update_host(self):
-        field_errors = self._collect_field_errors()
-        if field_errors:
-            self._editor_valid = False
-            self.emit("editor-validity-changed", False)
-            self._update_button_sensitivity()
+        for _key, entry in self._schema_checked_entries():
+            entry.remove_css_class("entry-error")
+            entry.set_tooltip_text(None)
+        for row in self._custom_option_rows():
+            if hasattr(row, 'key_entry'):
+                for entry in (row.key_entry, row.value_entry):
+                    entry.remove_css_class("entry-error")
+                    entry.set_tooltip_text(None)
+
+    def _schema_checked_entries(self):
+        """Form fields whose values are checked against the keyword schema."""
+        return (
+            ('HostName', self.hostname_entry),
+            ('IdentityFile', self.identity_entry),
+            ('LocalForward', self.local_forward_entry),
+            ('RemoteForward', self.remote_forward_entry),
+        )
+
+    def _validate_stage(self):
+        if not self.current_host:
             return
-        else:
-            self._editor_valid = True
-            self.emit("editor-validity-changed", True)
+        is_valid = not self._collect_field_errors()
+        self._editor_valid = is_valid
+        self.emit("editor-validity-changed", is_valid)
 
+    def _model_stage(self):
+        """Write the form fields into the host once they validate."""
+        if not self.current_host or not self._editor_valid:
+            return
+        before = self.current_host.snapshot()
         self._update_host_from_fields()
+        self._record_edit(before)
         self.emit("host-changed", self.current_host)
-        GLib.idle_add(lambda: (self._update_raw_text_from_host(), False)[1])
-        self._update_button_sensitivity()
+        self._scheduler.mark("raw")
 
     def _on_save_clicked(self, button):
         """Handle save button click."""
         if self.current_host:
+            self._scheduler.flush()
             # Emit signal to main window to handle saving
             self.emit("host-save", self.current_host)
 
@@ -649,37 +814,32 @@ class HostEditor(Gtk.Box):
 
         if not hasattr(self, 'original_host_state') or not self.original_host_state:
             return
+        self._scheduler.cancel()
         self.is_loading = True
-        self.current_host.patterns = copy.deepcopy(self.original_host_state.patterns)
-        self.current_host.options = copy.deepcopy(self.original_host_state.options)
-        self.current_host.raw_lines = copy.deepcopy(self.original_host_state.raw_lines)
+        before = self.current_host.snapshot()
+        self.current_host.restore(self.original_host_state)
+        # Reverting is itself undoable
+        self._record_edit(before, coalesce=False)
+        if self._journal is not None:
+            self._journal.seal()
 
         self._sync_fields_from_host()
 
-        buffer = self.raw_text_view.get_buffer()
-        if hasattr(self, "_raw_changed_handler_id"):
-            buffer.handler_block(self._raw_changed_handler_id)
-        self._programmatic_raw_update = True
-        buffer.set_text("\n".join(self.current_host.raw_lines))
-        if hasattr(self, "_raw_changed_handler_id"):
-            buffer.handler_unblock(self._raw_changed_handler_id)
-        self._programmatic_raw_update = False
-        self.original_raw_content = "\n".join(self.current_host.raw_lines)
+        self._sync_raw_buffer(list(self.current_host.raw_lines))
         self.is_loading = False
 
-        if self.buffer is not None:
-            self.buffer.remove_all_tags(self.buffer.get_start_iter(), self.buffer.get_end_iter())
+        self._highlight_raw_diff()
         self.emit("host-changed", self.current_host)
         self.revert_button.set_sensitive(False)
         if hasattr(self, 'save_button'):
             self.save_button.set_sensitive(False)
+        self._scheduler.mark("validate")
         self._show_message(_(f"Reverted changes for {self.current_host.patterns[0]}"))
 
     def _update_button_sensitivity(self):
         """Updates the sensitivity of save and revert buttons based on dirty state and validity."""
         is_dirty = self.is_host_dirty()
-        field_errors = self._collect_field_errors() # This also applies error styling
-        is_valid = not bool(field_errors)
+        is_valid = self._editor_valid
         self.save_button.set_sensitive(is_dirty and is_valid)
         self.revert_button.set_sensitive(is_dirty)
 
@@ -687,6 +847,13 @@ class HostEditor(Gtk.Box):
     def _on_test_connection(self, button):
         if not self.current_host:
             return
+        # The probe machinery pulls in asyncio; load it on the first test, not with the editor
+        try:
+            from ssh_config_studio.probe_runner import ProbeRunner, PHASES, build_ssh_test_command
+            from ssh_config_studio.preflight import preflight_target
+        except ImportError:
+            from probe_runner import ProbeRunner, PHASES, build_ssh_test_command
+            from preflight import preflight_target
         
         dialog = Gtk.Dialog(
             title=_("Test Connection"),
@@ -721,98 +888,70 @@ class HostEditor(Gtk.Box):
         scrolled_window.set_vexpand(True)
         scrolled_window.set_hexpand(True)
         content_area.append(scrolled_window)
-        
-        # Construct the SSH command, using -G for configuration parsing only
-        hostname = self.hostname_entry.get_text().strip()
-        if not hostname and self.current_host.patterns:
-            hostname = self.current_host.patterns[0] # Fallback to pattern if hostname is empty
 
-        if not hostname:
+        # Test what is in the editor, including edits not yet applied to the host
+        self.flush()
+        tested_host = self.current_host
+        pool = self._control_pool
+        control_options = pool.client_options() if pool is not None else None
+        command = build_ssh_test_command(tested_host, verbose=True, control_options=control_options)
+        if command is None:
             status_label.set_text(_("Error: No hostname or pattern available to test."))
             dialog.present()
             return
 
-        # Use host SSH when running inside Flatpak
-        ssh_invocation = ["ssh"]
-        try:
-            if os.environ.get("FLATPAK_ID"):
-                ssh_invocation = ["flatpak-spawn", "--host", "ssh"]
-        except Exception:
-            pass
+        output_text_buffer.set_text(f"Command: {' '.join(command)}\n\n")
+        closed = False
 
-        command = [*ssh_invocation,
-                   "-q",
-                   "-T",
-                   "-o", "BatchMode=yes",
-                   "-o", "ConnectTimeout=8",
-                   "-o", "StrictHostKeyChecking=accept-new",
-                   "-o", "PasswordAuthentication=no",
-                   "-o", "KbdInteractiveAuthentication=no",
-                   "-o", "NumberOfPasswordPrompts=0",
-                   "-o", "ControlMaster=no",
-                   "-o", "ControlPath=none",
-                   "-o", "ControlPersist=no"]
-
-        # Include common fields from the editor
-        user_val = self.user_entry.get_text().strip()
-        port_val = self.port_entry.get_text().strip()
-        ident_val = self.identity_entry.get_text().strip()
-        proxy_jump_val = self.proxy_jump_entry.get_text().strip()
-
-        if user_val:
-            command += ["-l", user_val]
-        if port_val:
-            command += ["-p", port_val]
-        if ident_val:
-            command += ["-i", ident_val]
-        if proxy_jump_val:
-            command += ["-J", proxy_jump_val]
-
-        command += [hostname, "exit"]
-
-        # Execute the command on a background thread to avoid blocking the UI
-        def run_test():
-            try:
-                result = subprocess.run(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    timeout=20
-                )
-                rc = result.returncode
-                stdout_text = (result.stdout or "").strip()
-                stderr_text = (result.stderr or "").strip()
-
-                def update_ui():
-                    summary = _("Connection OK") if rc == 0 else _(f"Connection failed (exit {rc})")
-                    status_label.set_text(summary)
-                    output = f"Command: {' '.join(command)}\n\n"
-                    if stdout_text:
-                        output += _(f"STDOUT:\n{stdout_text}\n\n")
-                    if stderr_text:
-                        output += _(f"STDERR:\n{stderr_text}\n\n")
-                    output += summary
-                    output_text_buffer.set_text(output)
-                    return False
-
-                GLib.idle_add(update_ui)
-
-            except subprocess.TimeoutExpired:
-                def update_timeout():
-                    status_label.set_text(_("Connection timed out"))
-                    output_text_buffer.set_text(_(f"Command: {' '.join(command)}\n\nTimed out after 20s"))
-                    return False
-                GLib.idle_add(update_timeout)
-            except Exception as e:
-                def update_error():
-                    status_label.set_text(_(f"Error: {e}"))
-                    output_text_buffer.set_text(str(e))
-                    return False
-                GLib.idle_add(update_error)
+        def append_line(stream, line):
+            if not closed:
+                output_text_buffer.insert(output_text_buffer.get_end_iter(), line + "\n")
+            return False
+
+        runner = ProbeRunner.default()
+        target = preflight_target(tested_host) if self._tcp_preflight else None
+
+        def show_result(result):
+            if closed:
+                return False
+            if result is None:
+                status_label.set_text(_("Connection test failed to run"))
+                return False
+            if result.preflight is not None and not result.preflight.ok:
+                host, port = result.preflight.target
+                summary = _(f"Nothing accepted a connection on {host}:{port} ({result.preflight.error})")
+            elif result.timed_out:
+                summary = _("Connection timed out")
+            elif result.ok:
+                summary = _("Connection OK")
+            else:
+                summary = _(f"Connection failed (exit {result.returncode})")
+            timings = ", ".join(
+                f"{phase} {result.phases[phase] * 1000:.0f} ms" for phase in PHASES if phase in result.phases
+            )
+            status_label.set_text(f"{summary} ({timings})")
+            report = [summary, timings]
+            if target is not None:
+                histogram = runner.latencies.summary(target)
+                if histogram:
+                    report += ["", _(f"TCP connect latency to {target[0]}:{target[1]}")] + histogram
+            output_text_buffer.insert(output_text_buffer.get_end_iter(), "\n" + "\n".join(report) + "\n")
+            self.emit("connection-tested", tested_host, result.ok)
+            return False
+
+        # Lines and the result arrive on the probe thread; the buffer is touched on the main loop only
+        handle = runner.submit(
+            command, on_line=lambda stream, line: GLib.idle_add(append_line, stream, line), preflight=target,
+            prepare=(lambda: pool.ensure_master(tested_host)) if pool is not None else None,
+        )
+        handle.add_done_callback(lambda result: GLib.idle_add(show_result, result))
 
-        threading.Thread(target=run_test, daemon=True).start()
+        def on_destroy(_dialog):
+            nonlocal closed
+            closed = True
+            handle.cancel()
 
+        dialog.connect("destroy", on_destroy)
         dialog.present()
 
     def _sync_fields_from_host(self):
@@ -824,7 +963,7 @@ class HostEditor(Gtk.Box):
         self.user_entry.set_text(self.current_host.get_option('User') or "")
         self.port_entry.set_text(self.current_host.get_option('Port') or "")
         self.identity_entry.set_text(self.current_host.get_option('IdentityFile') or "")
-        self.forward_agent_switch.set_active((self.current_host.get_option('ForwardAgent') or "").lower() == 'yes')
+        self.forward_agent_switch.set_active((self.current_host.get_option('ForwardAgent') or "").lower() in ('yes', 'true'))
         self.proxy_jump_entry.set_text(self.current_host.get_option('ProxyJump') or "")
         self.proxy_cmd_entry.set_text(self.current_host.get_option('ProxyCommand') or "")
         self.local_forward_entry.set_text(self.current_host.get_option('LocalForward') or "")
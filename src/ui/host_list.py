@@ -1,27 +1,188 @@
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, GObject, Pango, Adw, Gdk
+from gi.repository import Gtk, GObject, Gio, Pango, Adw, Gdk, GLib
 from gettext import gettext as _
+import ipaddress
+import time
 
 try:
 	from ssh_config_studio.ssh_config_parser import SSHHost, SSHOption
 except ImportError:
 	from ssh_config_parser import SSHHost, SSHOption
 
+
+class HostItem(GObject.Object):
+    """List model item wrapping one SSHHost."""
+
+    __gtype_name__ = "HostListItem"
+
+    title = GObject.Property(type=str, default="")
+    subtitle = GObject.Property(type=str, default="")
+    # Reachability from the last scan: "", "pending", "reachable", "unreachable" or "timeout"
+    status = GObject.Property(type=str, default="")
+    status_tooltip = GObject.Property(type=str, default="")
+    # Resolved addresses of HostName, or why it failed to resolve
+    resolution = GObject.Property(type=str, default="")
+    resolution_failed = GObject.Property(type=bool, default=False)
+    # Median TCP connect latency shown beside the status badge, e.g. "12 ms"
+    latency = GObject.Property(type=str, default="")
+
+    def __init__(self, host: SSHHost, order: int):
+        super().__init__()
+        self.host = host
+        # Position in file order, used for "File order" and as a tie-breaker
+        self.order = order
+        # Key of the group the item currently sits in, None when not shown grouped
+        self.group_key = None
+        self.modified = 0.0
+        self.last_connected = 0.0
+        # Median TCP connect latency in seconds, None until a preflight succeeded
+        self.connect_latency = None
+        self.sort_keys = {}
+        self.refresh()
+
+    def refresh(self):
+        """Recompute the displayed strings and cached sort keys from the wrapped host."""
+        patterns = ", ".join(self.host.patterns)
+        hostname = self.host.get_option('HostName') or ""
+        user = self.host.get_option('User') or ""
+        subtitle = f"{user}@{hostname}" if (hostname or user) else (hostname or patterns)
+        if self.title != patterns:
+            self.title = patterns
+        if self.subtitle != subtitle:
+            self.subtitle = subtitle
+
+        port = (self.host.get_option('Port') or "").strip()
+        self.sort_keys = {
+            "alias": self.host.patterns[0].lower() if self.host.patterns else "",
+            "hostname": hostname.lower(),
+            "user": user.lower(),
+            "port": int(port) if port.isdigit() else 0,
+            "identity": (self.host.get_option('IdentityFile') or "").lower(),
+            "modified": self.modified,
+            "connected": self.last_connected,
+            "latency": self.connect_latency if self.connect_latency is not None else float("inf"),
+        }
+
+
+class PositionIndex:
+    """Positions of a list model's items, built in one pass and dropped when the model changes."""
+
+    def __init__(self, model):
+        self._model = model
+        self._positions = None
+        model.connect("items-changed", self._on_items_changed)
+
+    def _on_items_changed(self, _model, _position, _removed, _added):
+        self._positions = None
+
+    def get(self, item):
+        if self._positions is None:
+            model = self._model
+            self._positions = {id(model.get_item(i)): i for i in range(model.get_n_items())}
+        return self._positions.get(id(item))
+
+
+class HostGroup(GObject.Object):
+    """Collapsible section of the host list; children are materialized on expand."""
+
+    __gtype_name__ = "HostListGroup"
+
+    title = GObject.Property(type=str, default="")
+    subtitle = GObject.Property(type=str, default="")
+
+    def __init__(self, key: str, title: str, sorter):
+        super().__init__()
+        self.key = key
+        self.title = title
+        self.children = Gio.ListStore(item_type=HostItem)
+        self.sorted_children = Gtk.SortListModel(model=self.children, sorter=sorter)
+        self.child_positions = PositionIndex(self.children)
+        self.sorted_positions = PositionIndex(self.sorted_children)
+
+    def update_count(self):
+        count = self.children.get_n_items()
+        self.subtitle = _(f"{count} hosts")
+
+
+def _group_by_domain(host: SSHHost):
+    hostname = (host.get_option('HostName') or "").strip().lower().rstrip(".")
+    if not hostname:
+        return "", _("No HostName")
+    try:
+        ipaddress.ip_address(hostname)
+        return "ip", _("IP addresses")
+    except ValueError:
+        pass
+    labels = hostname.split(".")
+    suffix = ".".join(labels[-2:]) if len(labels) > 2 else hostname
+    return suffix, suffix
+
+
+def _group_by_bastion(host: SSHHost):
+    proxy_jump = (host.get_option('ProxyJump') or "").strip()
+    if not proxy_jump or proxy_jump.lower() == "none":
+        return "", _("Direct")
+    first_hop = proxy_jump.split(",")[0].strip()
+    return first_hop, first_hop
+
+
+# Grouping modes in the order they appear in the group drop-down
+GROUP_MODES = (
+    ("none", None),
+    ("domain", _group_by_domain),
+    ("bastion", _group_by_bastion),
+)
+
+# Sort modes in the order they appear in the sort drop-down; "file" keeps file order
+SORT_MODES = ("file", "alias", "hostname", "user", "port", "identity", "modified", "connected", "latency")
+
+# Badge text and style class for each reachability status, filled on the first status shown
+_STATUS_BADGES = {}
+
+
+def _status_badge(status: str):
+    # Rows without a status never need the scan module, which loads the probe machinery
+    if not status:
+        return "", None
+    if not _STATUS_BADGES:
+        try:
+            from ssh_config_studio.fleet_scan import PENDING, REACHABLE, UNREACHABLE, TIMED_OUT
+        except ImportError:
+            from fleet_scan import PENDING, REACHABLE, UNREACHABLE, TIMED_OUT
+        _STATUS_BADGES.update({
+            PENDING: ("…", "dim-label"),
+            REACHABLE: (_("Online"), "success"),
+            UNREACHABLE: (_("Offline"), "error"),
+            TIMED_OUT: (_("Timeout"), "warning"),
+        })
+    return _STATUS_BADGES.get(status, ("", None))
+
 @Gtk.Template(resource_path="/com/sshconfigstudio/app/ui/host_list.ui")
 class HostList(Gtk.Box):
     
     __gtype_name__ = "HostList"
 
-    list_box = Gtk.Template.Child()
+    list_view = Gtk.Template.Child()
     count_label = Gtk.Template.Child()
+    group_dropdown = Gtk.Template.Child()
+    sort_dropdown = Gtk.Template.Child()
+    sort_order_button = Gtk.Template.Child()
 
     __gsignals__ = {
         'host-selected': (GObject.SignalFlags.RUN_LAST, None, (object,)),
         'host-added': (GObject.SignalFlags.RUN_LAST, None, (object,)),
-        'host-deleted': (GObject.SignalFlags.RUN_LAST, None, (object,))
+        'hosts-duplicated': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+        'hosts-deleted': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+        'filter-finished': (GObject.SignalFlags.RUN_LAST, None, (float,)),
+        'selection-count-changed': (GObject.SignalFlags.RUN_LAST, None, (int,))
     }
+
+    # Lists larger than this are filtered in time-sliced chunks from an idle source
+    FILTER_CHUNK_THRESHOLD = 2000
+    # Time budget of a single filter slice, in seconds
+    FILTER_SLICE_BUDGET = 0.008
     
     def __init__(self):
         super().__init__()
@@ -30,101 +191,394 @@ class HostList(Gtk.Box):
         self.filtered_hosts = []
         self.current_filter = ""
         self._selected_host = None
-        
+        self._filter_source_id = None
+
+        self._items = {}
+        self._group_func = None
+        self._groups = {}
+        self._expanded_groups = set()
+        self._next_order = 0
+        self._suppress_selected_signal = False
+        self._resolver = None
+
+        self._sort_mode = "file"
+        self._sort_descending = False
+        self._sorter = Gtk.CustomSorter.new(self._compare_items, None)
+
+        self._root_store = Gio.ListStore(item_type=GObject.Object)
+        self._sort_model = Gtk.SortListModel(model=self._root_store, sorter=None)
+        self._root_positions = PositionIndex(self._root_store)
+        self._sorted_positions = PositionIndex(self._sort_model)
+        self._tree_model = Gtk.TreeListModel.new(
+            self._sort_model, False, False, self._create_child_model
+        )
+        # Ctrl/Shift-click extend the selection for bulk actions
+        self._selection = Gtk.MultiSelection(model=self._tree_model)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_factory_setup)
+        factory.connect("bind", self._on_factory_bind)
+        factory.connect("unbind", self._on_factory_unbind)
+        factory.connect("teardown", self._on_factory_teardown)
+        self.list_view.set_factory(factory)
+        self.list_view.set_model(self._selection)
+
         self._connect_signals()
-        
-        self.list_store = Gtk.ListStore(str, str, str, str, str, object)
-        if hasattr(self, 'tree_view') and self.tree_view is not None:
-            self.tree_view.set_model(self.list_store)
-            self._setup_columns()
-        self._rebuild_listbox_rows()
-    
-    def _setup_columns(self):
-        def add_text_column(title: str, col_index: int, expand: bool = False, min_width: int | None = None):
-            renderer = Gtk.CellRendererText()
-            renderer.set_property("ypad", 6)
-            renderer.set_property("xpad", 8)
-            column = Gtk.TreeViewColumn(title, renderer, text=col_index)
-            if expand:
-                column.set_expand(True)
-            if min_width is not None:
-                column.set_min_width(min_width)
-            self.tree_view.append_column(column)
-
-        add_text_column(_("Host"), 0, True, 120)
-        add_text_column(_("HostName"), 1, True, 150)
-        add_text_column(_("User"), 2, False, 80)
-        add_text_column(_("Port"), 3, False, 60)
-        add_text_column(_("Identity"), 4, True, 120)
 
     def _connect_signals(self):
-        if hasattr(self, 'tree_view') and self.tree_view is not None:
-            selection = self.tree_view.get_selection()
-            selection.connect("changed", self._on_selection_changed)
-        if hasattr(self, 'list_box') and self.list_box is not None:
-            self.list_box.connect("row-selected", self._on_row_selected)
+        self._selection.connect("selection-changed", self._on_selection_changed)
+        self.group_dropdown.connect("notify::selected", self._on_group_mode_changed)
+        self.sort_dropdown.connect("notify::selected", self._on_sort_mode_changed)
+        self.sort_order_button.connect("toggled", self._on_sort_order_toggled)
+
+    def _create_child_model(self, item):
+        if isinstance(item, HostGroup):
+            return item.sorted_children
+        return None
+
+    def _item_for(self, host: SSHHost) -> HostItem:
+        item = self._items.get(id(host))
+        if item is None or item.host is not host:
+            item = HostItem(host, self._next_order)
+            self._next_order += 1
+            self._items[id(host)] = item
+        return item
 
     def load_hosts(self, hosts: list):
+        self._cancel_filter()
+        self._items = {id(host): HostItem(host, index) for index, host in enumerate(hosts)}
+        self._next_order = len(hosts)
         self.hosts = hosts
         self.filtered_hosts = hosts.copy()
         self._refresh_view()
         self._update_count()
 
-    def filter_hosts(self, query: str):
+    def sync_hosts(self):
+        """Pick up hosts added to or removed from the shared host list outside the view."""
+        present = {id(host) for host in self.hosts}
+        self._items = {key: item for key, item in self._items.items() if key in present}
+        if self._selected_host is not None and id(self._selected_host) not in present:
+            self._selected_host = None
+        self.filter_hosts(self.current_filter, chunked=False)
+
+    def filter_hosts(self, query: str, chunked: bool = True):
+        """Filter the list by query, superseding any filter still in progress.
+
+        Small lists are filtered synchronously. Large ones are scanned in
+        slices from an idle source so typing is never blocked; a newer query
+        cancels the stale scan before it touches the view.
+        """
+        self._cancel_filter()
         self.current_filter = query.lower()
 
         if not query:
-            self.filtered_hosts = self.hosts.copy()
-        else:
-            self.filtered_hosts = []
-            for host in self.hosts:
-                searchable_text = (
-                    " ".join(host.patterns) + " " +
-                    (host.get_option('HostName') or "") + " " +
-                    (host.get_option('User') or "") + " " +
-                    (host.get_option('IdentityFile') or "")
-                ).lower()
-
-                if self.current_filter in searchable_text:
-                    self.filtered_hosts.append(host)
+            self._finish_filter(self.hosts.copy(), 0.0)
+            return
 
+        if not chunked or len(self.hosts) <= self.FILTER_CHUNK_THRESHOLD:
+            started = time.perf_counter()
+            matches = [h for h in self.hosts if self._host_matches(h, self.current_filter)]
+            self._finish_filter(matches, time.perf_counter() - started)
+            return
+
+        hosts = list(self.hosts)
+        needle = self.current_filter
+        matches = []
+        position = 0
+        busy = 0.0
+
+        def run_slice():
+            nonlocal position, busy
+            started = time.perf_counter()
+            deadline = started + self.FILTER_SLICE_BUDGET
+            total = len(hosts)
+            while position < total:
+                host = hosts[position]
+                position += 1
+                if self._host_matches(host, needle):
+                    matches.append(host)
+                if (position & 0xFF) == 0 and time.perf_counter() >= deadline:
+                    busy += time.perf_counter() - started
+                    return GLib.SOURCE_CONTINUE
+            busy += time.perf_counter() - started
+            self._filter_source_id = None
+            self._finish_filter(matches, busy)
+            return GLib.SOURCE_REMOVE
+
+        self._filter_source_id = GLib.idle_add(run_slice, priority=GLib.PRIORITY_DEFAULT_IDLE)
+
+    @staticmethod
+    def _host_matches(host: SSHHost, needle: str) -> bool:
+        searchable_text = (
+            " ".join(host.patterns) + " " +
+            (host.get_option('HostName') or "") + " " +
+            (host.get_option('User') or "") + " " +
+            (host.get_option('IdentityFile') or "")
+        ).lower()
+        return needle in searchable_text
+
+    def _finish_filter(self, matches: list, busy: float):
+        started = time.perf_counter()
+        self.filtered_hosts = matches
         self._refresh_view()
         self._update_count()
+        self.emit("filter-finished", busy + time.perf_counter() - started)
+
+    def _cancel_filter(self):
+        if self._filter_source_id is not None:
+            GLib.source_remove(self._filter_source_id)
+            self._filter_source_id = None
 
     def _refresh_view(self):
-        if hasattr(self, 'tree_view') and self.tree_view is not None:
-            selection = self.tree_view.get_selection()
-            model, selected_iter = selection.get_selected()
+        previously_selected = self.get_selected_hosts()
+        previously_selected_host = self._get_selected_host()
+
+        items = [self._item_for(host) for host in self.filtered_hosts]
+        if self._group_func is None:
+            for item in items:
+                item.group_key = None
+            self._groups = {}
+            self._root_store.splice(0, self._root_store.get_n_items(), items)
         else:
-            model = self.list_store
-            selected_iter = None
-        previously_selected_host = None
-        if selected_iter:
-            previously_selected_host = model.get_value(selected_iter, 5)
-
-        self.list_store.clear()
-
-        for host in self.filtered_hosts:
-            host_patterns = ", ".join(host.patterns)
-            hostname = host.get_option('HostName') or ""
-            user = host.get_option('User') or ""
-            port = host.get_option('Port') or ""
-            identity_file = host.get_option('IdentityFile') or ""
-
-            self.list_store.append([
-                host_patterns,
-                hostname,
-                user,
-                port,
-                identity_file,
-                host
-            ])
-
-        if hasattr(self, 'list_box') and self.list_box is not None:
-            self._rebuild_listbox_rows()
-        if previously_selected_host:
+            self._rebuild_groups(items)
+
+        if len(previously_selected) > 1:
+            self.select_hosts(previously_selected)
+        elif previously_selected_host is not None:
             self.select_host(previously_selected_host)
 
+    def _rebuild_groups(self, items: list):
+        for group in self._groups.values():
+            for index in range(group.children.get_n_items()):
+                group.children.get_item(index).group_key = None
+
+        members = {}
+        titles = {}
+        for item in items:
+            key, title = self._group_func(item.host)
+            item.group_key = key
+            if key not in members:
+                members[key] = []
+                titles[key] = title
+            members[key].append(item)
+
+        groups = []
+        for key, group_items in members.items():
+            group = self._groups.get(key)
+            if group is None:
+                group = HostGroup(key, titles[key], self._active_sorter())
+            group.children.splice(0, group.children.get_n_items(), group_items)
+            group.update_count()
+            groups.append(group)
+        self._groups = {group.key: group for group in groups}
+
+        current = [self._root_store.get_item(i) for i in range(self._root_store.get_n_items())]
+        if current != groups:
+            self._root_store.splice(0, len(current), groups)
+            for group in groups:
+                if group.key in self._expanded_groups:
+                    index = self._sorted_positions.get(group)
+                    row = self._tree_model.get_child_row(index) if index is not None else None
+                    if row is not None:
+                        row.set_expanded(True)
+
+    def update_hosts(self, hosts: list):
+        """Refresh many hosts after a bulk edit with a single list update.
+
+        Rows follow their items' title and subtitle through bindings, so
+        only a change of sort key or group needs the view to be rebuilt, and
+        then it is rebuilt once for all hosts.
+        """
+        now = time.time()
+        needs_rebuild = False
+        for host in hosts:
+            item = self._items.get(id(host))
+            if item is None or item.host is not host:
+                continue
+            old_sort_key = item.sort_keys.get(self._sort_mode)
+            item.modified = now
+            item.refresh()
+            if self._resolver is not None:
+                self._resolver(host)
+            if self._sort_mode != "file" and item.sort_keys.get(self._sort_mode) != old_sort_key:
+                needs_rebuild = True
+            if self._group_func is not None and item.group_key is not None:
+                if self._group_func(host)[0] != item.group_key:
+                    needs_rebuild = True
+        if needs_rebuild:
+            self._refresh_view()
+
+    def update_host(self, host: SSHHost):
+        """Refresh one host's row, moving it between groups or to its new sort position."""
+        item = self._items.get(id(host))
+        if item is None or item.host is not host:
+            return
+        old_sort_key = item.sort_keys.get(self._sort_mode)
+        item.modified = time.time()
+        item.refresh()
+        if self._resolver is not None:
+            self._resolver(host)
+        if self._group_func is None or item.group_key is None:
+            if item.sort_keys.get(self._sort_mode) != old_sort_key:
+                self._resort_item(item)
+            return
+        key, title = self._group_func(host)
+        if key == item.group_key:
+            if item.sort_keys.get(self._sort_mode) != old_sort_key:
+                self._resort_item(item)
+            return
+
+        old_group = self._groups.get(item.group_key)
+        if old_group is not None:
+            position = old_group.child_positions.get(item)
+            if position is not None:
+                old_group.children.remove(position)
+            old_group.update_count()
+            if old_group.children.get_n_items() == 0:
+                position = self._root_positions.get(old_group)
+                if position is not None:
+                    self._root_store.remove(position)
+                del self._groups[old_group.key]
+
+        new_group = self._groups.get(key)
+        if new_group is None:
+            new_group = HostGroup(key, title, self._active_sorter())
+            self._groups[key] = new_group
+            self._root_store.append(new_group)
+        new_group.children.append(item)
+        new_group.update_count()
+        item.group_key = key
+
+    def set_host_status(self, host: SSHHost, status: str, tooltip: str = ""):
+        """Show a reachability badge on the host's row; an empty status hides it."""
+        item = self._items.get(id(host))
+        if item is None or item.host is not host:
+            return
+        if item.status_tooltip != tooltip:
+            item.status_tooltip = tooltip
+        if item.status != status:
+            item.status = status
+
+    def mark_connected(self, host: SSHHost, when: float = None):
+        """Record a connection test so the host can be sorted by last connection."""
+        item = self._items.get(id(host))
+        if item is None or item.host is not host:
+            return
+        item.last_connected = when if when is not None else time.time()
+        item.refresh()
+        if self._sort_mode == "connected":
+            self._resort_item(item)
+
+    def set_resolver(self, resolver):
+        """Call resolver(host) whenever a host's row is bound or the host changes.
+
+        The resolver is expected to look up HostName, usually from a cache,
+        and report back through set_host_resolution.
+        """
+        self._resolver = resolver
+
+    def set_host_resolution(self, host: SSHHost, text: str, failed: bool = False):
+        """Show resolved addresses, or a resolution failure, under the host's subtitle."""
+        item = self._items.get(id(host))
+        if item is None or item.host is not host:
+            return
+        if item.resolution_failed != failed:
+            item.resolution_failed = failed
+        if item.resolution != text:
+            item.resolution = text
+
+    def set_host_latency(self, host: SSHHost, seconds: float):
+        """Show the host's median connect latency in its row and sort by it."""
+        item = self._items.get(id(host))
+        if item is None or item.host is not host or item.connect_latency == seconds:
+            return
+        item.connect_latency = seconds
+        item.latency = _(f"{seconds * 1000:.0f} ms")
+        item.refresh()
+        if self._sort_mode == "latency":
+            self._resort_item(item)
+
+    def _resort_item(self, item: HostItem):
+        """Move a single item to its new sorted position.
+
+        Reporting the item as changed in the unsorted store makes the sort
+        model reinsert just that item instead of sorting the whole list again.
+        """
+        if self._sort_mode == "file":
+            return
+        if item.group_key is None:
+            store, positions = self._root_store, self._root_positions
+        else:
+            group = self._groups.get(item.group_key)
+            if group is None:
+                return
+            store, positions = group.children, group.child_positions
+        position = positions.get(item)
+        if position is None:
+            return
+        selected = self._get_selected_host()
+        store.items_changed(position, 1, 1)
+        if selected is item.host:
+            self.select_host(item.host, notify=False)
+
+    def _active_sorter(self):
+        return None if self._sort_mode == "file" else self._sorter
+
+    def _compare_items(self, a, b, _user_data):
+        if isinstance(a, HostGroup) or isinstance(b, HostGroup):
+            key_a, key_b = a.title.lower(), b.title.lower()
+            descending = False
+        else:
+            key_a, key_b = a.sort_keys[self._sort_mode], b.sort_keys[self._sort_mode]
+            if key_a == key_b:
+                key_a, key_b = a.order, b.order
+            descending = self._sort_descending
+        if key_a == key_b:
+            return Gtk.Ordering.EQUAL
+        if (key_a < key_b) != descending:
+            return Gtk.Ordering.SMALLER
+        return Gtk.Ordering.LARGER
+
+    def _on_sort_mode_changed(self, dropdown, _pspec):
+        index = dropdown.get_selected()
+        if index >= len(SORT_MODES):
+            return
+        self._sort_mode = SORT_MODES[index]
+        self._apply_sorter()
+
+    def _on_sort_order_toggled(self, button):
+        self._sort_descending = button.get_active()
+        self._apply_sorter()
+
+    def _apply_sorter(self):
+        selected = self._get_selected_host()
+        sorter = self._active_sorter()
+        self._sort_model.set_sorter(sorter)
+        for group in self._groups.values():
+            group.sorted_children.set_sorter(sorter)
+        if sorter is not None:
+            self._sorter.changed(Gtk.SorterChange.DIFFERENT)
+        if selected is not None:
+            self.select_host(selected, notify=False)
+
+    def _on_group_mode_changed(self, dropdown, _pspec):
+        index = dropdown.get_selected()
+        if index >= len(GROUP_MODES):
+            return
+        self._group_func = GROUP_MODES[index][1]
+        self._groups = {}
+        self._expanded_groups = set()
+        self._root_store.remove_all()
+        self._refresh_view()
+
+    def set_loading(self, loading: bool):
+        """Show that hosts are still being read; load_hosts replaces the message."""
+        self.list_view.set_sensitive(not loading)
+        if loading:
+            self.count_label.set_text(_("Loading configuration…"))
+        else:
+            self._update_count()
+
     def _update_count(self):
         total = len(self.hosts)
         filtered = len(self.filtered_hosts)
@@ -134,196 +588,410 @@ class HostList(Gtk.Box):
         else:
             self.count_label.set_text(_(f"{filtered} of {total} hosts"))
 
-    def _on_selection_changed(self, selection):
-        model, tree_iter = selection.get_selected()
-        if tree_iter:
-            host = model.get_value(tree_iter, 5)
-            self.emit("host-selected", host)
-
-    def _on_row_button_press(self, widget, event, menu):
-        return False
-
-    def _on_duplicate_host_clicked(self, button, host):
-        """Handle duplicate host button click from an ActionRow."""
-        self.duplicate_host(host)
+    def _on_factory_setup(self, factory, list_item):
+        expander = Gtk.TreeExpander()
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.set_margin_start(6)
+        box.set_margin_end(6)
+
+        title_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        title_label = Gtk.Label(xalign=0)
+        title_label.set_ellipsize(Pango.EllipsizeMode.END)
+        title_label.set_hexpand(True)
+        title_box.append(title_label)
+
+        latency_label = Gtk.Label()
+        latency_label.add_css_class("dim-label")
+        latency_label.add_css_class("caption")
+        latency_label.add_css_class("numeric")
+        latency_label.set_tooltip_text(_("Median TCP connect time"))
+        latency_label.set_visible(False)
+        title_box.append(latency_label)
+
+        status_badge = Gtk.Label()
+        status_badge.add_css_class("caption")
+        status_badge.set_visible(False)
+        title_box.append(status_badge)
+        box.append(title_box)
+
+        subtitle_label = Gtk.Label(xalign=0)
+        subtitle_label.set_ellipsize(Pango.EllipsizeMode.END)
+        subtitle_label.add_css_class("dim-label")
+        subtitle_label.add_css_class("caption")
+        box.append(subtitle_label)
+
+        resolution_label = Gtk.Label(xalign=0)
+        resolution_label.set_ellipsize(Pango.EllipsizeMode.END)
+        resolution_label.add_css_class("caption")
+        resolution_label.set_visible(False)
+        box.append(resolution_label)
+
+        expander.set_child(box)
+
+        popover = Gtk.Popover()
+        menu_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        menu_box.set_margin_top(6)
+        menu_box.set_margin_bottom(6)
+        menu_box.set_margin_start(6)
+        menu_box.set_margin_end(6)
+
+        duplicate_btn = Gtk.Button.new_with_label(_("Duplicate Host"))
+        duplicate_btn.connect("clicked", self._on_duplicate_host_clicked, expander)
+        menu_box.append(duplicate_btn)
+
+        delete_btn = Gtk.Button.new_with_label(_("Delete Host"))
+        delete_btn.connect("clicked", self._on_delete_host_clicked, expander)
+        menu_box.append(delete_btn)
+
+        popover.set_child(menu_box)
+        popover.set_has_arrow(True)
+        popover.set_parent(expander)
+
+        # Gesture for right-click
+        gesture = Gtk.GestureClick.new()
+        gesture.set_button(Gdk.BUTTON_SECONDARY)
+
+        def on_pressed(gest, n_press, x, y):
+            if not isinstance(expander._item, HostItem):
+                return
+            rect = Gdk.Rectangle()
+            rect.x = int(x)
+            rect.y = int(y)
+            rect.width = 1
+            rect.height = 1
+            popover.set_pointing_to(rect)
+            popover.popup()
+
+        gesture.connect("pressed", on_pressed)
+        expander.add_controller(gesture)
+
+        expander._title_label = title_label
+        expander._subtitle_label = subtitle_label
+        expander._latency_label = latency_label
+        expander._status_badge = status_badge
+        expander._status_handler = None
+        expander._resolution_label = resolution_label
+        expander._resolution_handler = None
+        expander._popover = popover
+        expander._item = None
+        expander._row = None
+        expander._bindings = []
+        expander._expanded_handler = None
+        list_item.set_child(expander)
+
+    def _on_factory_bind(self, factory, list_item):
+        expander = list_item.get_child()
+        row = list_item.get_item()
+        item = row.get_item()
+        expander.set_list_row(row)
+        expander._item = item
+        expander._row = row
+
+        flags = GObject.BindingFlags.SYNC_CREATE
+        expander._bindings = [
+            item.bind_property("title", expander._title_label, "label", flags),
+            item.bind_property("subtitle", expander._subtitle_label, "label", flags),
+        ]
+
+        is_group = isinstance(item, HostGroup)
+        list_item.set_selectable(not is_group)
+        list_item.set_activatable(not is_group)
+        if is_group:
+            expander._title_label.add_css_class("heading")
+            expander._expanded_handler = row.connect("notify::expanded", self._on_group_expanded, item)
+            expander._latency_label.set_visible(False)
+            expander._status_badge.set_visible(False)
+            expander._resolution_label.set_visible(False)
+        else:
+            expander._title_label.remove_css_class("heading")
+            expander._bindings += [
+                item.bind_property("status_tooltip", expander._status_badge, "tooltip-text", flags),
+                item.bind_property("latency", expander._latency_label, "label", flags),
+                item.bind_property("latency", expander._latency_label, "visible", flags,
+                                   lambda _binding, text: bool(text)),
+            ]
+            expander._status_handler = item.connect("notify::status", self._on_item_status_changed, expander)
+            self._show_status_badge(expander._status_badge, item.status)
+            expander._resolution_handler = item.connect(
+                "notify::resolution", self._on_item_resolution_changed, expander
+            )
+            self._show_resolution(expander._resolution_label, item)
+            if self._resolver is not None:
+                self._resolver(item.host)
+
+    def _on_factory_unbind(self, factory, list_item):
+        expander = list_item.get_child()
+        for binding in expander._bindings:
+            binding.unbind()
+        expander._bindings = []
+        if expander._expanded_handler is not None:
+            expander._row.disconnect(expander._expanded_handler)
+            expander._expanded_handler = None
+        if expander._status_handler is not None:
+            expander._item.disconnect(expander._status_handler)
+            expander._status_handler = None
+        if expander._resolution_handler is not None:
+            expander._item.disconnect(expander._resolution_handler)
+            expander._resolution_handler = None
+        expander._item = None
+        expander._row = None
+        expander.set_list_row(None)
+
+    def _on_item_status_changed(self, item, _pspec, expander):
+        self._show_status_badge(expander._status_badge, item.status)
+
+    @staticmethod
+    def _show_status_badge(badge: Gtk.Label, status: str):
+        label, css_class = _status_badge(status)
+        for name in ("success", "error", "warning", "dim-label"):
+            badge.remove_css_class(name)
+        if css_class:
+            badge.add_css_class(css_class)
+        badge.set_label(label)
+        badge.set_visible(bool(label))
+
+    def _on_item_resolution_changed(self, item, _pspec, expander):
+        self._show_resolution(expander._resolution_label, item)
+
+    @staticmethod
+    def _show_resolution(label: Gtk.Label, item: HostItem):
+        if item.resolution_failed:
+            label.remove_css_class("dim-label")
+            label.add_css_class("error")
+        else:
+            label.remove_css_class("error")
+            label.add_css_class("dim-label")
+        label.set_label(item.resolution)
+        label.set_visible(bool(item.resolution))
+
+    def _on_factory_teardown(self, factory, list_item):
+        expander = list_item.get_child()
+        if expander is not None and expander._popover is not None:
+            expander._popover.unparent()
+            expander._popover = None
+
+    def _on_group_expanded(self, row, _pspec, group):
+        if row.get_expanded():
+            self._expanded_groups.add(group.key)
+        else:
+            self._expanded_groups.discard(group.key)
 
-    def _on_delete_host_clicked(self, button, host):
-        """Handle delete host button click from an ActionRow."""
-        self.delete_host(host)
+    def _on_selection_changed(self, selection, position, n_items):
+        hosts = self.get_selected_hosts()
+        self.emit("selection-count-changed", len(hosts))
+        # The editor follows the selection only while a single host is selected
+        if len(hosts) != 1:
+            return
+        self._selected_host = hosts[0]
+        if not self._suppress_selected_signal:
+            self.emit("host-selected", hosts[0])
+
+    def get_selected_hosts(self) -> list:
+        """Hosts of all selected rows, in list order."""
+        bitset = self._selection.get_selection()
+        hosts = []
+        for index in range(bitset.get_size()):
+            row = self._tree_model.get_item(bitset.get_nth(index))
+            item = row.get_item() if row is not None else None
+            if isinstance(item, HostItem):
+                hosts.append(item.host)
+        return hosts
+
+    def select_hosts(self, hosts: list):
+        """Select the rows of hosts, replacing the current selection, without notifying the editor."""
+        positions = Gtk.Bitset.new_empty()
+        for host in hosts:
+            item = self._items.get(id(host))
+            if item is None or item.host is not host:
+                continue
+            position = self._find_row_position(item)
+            if position is not None:
+                positions.add(position)
+        mask = Gtk.Bitset.new_range(0, self._tree_model.get_n_items())
+        self._suppress_selected_signal = True
+        try:
+            self._selection.set_selection(positions, mask)
+        finally:
+            self._suppress_selected_signal = False
+
+    def _context_hosts(self, expander):
+        """Hosts a row's context menu acts on: the selection if the row is part of it."""
+        if not isinstance(expander._item, HostItem):
+            return []
+        selected = self.get_selected_hosts()
+        if any(host is expander._item.host for host in selected):
+            return selected
+        return [expander._item.host]
+
+    def _on_duplicate_host_clicked(self, button, expander):
+        """Handle duplicate host button click from a row's context menu."""
+        expander._popover.popdown()
+        hosts = self._context_hosts(expander)
+        if hosts:
+            self.duplicate_hosts(hosts)
+
+    def _on_delete_host_clicked(self, button, expander):
+        """Handle delete host button click from a row's context menu."""
+        expander._popover.popdown()
+        hosts = self._context_hosts(expander)
+        if hosts:
+            self.delete_hosts(hosts)
 
     def add_host(self):
         """Add a new host."""
         new_host = SSHHost(patterns=["new-host"])
         self.emit("host-added", new_host)
 
-        self.filter_hosts(self.current_filter)
+        self.filter_hosts(self.current_filter, chunked=False)
 
         self.select_host(new_host)
 
     def duplicate_host(self, original_host: SSHHost = None):
-        """Duplicate the selected host."""
-        if original_host is None:
-            original_host = self._get_selected_host()
-        if original_host is not None:
-            duplicated_host = self._duplicate_host(original_host)
+        """Duplicate one host, or the selection when none is given."""
+        self.duplicate_hosts([original_host] if original_host is not None else None)
+
+    def duplicate_hosts(self, hosts: list = None):
+        """Duplicate hosts, by default the selected ones, with a single list refresh."""
+        if hosts is None:
+            hosts = self.get_selected_hosts()
+        if not hosts:
+            return
+        taken = {pattern for host in self.hosts for pattern in host.patterns}
+        duplicates = [self._duplicate_host(host, taken) for host in hosts]
 
-            self.emit("host-added", duplicated_host)
+        self.emit("hosts-duplicated", duplicates)
 
-            self.filter_hosts(self.current_filter)
+        self.filter_hosts(self.current_filter, chunked=False)
 
-            self.select_host(duplicated_host)
+        if len(duplicates) == 1:
+            self.select_host(duplicates[0])
+        else:
+            self.select_hosts(duplicates)
 
     def delete_host(self, host_to_delete: SSHHost = None):
-        """Delete the selected host."""
-        if host_to_delete is None:
-            host_to_delete = self._get_selected_host()
-        if host_to_delete is not None:
-
-            dialog = Gtk.MessageDialog(
-                transient_for=self.get_root(),
-                message_type=Gtk.MessageType.QUESTION,
-                buttons=Gtk.ButtonsType.NONE,
-                text=_(f"Delete host '{', '.join(host_to_delete.patterns)}'?"),
-            )
-            dialog.add_buttons(
-                _("No"), Gtk.ResponseType.NO,
-                _("Yes"), Gtk.ResponseType.YES,
-            )
+        """Delete one host, or the selection when none is given."""
+        self.delete_hosts([host_to_delete] if host_to_delete is not None else None)
+
+    def delete_hosts(self, hosts: list = None):
+        """Delete hosts, by default the selected ones, after a single confirmation."""
+        if hosts is None:
+            hosts = self.get_selected_hosts()
+        if not hosts:
+            return
 
-            def on_response(dlg, response_id):
-                if response_id == Gtk.ResponseType.YES:
-                    self.emit("host-deleted", host_to_delete)
-                    if host_to_delete in self.hosts:
-                        self.hosts.remove(host_to_delete)
-                    if host_to_delete in self.filtered_hosts:
-                        self.filtered_hosts.remove(host_to_delete)
-                    self._refresh_view()
-                    self._update_count()
-                dlg.destroy()
-
-            dialog.connect("response", on_response)
-            dialog.present()
-
-    def _duplicate_host(self, original_host: SSHHost) -> SSHHost:
+        if len(hosts) == 1:
+            text = _(f"Delete host '{', '.join(hosts[0].patterns)}'?")
+            secondary = None
+        else:
+            text = _(f"Delete {len(hosts)} hosts?")
+            names = [host.patterns[0] for host in hosts[:10] if host.patterns]
+            secondary = ", ".join(names) + (", …" if len(hosts) > 10 else "")
+        dialog = Gtk.MessageDialog(
+            transient_for=self.get_root(),
+            message_type=Gtk.MessageType.QUESTION,
+            buttons=Gtk.ButtonsType.NONE,
+            text=text,
+            secondary_text=secondary,
+        )
+        dialog.add_buttons(
+            _("No"), Gtk.ResponseType.NO,
+            _("Yes"), Gtk.ResponseType.YES,
+        )
+
+        def on_response(dlg, response_id):
+            if response_id == Gtk.ResponseType.YES:
+                self._remove_hosts(hosts)
+            dlg.destroy()
+
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def _remove_hosts(self, hosts: list):
+        """Drop hosts from the list by identity in one pass and refresh the view once."""
+        removed = {id(host) for host in hosts}
+        self.emit("hosts-deleted", hosts)
+        # self.hosts may be the configuration's own list; filter it in place
+        self.hosts[:] = [host for host in self.hosts if id(host) not in removed]
+        for host_id in removed:
+            self._items.pop(host_id, None)
+        if self._selected_host is not None and id(self._selected_host) in removed:
+            self._selected_host = None
+        if self._filter_source_id is not None:
+            # A chunked filter is still scanning the old list; restart it
+            self.filter_hosts(self.current_filter)
+            return
+        self.filtered_hosts = [host for host in self.filtered_hosts if id(host) not in removed]
+        self._refresh_view()
+        self._update_count()
+
+    def _duplicate_host(self, original_host: SSHHost, taken: set) -> SSHHost:
         duplicated_host = SSHHost()
 
-        duplicated_host.patterns = [f"{pattern}-copy" for pattern in original_host.patterns]
+        patterns = []
+        for pattern in original_host.patterns:
+            candidate = f"{pattern}-copy"
+            suffix = 2
+            while candidate in taken:
+                candidate = f"{pattern}-copy-{suffix}"
+                suffix += 1
+            taken.add(candidate)
+            patterns.append(candidate)
+        duplicated_host.patterns = patterns
 
-        for option in original_host.options:
-            duplicated_option = SSHOption(
-                key=option.key,
-                value=option.value,
-                indentation=option.indentation
-            )
-            duplicated_host.options.append(duplicated_option)
+        # Options are immutable, so the copy can share them with the original
+        duplicated_host.options = list(original_host.options)
 
         return duplicated_host
 
 
-    def select_host(self, host: SSHHost):
-        for index, row in enumerate(self.list_store):
-            if row[5] == host:
-                if hasattr(self, 'tree_view') and self.tree_view is not None:
-                    tree_iter = self.list_store.iter_nth_child(None, index)
-                    if tree_iter is None:
-                        return
-                    selection = self.tree_view.get_selection()
-                    selection.select_iter(tree_iter)
-                    path = self.list_store.get_path(tree_iter)
-                    if path is not None:
-                        self.tree_view.scroll_to_cell(path, None, False, 0, 0)
-                elif hasattr(self, 'list_box') and self.list_box is not None:
-                    row_widget = self.list_box.get_row_at_index(index)
-                    if row_widget is not None:
-                        self.list_box.select_row(row_widget)
-                        try:
-                            row_widget.grab_focus()
-                        except Exception:
-                            pass
-                break
-
-    def _rebuild_listbox_rows(self):
-        if not hasattr(self, 'list_box') or self.list_box is None:
+    def select_host(self, host: SSHHost, notify: bool = True):
+        item = self._items.get(id(host))
+        if item is None or item.host is not host:
             return
-        # Clear existing rows
-        while (child := self.list_box.get_first_child()) is not None:
-            self.list_box.remove(child)
-
-        for row in self.list_store:
-            host = row[5]
-            patterns = row[0]
-            hostname = row[1]
-            user = row[2]
-            # Use Adw.ActionRow for nicer list presentation
-            action_row = Adw.ActionRow()
-            action_row.set_title(patterns)
-            secondary = f"{user}@{hostname}" if (hostname or user) else (hostname or patterns)
-            action_row.set_subtitle(secondary)
-
-            popover = Gtk.Popover()
-            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
-            box.set_margin_top(6)
-            box.set_margin_bottom(6)
-            box.set_margin_start(6)
-            box.set_margin_end(6)
-
-            duplicate_btn = Gtk.Button.new_with_label(_("Duplicate Host"))
-            duplicate_btn.connect("clicked", self._on_duplicate_host_clicked, host)
-            box.append(duplicate_btn)
-
-            delete_btn = Gtk.Button.new_with_label(_("Delete Host"))
-            delete_btn.connect("clicked", self._on_delete_host_clicked, host)
-            box.append(delete_btn)
-
-            popover.set_child(box)
-            popover.set_has_arrow(True)
-
-            # Gesture for right-click
-            gesture = Gtk.GestureClick.new()
-            gesture.set_button(Gdk.BUTTON_SECONDARY)
-
-            def on_pressed(gest, n_press, x, y):
-                popover.set_parent(action_row)
-                rect = Gdk.Rectangle()
-                rect.x = int(x)
-                rect.y = int(y)
-                rect.width = 1
-                rect.height = 1
-                popover.set_pointing_to(rect)
-                popover.popup()
-
-            gesture.connect("pressed", on_pressed)
-            action_row.add_controller(gesture)
-
-            action_row.set_selectable(True)
-            action_row.set_activatable(True)
-            action_row._host_ref = host
-            self.list_box.append(action_row)
-
-    def _on_row_selected(self, listbox, row):
-        if row is None:
+        position = self._find_row_position(item)
+        if position is None:
             return
-        host = getattr(row, "_host_ref", None)
-        if host is not None:
-            self._selected_host = host
-            self.emit("host-selected", host)
+        self._suppress_selected_signal = not notify
+        try:
+            self._selection.select_item(position, True)
+        finally:
+            self._suppress_selected_signal = False
+        try:
+            self.list_view.scroll_to(position, Gtk.ListScrollFlags.FOCUS, None)
+        except Exception:
+            pass
+
+    def _find_row_position(self, item: HostItem):
+        """Return the flattened tree position of an item, expanding its group if needed."""
+        if item.group_key is None:
+            index = self._sorted_positions.get(item)
+            if index is None:
+                return None
+            row = self._tree_model.get_child_row(index)
+            return row.get_position() if row is not None else None
+
+        group = self._groups.get(item.group_key)
+        if group is None:
+            return None
+        group_index = self._sorted_positions.get(group)
+        child_index = group.sorted_positions.get(item)
+        if group_index is None or child_index is None:
+            return None
+        group_row = self._tree_model.get_child_row(group_index)
+        if group_row is None:
+            return None
+        group_row.set_expanded(True)
+        child_row = group_row.get_child_row(child_index)
+        return child_row.get_position() if child_row is not None else None
 
     def _get_selected_host(self):
-        # Prefer ListBox selection when available
-        if hasattr(self, 'list_box') and self.list_box is not None:
-            try:
-                row = self.list_box.get_selected_row()
-            except Exception:
-                row = None
-            if row is not None:
-                host = getattr(row, "_host_ref", None)
-                if host is not None:
-                    return host
-        # Fallback to TreeView selection
-        if hasattr(self, 'tree_view') and self.tree_view is not None:
-            selection = self.tree_view.get_selection()
-            model, tree_iter = selection.get_selected()
-            if tree_iter:
-                return model.get_value(tree_iter, 5)
+        selection = self._selection.get_selection()
+        if selection.get_size() > 0:
+            row = self._tree_model.get_item(selection.get_minimum())
+            item = row.get_item() if row is not None else None
+            if isinstance(item, HostItem):
+                return item.host
         # Fallback to last selected cache
         return self._selected_host
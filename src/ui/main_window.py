@@ -4,12 +4,25 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Gio, GLib, Pango, GdkPixbuf, Gdk, Adw
 from pathlib import Path
 from gettext import gettext as _
+import logging
+import os
 import sys
+import time
 
 from .host_list import HostList
-from .host_editor import HostEditor
 from .search_bar import SearchBar
 
+try:
+    from ssh_config_studio.completion import CompletionIndex
+    from ssh_config_studio.bulk_edit import apply_bulk_edit
+    from ssh_config_studio.ssh_keywords import unknown_keywords, validate_hosts
+    from ssh_config_studio.config_journal import AddHosts, RemoveHosts, ReplaceHostState, Batch
+except ImportError:
+    from completion import CompletionIndex
+    from bulk_edit import apply_bulk_edit
+    from ssh_keywords import unknown_keywords, validate_hosts
+    from config_journal import AddHosts, RemoveHosts, ReplaceHostState, Batch
+
 @Gtk.Template(resource_path="/com/sshconfigstudio/app/ui/main_window.ui")
 class MainWindow(Adw.ApplicationWindow):
     """Main application window for SSH Config Studio."""
@@ -25,7 +38,8 @@ class MainWindow(Adw.ApplicationWindow):
     search_bar = Gtk.Template.Child()
     split_view = Gtk.Template.Child()
     host_list = Gtk.Template.Child()
-    host_editor = Gtk.Template.Child()
+    editor_bin = Gtk.Template.Child()
+    content_nav = Gtk.Template.Child()
 
     def __init__(self, app):
         super().__init__(
@@ -36,9 +50,25 @@ class MainWindow(Adw.ApplicationWindow):
         self.parser = app.parser
         self.is_dirty = False
         self._raw_wrap_lines = False
+        self._tcp_preflight = True
+        self.completion_index = CompletionIndex()
+        self.config_editor = None
+        self._config_page = None
+        # Both are built on first use: the scanner loads the probe machinery and
+        # the editor is a large widget tree that stays hidden until a host is shown
+        self.fleet_scanner = None
+        self.host_editor = None
+        self._pending_prefetch = []
+        self._scan_handle = None
+        self._scan_token = None
+        # True while the parse started by the application is still running
+        self._loading = False
+        self.host_list.set_resolver(self._prefetch_dns)
         
         self._connect_signals()
-        self._load_config()
+        self._wait_for_initial_parse()
+        self._first_frame_handler = None
+        self.connect("map", self._on_first_map)
         
         self.connect("notify::has-focus", self._on_window_focus_changed)
         
@@ -60,21 +90,34 @@ class MainWindow(Adw.ApplicationWindow):
         except Exception:
             pass
     
-    def _setup_split_view(self):
-        """Set up the split view between host list and editor."""
-        self.host_list = HostList()
-        self.host_editor = HostEditor()
-        try:
-            self.host_editor.set_app(self.app)
-        except Exception:
-            return
-        
-        paned = Gtk.Paned(orientation=Gtk.Orientation.HORIZONTAL)
-        paned.set_start_child(self.host_list)
-        paned.set_end_child(self.host_editor)
-        paned.set_position(400)
-        
-        self.main_box.append(paned)
+    def _ensure_host_editor(self):
+        """Return the host editor, building it the first time a host is shown."""
+        if self.host_editor is None:
+            from .host_editor import HostEditor
+
+            editor = HostEditor()
+            editor.set_completion_index(self.completion_index)
+            if self.parser:
+                editor.set_journal(self.parser.config.journal)
+            editor.set_wrap_mode(self._raw_wrap_lines)
+            editor.set_tcp_preflight(self._tcp_preflight)
+            editor.set_control_pool(self.app.control_pool)
+            editor.connect("host-changed", self._on_host_changed)
+            editor.connect("host-save", self._on_host_save)
+            editor.connect("editor-validity-changed", self._on_editor_validity_changed)
+            editor.connect("connection-tested", self._on_connection_tested)
+            self.editor_bin.set_child(editor)
+            self.host_editor = editor
+        return self.host_editor
+
+    def _flush_host_editor(self):
+        if self.host_editor is not None:
+            self.host_editor.flush()
+
+    def _hide_host_editor(self):
+        if self.host_editor is not None:
+            self.host_editor.load_host(None)
+            self.host_editor.set_visible(False)
     
     def _connect_signals(self):
         """Connect all the signal handlers."""
@@ -101,13 +144,12 @@ class MainWindow(Adw.ApplicationWindow):
 
         self.host_list.connect("host-selected", self._on_host_selected)
         self.host_list.connect("host-added", self._on_host_added)
-        self.host_list.connect("host-deleted", self._on_host_deleted)
-        
-        self.host_editor.connect("host-changed", self._on_host_changed)
-        self.host_editor.connect("host-save", self._on_host_save)
-        self.host_editor.connect("editor-validity-changed", self._on_editor_validity_changed)
+        self.host_list.connect("hosts-duplicated", self._on_hosts_duplicated)
+        self.host_list.connect("hosts-deleted", self._on_hosts_deleted)
         
         self.search_bar.connect("search-changed", self._on_search_changed)
+        self.host_list.connect("filter-finished", self._on_filter_finished)
+        self.host_list.connect("selection-count-changed", self._on_selection_count_changed)
         
         self._setup_actions()
     
@@ -134,12 +176,39 @@ class MainWindow(Adw.ApplicationWindow):
         search_action.connect("activate", self._on_search_action)
         actions.add_action(search_action)
         
+        edit_config_action = Gio.SimpleAction.new("edit-config", None)
+        edit_config_action.connect("activate", self._on_edit_config)
+        actions.add_action(edit_config_action)
+        
+        self._bulk_edit_action = Gio.SimpleAction.new("bulk-edit", None)
+        self._bulk_edit_action.connect("activate", self._on_bulk_edit)
+        self._bulk_edit_action.set_enabled(False)
+        actions.add_action(self._bulk_edit_action)
+        
+        undo_action = Gio.SimpleAction.new("undo", None)
+        undo_action.connect("activate", self._on_undo)
+        actions.add_action(undo_action)
+        
+        redo_action = Gio.SimpleAction.new("redo", None)
+        redo_action.connect("activate", self._on_redo)
+        actions.add_action(redo_action)
+        
+        test_all_action = Gio.SimpleAction.new("test-all", None)
+        test_all_action.connect("activate", lambda a, p: self._start_scan(self.host_list.hosts))
+        actions.add_action(test_all_action)
+        
+        test_filtered_action = Gio.SimpleAction.new("test-filtered", None)
+        test_filtered_action.connect("activate", lambda a, p: self._start_scan(self.host_list.filtered_hosts))
+        actions.add_action(test_filtered_action)
+        
         self.insert_action_group("app", actions)
         
         try:
             app = self.get_application() or self.app
             if app is not None:
                 app.set_accels_for_action("app.search", ["<primary>f"])
+                app.set_accels_for_action("app.undo", ["<primary>z"])
+                app.set_accels_for_action("app.redo", ["<primary><shift>z", "<primary>y"])
         except Exception:
             pass
     
@@ -166,15 +235,70 @@ class MainWindow(Adw.ApplicationWindow):
     
     def _load_config(self):
         """Load the SSH configuration."""
-        if not self.parser:
+        if not self.parser or self._loading:
             return
         
         try:
-            self.parser.parse()
-            self.host_list.load_hosts(self.parser.config.hosts)
-            self._update_status("Configuration loaded successfully")
+            self.parser.parse(use_cache=True)
+            self._show_config()
         except Exception as e:
             self._show_error(f"Failed to load configuration: {e}")
+
+    def reload_config(self):
+        self._load_config()
+
+    def _show_config(self):
+        self.host_list.load_hosts(self.parser.config.hosts)
+        self.completion_index.load(self.parser.config.hosts)
+        self._refresh_config_editor()
+        self._update_status("Configuration loaded successfully")
+
+    def _wait_for_initial_parse(self):
+        """Show the parse the application started at launch once it finishes.
+
+        The window is presented right away with the list in a loading state;
+        parsing again here would block the first frame on the config size.
+        """
+        future = getattr(self.app, "parse_future", None)
+        if not self.parser or future is None:
+            self._load_config()
+            return
+        self._set_loading(True)
+        future.add_done_callback(lambda f: GLib.idle_add(self._on_initial_parse_done, f))
+
+    def _set_loading(self, loading: bool):
+        # Editing is held back until the worker thread is done with the model
+        self._loading = loading
+        self.host_list.set_loading(loading)
+        for button in (self.add_button, self.duplicate_button, self.delete_button):
+            button.set_sensitive(not loading)
+
+    def _on_initial_parse_done(self, future):
+        self._set_loading(False)
+        error = future.exception()
+        if error is not None:
+            self._show_error(f"Failed to load configuration: {error}")
+            return False
+        self._show_config()
+        started_at = getattr(self.app, "started_at", None)
+        if started_at is not None:
+            logging.info(f"Hosts shown {(time.perf_counter() - started_at) * 1000:.1f} ms after start")
+        return False
+
+    def _on_first_map(self, window):
+        clock = self.get_frame_clock()
+        if clock is None or self._first_frame_handler is not None:
+            return
+        self._first_frame_handler = clock.connect("after-paint", self._on_first_frame)
+
+    def _on_first_frame(self, clock):
+        clock.disconnect(self._first_frame_handler)
+        started_at = getattr(self.app, "started_at", None)
+        if started_at is not None:
+            logging.info(f"Time to first frame: {(time.perf_counter() - started_at) * 1000:.1f} ms")
+        if os.environ.get("SSH_CONFIG_STUDIO_EXIT_AFTER_FIRST_FRAME"):
+            # Set by tools/startup_benchmark.py to time whole launches
+            GLib.idle_add(self.app.quit)
     
     def _toggle_search(self, force=None):
         try:
@@ -200,11 +324,11 @@ class MainWindow(Adw.ApplicationWindow):
 
     def _on_duplicate_clicked(self, button):
         """Handle duplicate host button click."""
-        self.host_list.duplicate_host()
+        self.host_list.duplicate_hosts()
 
     def _on_delete_clicked(self, button):
         """Handle delete host button click."""
-        self.host_list.delete_host()
+        self.host_list.delete_hosts()
 
     def _on_host_save(self, editor, host):
         """Handle host save signal from editor."""
@@ -226,10 +350,10 @@ class MainWindow(Adw.ApplicationWindow):
         pass
     
     def _on_save_clicked(self, button):
-        if not self.parser:
+        if not self.parser or self._loading:
             return
         try:
-            errors = self.parser.validate()
+            errors = self.parser.validate() + self.parser.warnings()
             if errors:
                 dialog = Gtk.MessageDialog(
                     transient_for=self,
@@ -241,9 +365,11 @@ class MainWindow(Adw.ApplicationWindow):
                 dialog.connect("response", lambda d, r: d.destroy())
                 dialog.present()
             self.parser.write(backup=True)
-            self.parser.parse()
+            self.parser.parse(use_cache=True)
             
             self.host_list.load_hosts(self.parser.config.hosts)
+            self.completion_index.load(self.parser.config.hosts)
+            self._refresh_config_editor()
             self.is_dirty = False
             if self.save_button is not None:
                 self.save_button.set_sensitive(False)
@@ -253,8 +379,9 @@ class MainWindow(Adw.ApplicationWindow):
     
     def _on_host_selected(self, host_list, host):
         """Handle host selection from the list."""
-        self.host_editor.load_host(host)
-        self.host_editor.set_visible(True)
+        editor = self._ensure_host_editor()
+        editor.load_host(host)
+        editor.set_visible(True)
         # Uncollapse split view to show editor alongside the list
         try:
             if self.split_view.get_collapsed():
@@ -274,27 +401,49 @@ class MainWindow(Adw.ApplicationWindow):
             host.patterns = [new_pattern]
             host.raw_lines = [f"Host {new_pattern}"]
 
-            self.parser.config.add_host(host)
+            config = self.parser.config
+            config.journal.execute(config, AddHosts([host]))
+            self.completion_index.add_host(host)
             self.is_dirty = True
             if self.save_button is not None:
                 self.save_button.set_sensitive(True)
             self._update_status(_("Host added"))
-            self.host_editor.set_visible(True)
-            self.host_editor.load_host(host)
+            editor = self._ensure_host_editor()
+            editor.set_visible(True)
+            editor.load_host(host)
     
-    def _on_host_deleted(self, host_list, host):
-        """Handle host deletion."""
+    def _on_hosts_duplicated(self, host_list, hosts):
         if self.parser:
-            self.parser.config.remove_host(host)
+            config = self.parser.config
+            config.journal.execute(config, AddHosts(hosts))
+            for host in hosts:
+                self.completion_index.add_host(host)
             self.is_dirty = True
             if self.save_button is not None:
                 self.save_button.set_sensitive(True)
-            self._update_status(_("Host deleted"))
+            self._update_status(_("Host duplicated") if len(hosts) == 1 else _(f"{len(hosts)} hosts duplicated"))
+            if len(hosts) == 1:
+                editor = self._ensure_host_editor()
+                editor.set_visible(True)
+                editor.load_host(hosts[0])
+
+    def _on_hosts_deleted(self, host_list, hosts):
+        """Handle deletion of one or more hosts."""
+        if self.parser:
+            config = self.parser.config
+            config.journal.execute(config, RemoveHosts(hosts))
+            for host in hosts:
+                self.completion_index.remove_host(host)
+            self.is_dirty = True
+            if self.save_button is not None:
+                self.save_button.set_sensitive(True)
+            self._update_status(_("Host deleted") if len(hosts) == 1 else _(f"{len(hosts)} hosts deleted"))
             
             if not self.parser.config.hosts:
-                self.host_editor.current_host = None
-                self.host_editor._clear_all_fields()
-                self.host_editor.set_visible(False)
+                if self.host_editor is not None:
+                    self.host_editor.current_host = None
+                    self.host_editor._clear_all_fields()
+                    self.host_editor.set_visible(False)
                 if self.save_button is not None:
                     self.save_button.set_sensitive(False)
                 self.is_dirty = False
@@ -307,11 +456,132 @@ class MainWindow(Adw.ApplicationWindow):
                 self.host_list.select_host(self.parser.config.hosts[0])
     
     def _on_host_changed(self, editor, host):
+        self.host_list.update_host(host)
+        self.completion_index.update_host(host)
         self.is_dirty = self.parser.config.is_dirty()
         if self.save_button is not None:
             if self.save_button is not None:
                 self.save_button.set_sensitive(self.is_dirty)
 
+    def _get_fleet_scanner(self):
+        if self.fleet_scanner is None:
+            try:
+                from ssh_config_studio.fleet_scan import FleetScanner
+            except ImportError:
+                from fleet_scan import FleetScanner
+            self.fleet_scanner = FleetScanner(preflight=self._tcp_preflight)
+        return self.fleet_scanner
+
+    def _on_connection_tested(self, editor, host, succeeded: bool):
+        try:
+            from ssh_config_studio.fleet_scan import REACHABLE, UNREACHABLE
+        except ImportError:
+            from fleet_scan import REACHABLE, UNREACHABLE
+        self.host_list.mark_connected(host)
+        self.host_list.set_host_status(host, REACHABLE if succeeded else UNREACHABLE)
+        self._show_latency(host)
+
+    def _show_latency(self, host):
+        try:
+            from ssh_config_studio.preflight import preflight_target
+        except ImportError:
+            from preflight import preflight_target
+        target = preflight_target(host)
+        median = self._get_fleet_scanner().runner.latencies.median(target) if target else None
+        if median is not None:
+            self.host_list.set_host_latency(host, median)
+
+    def _prefetch_dns(self, host):
+        """Resolve the HostName of a row coming into view, through the shared DNS cache.
+
+        Rows are queued and resolved from a low priority idle callback, so
+        the first rows are drawn before the resolver and its thread exist.
+        """
+        if not self._pending_prefetch:
+            GLib.idle_add(self._flush_prefetch, priority=GLib.PRIORITY_LOW)
+        self._pending_prefetch.append(host)
+
+    def _flush_prefetch(self):
+        try:
+            from ssh_config_studio.preflight import preflight_target
+            from ssh_config_studio.dns_cache import is_ip_address
+        except ImportError:
+            from preflight import preflight_target
+            from dns_cache import is_ip_address
+        hosts, self._pending_prefetch = self._pending_prefetch, []
+        runner = self._get_fleet_scanner().runner
+        for host in hosts:
+            target = preflight_target(host)
+            if target is None or is_ip_address(target[0]):
+                self.host_list.set_host_resolution(host, "")
+                continue
+            runner.prefetch(
+                target[0], lambda resolution, host=host: GLib.idle_add(self._show_resolution, host, resolution)
+            )
+        return False
+
+    def _show_resolution(self, host, resolution):
+        try:
+            from ssh_config_studio.preflight import preflight_target
+        except ImportError:
+            from preflight import preflight_target
+        target = preflight_target(host)
+        if target is None or target[0].lower() != resolution.hostname.lower():
+            # HostName changed while it was being resolved
+            return False
+        if resolution.ok:
+            shown = ", ".join(resolution.addresses[:2])
+            if len(resolution.addresses) > 2:
+                shown += f" +{len(resolution.addresses) - 2}"
+            self.host_list.set_host_resolution(host, shown)
+        else:
+            self.host_list.set_host_resolution(host, _(f"Cannot resolve: {resolution.error}"), failed=True)
+        return False
+
+    def _start_scan(self, hosts: list):
+        """Probe hosts in the background and show the outcome as row badges."""
+        try:
+            from ssh_config_studio.fleet_scan import PENDING, REACHABLE, scannable
+        except ImportError:
+            from fleet_scan import PENDING, REACHABLE, scannable
+        if self._scan_handle is not None:
+            self._scan_handle.cancel()
+        # Wildcard blocks are not hosts of their own and would stay pending forever
+        hosts = scannable(hosts)
+        if not hosts:
+            self._update_status(_("No hosts to test"))
+            return
+        for host in hosts:
+            self.host_list.set_host_status(host, PENDING)
+        self._update_status(_(f"Testing {len(hosts)} hosts..."))
+        counts = {}
+
+        def show_result(host, result):
+            counts[result.status] = counts.get(result.status, 0) + 1
+            exit_code = "-" if result.returncode is None else result.returncode
+            tooltip = _(f"Exit {exit_code} after {result.latency * 1000:.0f} ms")
+            self.host_list.set_host_status(host, result.status, tooltip)
+            if result.status == REACHABLE:
+                self.host_list.mark_connected(host)
+            self._show_latency(host)
+            return False
+
+        def show_finished(token):
+            if self._scan_token is not token:
+                return False
+            self._scan_handle = None
+            reachable = counts.get(REACHABLE, 0)
+            self._update_status(_(f"{reachable} of {sum(counts.values())} hosts reachable"))
+            return False
+
+        # Both callbacks arrive on the probe thread
+        token = self._scan_token = object()
+        self._scan_handle = self._get_fleet_scanner().scan(
+            hosts,
+            lambda host, result: GLib.idle_add(show_result, host, result),
+            lambda: GLib.idle_add(show_finished, token),
+        )
+
     def _on_editor_validity_changed(self, editor, is_valid: bool):
         if self.save_button is not None:
             if not is_valid:
@@ -324,6 +594,9 @@ class MainWindow(Adw.ApplicationWindow):
     def _on_search_changed(self, search_bar, query):
         """Handle search query changes."""
         self.host_list.filter_hosts(query)
+
+    def _on_filter_finished(self, host_list, seconds):
+        self.search_bar.record_search_cost(seconds)
     
     def _on_open_config(self, action, param):
         """Handle open config action."""
@@ -346,6 +619,141 @@ class MainWindow(Adw.ApplicationWindow):
         dialog.connect("response", on_file_chooser_response)
         dialog.show()
 
+    def _on_edit_config(self, action, param):
+        """Show the whole configuration file in a raw editor page."""
+        if not self.parser or self._loading:
+            return
+        if self._config_page is None:
+            from .config_editor import ConfigEditor
+
+            self.config_editor = ConfigEditor()
+            self.config_editor.connect("host-changed", self._on_host_changed)
+            self.config_editor.connect("config-reparsed", self._on_config_reparsed)
+            self.config_editor.connect("config-save", lambda editor: self._on_save_clicked(None))
+            self._config_page = Adw.NavigationPage(title=_("Configuration File"), child=self.config_editor)
+            self._config_page.connect("hidden", self._on_config_page_hidden)
+        self._flush_host_editor()
+        self.config_editor.load(self.parser)
+        if self.content_nav.get_visible_page() is not self._config_page:
+            self.content_nav.push(self._config_page)
+        try:
+            if self.split_view.get_collapsed():
+                self.split_view.set_show_content(True)
+        except Exception:
+            pass
+
+    def _on_selection_count_changed(self, host_list, count: int):
+        self._bulk_edit_action.set_enabled(count > 0)
+
+    def _on_bulk_edit(self, action, param):
+        """Edit every selected host in one pass."""
+        hosts = self.host_list.get_selected_hosts()
+        if not hosts or not self.parser:
+            return
+        from .bulk_edit_dialog import BulkEditDialog
+
+        dialog = BulkEditDialog(self, len(hosts))
+
+        def on_edit_requested(dlg, edit):
+            self._flush_host_editor()
+            before = {id(host): host.snapshot() for host in hosts}
+            try:
+                changed = apply_bulk_edit(hosts, edit)
+            except ValueError as e:
+                dlg.show_error(str(e))
+                return
+            dlg.close()
+            if not changed:
+                self._update_status(_("No hosts were changed"))
+                return
+            self.parser.config.journal.record(Batch(
+                [ReplaceHostState(host, before[id(host)], host.snapshot()) for host in changed]
+            ))
+            # One list update, one dirty check and one validation pass for the whole batch
+            self.host_list.update_hosts(changed)
+            for host in changed:
+                self.completion_index.update_host(host)
+            self.is_dirty = self.parser.config.is_dirty()
+            current = self.host_editor.current_host if self.host_editor is not None else None
+            if current is not None and any(host is current for host in changed):
+                self.host_editor.load_host(current)
+            errors = validate_hosts(changed) + unknown_keywords(changed, self.parser.config.global_options)
+            if errors:
+                self._show_warning(_("Validation warnings"), "\n".join(errors))
+            self._update_status(_(f"Updated {len(changed)} hosts"))
+
+        dialog.connect("edit-requested", on_edit_requested)
+        dialog.present()
+
+    def _on_undo(self, action, param):
+        if not self.parser:
+            return
+        self._flush_host_editor()
+        config = self.parser.config
+        command = config.journal.undo(config)
+        if command is None:
+            self._update_status(_("Nothing to undo"))
+            return
+        self._after_journal_step(command)
+        self._update_status(_(f"Undid: {command.label}"))
+
+    def _on_redo(self, action, param):
+        if not self.parser:
+            return
+        self._flush_host_editor()
+        config = self.parser.config
+        command = config.journal.redo(config)
+        if command is None:
+            self._update_status(_("Nothing to redo"))
+            return
+        self._after_journal_step(command)
+        self._update_status(_(f"Redid: {command.label}"))
+
+    def _after_journal_step(self, command):
+        """Bring the views in line with the hosts an undo or redo touched."""
+        hosts = command.hosts()
+        current = self.host_editor.current_host if self.host_editor is not None else None
+        if command.structural:
+            present = {id(host) for host in self.parser.config.hosts}
+            for host in hosts:
+                if id(host) in present:
+                    self.completion_index.update_host(host)
+                else:
+                    self.completion_index.remove_host(host)
+            self.host_list.sync_hosts()
+            if current is not None and id(current) not in present:
+                self._hide_host_editor()
+                current = None
+        else:
+            self.host_list.update_hosts(hosts)
+            for host in hosts:
+                self.completion_index.update_host(host)
+        if current is not None and any(host is current for host in hosts):
+            self.host_editor.load_host(current)
+        self._refresh_config_editor()
+        self.is_dirty = self.parser.config.is_dirty()
+        if self.save_button is not None:
+            self.save_button.set_sensitive(self.is_dirty)
+
+    def _refresh_config_editor(self):
+        """Reload the whole-file editor after the hosts were replaced, if it is shown."""
+        if self._config_page is not None and self.content_nav.get_visible_page() is self._config_page:
+            self.config_editor.load(self.parser)
+
+    def _on_config_reparsed(self, config_editor):
+        """Host objects were rebuilt from the raw text; refresh everything holding them."""
+        hosts = self.parser.config.hosts
+        self.host_list.load_hosts(hosts)
+        self.completion_index.load(hosts)
+        self._hide_host_editor()
+        self.is_dirty = self.parser.config.is_dirty()
+
+    def _on_config_page_hidden(self, page):
+        self.config_editor.flush()
+        host = self.host_editor.current_host if self.host_editor is not None else None
+        if host is not None and any(h is host for h in self.parser.config.hosts):
+            self.host_editor.load_host(host)
+
     def _on_reload(self, action, param):
         """Handle reload action."""
         self._load_config()
@@ -363,6 +771,8 @@ class MainWindow(Adw.ApplicationWindow):
             "editor_font_size": getattr(self, "_editor_font_size", 12),
             "prefer_dark_theme": getattr(self, "_prefer_dark_theme", False),
             "raw_wrap_lines": getattr(self, "_raw_wrap_lines", False),
+            "tcp_preflight": self._tcp_preflight,
+            "connection_multiplexing": self.app.control_pool is not None,
         }
         dialog.set_preferences(current_prefs)
 
@@ -395,10 +805,14 @@ class MainWindow(Adw.ApplicationWindow):
                 pass
             raw_wrap = bool(prefs.get("raw_wrap_lines", False))
             self._raw_wrap_lines = raw_wrap
-            try:
+            if self.host_editor is not None:
                 self.host_editor.set_wrap_mode(raw_wrap)
-            except Exception:
-                pass
+            self._tcp_preflight = bool(prefs.get("tcp_preflight", True))
+            if self.fleet_scanner is not None:
+                self.fleet_scanner.preflight = self._tcp_preflight
+            if self.host_editor is not None:
+                self.host_editor.set_tcp_preflight(self._tcp_preflight)
+            self._set_multiplexing(bool(prefs.get("connection_multiplexing", False)))
             if self.parser:
                 self._load_config()
             self._update_status(_("Preferences saved"))
@@ -407,6 +821,23 @@ class MainWindow(Adw.ApplicationWindow):
         dialog.connect("close-request", on_close_request)
         dialog.present()
     
+    def _set_multiplexing(self, enabled: bool):
+        if enabled and self.app.control_pool is None:
+            try:
+                from ssh_config_studio.control_pool import ControlPool
+            except ImportError:
+                from control_pool import ControlPool
+            try:
+                self.app.control_pool = ControlPool()
+            except OSError as e:
+                self._show_error(_(f"Cannot create the connection socket directory: {e}"))
+                return
+        elif not enabled and self.app.control_pool is not None:
+            self.app.control_pool.close()
+            self.app.control_pool = None
+        if self.host_editor is not None:
+            self.host_editor.set_control_pool(self.app.control_pool)
+
     def _on_about(self, action, param):
         """Show the about dialog using Adwaita's AboutWindow."""
         about_window = Adw.AboutWindow(
@@ -18,6 +18,8 @@ class PreferencesDialog(Adw.PreferencesWindow):
     editor_font_spin = Gtk.Template.Child()
     dark_theme_switch = Gtk.Template.Child()
     raw_wrap_switch = Gtk.Template.Child()
+    tcp_preflight_switch = Gtk.Template.Child()
+    multiplexing_switch = Gtk.Template.Child()
 
     def __init__(self, parent):
         super().__init__(transient_for=parent, modal=True)
@@ -77,7 +79,9 @@ class PreferencesDialog(Adw.PreferencesWindow):
             "auto_backup": self.auto_backup_switch.get_active(),
             "editor_font_size": int(self.editor_font_spin.get_value()),
             "prefer_dark_theme": self.dark_theme_switch.get_active(),
-            "raw_wrap_lines": self.raw_wrap_switch.get_active()
+            "raw_wrap_lines": self.raw_wrap_switch.get_active(),
+            "tcp_preflight": self.tcp_preflight_switch.get_active(),
+            "connection_multiplexing": self.multiplexing_switch.get_active()
         }
 
     def set_preferences(self, prefs: dict):
@@ -93,3 +97,7 @@ class PreferencesDialog(Adw.PreferencesWindow):
             self.dark_theme_switch.set_active(bool(prefs["prefer_dark_theme"]))
         if "raw_wrap_lines" in prefs:
             self.raw_wrap_switch.set_active(bool(prefs["raw_wrap_lines"]))
+        if "tcp_preflight" in prefs:
+            self.tcp_preflight_switch.set_active(bool(prefs["tcp_preflight"]))
+        if "connection_multiplexing" in prefs:
+            self.multiplexing_switch.set_active(bool(prefs["connection_multiplexing"]))
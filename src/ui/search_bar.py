@@ -15,31 +15,36 @@ class SearchBar(Gtk.Box):
         'search-changed': (GObject.SignalFlags.RUN_LAST, None, (str,))
     }
 
+    # Bounds for the adaptive debounce, in milliseconds
+    MIN_DEBOUNCE_MS = 40
+    MAX_DEBOUNCE_MS = 300
+
     def __init__(self):
         super().__init__()
 
         self.search_timeout = None
+        self._debounce_ms = 150
         # Ensure visible by default
         self.set_visible(True)
         self._connect_signals()
     def _connect_signals(self):
-        self.search_entry.connect("search-changed", self._on_search_changed)
         self.search_entry.connect("changed", self._on_text_changed)
         self.search_entry.connect("activate", self._on_search_activate)
 
-    def _on_search_changed(self, entry):
+    def _on_text_changed(self, entry):
         query = entry.get_text()
-
         if self.search_timeout:
             GLib.source_remove(self.search_timeout)
+        self.search_timeout = GLib.timeout_add(self._debounce_ms, self._perform_search, query)
 
-        self.search_timeout = GLib.timeout_add(300, self._perform_search, query)
+    def record_search_cost(self, seconds: float):
+        """Adapt the debounce delay to how long the last filter pass took.
 
-    def _on_text_changed(self, entry):
-        query = entry.get_text()
-        if self.search_timeout:
-            GLib.source_remove(self.search_timeout)
-        self.search_timeout = GLib.timeout_add(200, self._perform_search, query)
+        Cheap filters keep the list feeling live; expensive ones wait long
+        enough for a burst of keystrokes to collapse into a single search.
+        """
+        cost_ms = int(seconds * 1000)
+        self._debounce_ms = max(self.MIN_DEBOUNCE_MS, min(self.MAX_DEBOUNCE_MS, self.MIN_DEBOUNCE_MS + 2 * cost_ms))
 
     def _on_search_activate(self, entry):
         query = entry.get_text()
@@ -67,6 +72,9 @@ class SearchBar(Gtk.Box):
 
     def clear_search(self):
         self.search_entry.set_text("")
+        if self.search_timeout:
+            GLib.source_remove(self.search_timeout)
+            self.search_timeout = None
         self.emit("search-changed", "")
 
     def grab_focus(self):
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# The modules import each other by bare name when run from the source tree
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Logs "pid destination" and behaves by the destination's prefix: up-*
+# writes a line to each stream and succeeds after half a second, down-*
+# fails after half a second, hang-* never exits
+FAKE_SSH = """#!/bin/sh
+eval destination=\\${$(($# - 1))}
+echo "$$ $destination" >> "$FAKE_SSH_LOG"
+case "$destination" in
+    down-*) sleep 0.5; exit 255 ;;
+    hang-*) exec sleep 60 ;;
+esac
+echo "debug1: Connecting to $destination" >&2
+echo "hello from $destination"
+sleep 0.5
+exit 0
+"""
+
+
+class FakeSsh:
+    def __init__(self, path: Path, log: Path):
+        self.path = path
+        self.log = log
+
+    def invocations(self):
+        """(pid, destination) of every run so far."""
+        return [(int(pid), destination) for pid, destination in
+                (line.split() for line in self.log.read_text().splitlines())]
+
+    def wait_for_runs(self, count: int, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while len(self.invocations()) < count:
+            assert time.monotonic() < deadline, "fake ssh was not started"
+            time.sleep(0.05)
+
+    def wait_until_gone(self, pids, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while any(_alive(pid) for pid in pids):
+            assert time.monotonic() < deadline, "fake ssh outlived its probe"
+            time.sleep(0.05)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    path = tmp_path / "ssh"
+    path.write_text(FAKE_SSH)
+    path.chmod(0o755)
+    log = tmp_path / "ssh.log"
+    log.touch()
+    monkeypatch.setenv("FAKE_SSH_LOG", str(log))
+    monkeypatch.delenv("FLATPAK_ID", raising=False)
+    return FakeSsh(path, log)
+
+
+@pytest.fixture
+def runner():
+    from probe_runner import ProbeRunner
+    runner = ProbeRunner()
+    yield runner
+    runner.shutdown()
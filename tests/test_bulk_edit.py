@@ -0,0 +1,86 @@
+import pytest
+
+from bulk_edit import REMOVE_OPTION, RENAME_PATTERN, REPLACE_VALUE, SET_OPTION, BulkEdit, apply_bulk_edit
+from ssh_config_parser import SSHHost, SSHOption
+
+
+def host(patterns, *options):
+    return SSHHost(patterns=patterns, options=[SSHOption(key, value) for key, value in options])
+
+
+@pytest.mark.parametrize("edit, error", [
+    (BulkEdit("move"), "Unknown bulk action: move"),
+    (BulkEdit(SET_OPTION, key=" ", value="22"), "Option name is required"),
+    (BulkEdit(SET_OPTION, key="Port", value=" "), "Option value is required"),
+    (BulkEdit(REMOVE_OPTION), "Option name is required"),
+    (BulkEdit(REPLACE_VALUE, key="User", pattern="(", replacement=""), "Invalid regular expression"),
+    (BulkEdit(REPLACE_VALUE, key="User", pattern="a", replacement=r"\2"), "Invalid replacement"),
+    (BulkEdit(RENAME_PATTERN, pattern="(web)", replacement=r"\g<name>"), "Invalid replacement"),
+    (BulkEdit(RENAME_PATTERN, pattern="web", replacement="\\"), "Invalid replacement"),
+])
+def test_validate_rejects(edit, error):
+    with pytest.raises(ValueError) as raised:
+        edit.validate()
+    assert str(raised.value).startswith(error)
+
+
+def test_validate_accepts():
+    BulkEdit(SET_OPTION, key="Port", value="22").validate()
+    BulkEdit(REMOVE_OPTION, key="Port").validate()
+    BulkEdit(REPLACE_VALUE, key="HostName", pattern=r"(\w+)\.old", replacement=r"\1.new").validate()
+    BulkEdit(RENAME_PATTERN, pattern="^web", replacement="").validate()
+
+
+def test_invalid_edit_touches_no_host():
+    hosts = [host(["web"], ("User", "root"))]
+    with pytest.raises(ValueError):
+        apply_bulk_edit(hosts, BulkEdit(REPLACE_VALUE, key="User", pattern="(", replacement="x"))
+    assert hosts[0].options == [SSHOption("User", "root")]
+
+
+def test_set_option_reports_only_changed_hosts():
+    web = host(["web"], ("Port", "22"))
+    db = host(["db"], ("Port", "5022"))
+    api = host(["api"])
+
+    changed = apply_bulk_edit([web, db, api], BulkEdit(SET_OPTION, key="port", value=" 22 "))
+    assert changed == [db, api]
+    assert db.options == [SSHOption("Port", "22")]
+    assert api.options == [SSHOption("port", "22")]
+
+
+def test_replace_value_in_every_occurrence():
+    web = host(["web"], ("IdentityFile", "~/.ssh/old_rsa"), ("User", "old"), ("identityfile", "~/.ssh/old_ed25519"))
+    db = host(["db"], ("IdentityFile", "~/.ssh/db"))
+
+    changed = apply_bulk_edit([web, db], BulkEdit(REPLACE_VALUE, key="IdentityFile", pattern="old_", replacement="new_"))
+    assert changed == [web]
+    assert [(opt.key, opt.value) for opt in web.options] == [
+        ("IdentityFile", "~/.ssh/new_rsa"), ("User", "old"), ("identityfile", "~/.ssh/new_ed25519"),
+    ]
+
+
+def test_remove_option_drops_every_occurrence():
+    web = host(["web"], ("LocalForward", "8080 localhost:80"), ("User", "root"), ("localforward", "9090 localhost:90"))
+    db = host(["db"], ("User", "root"))
+
+    assert apply_bulk_edit([web, db], BulkEdit(REMOVE_OPTION, key="LocalForward")) == [web]
+    assert web.options == [SSHOption("User", "root")]
+
+
+def test_rename_pattern_drops_empty_patterns():
+    web = host(["web", "web.example.com"])
+    db = host(["db"])
+
+    changed = apply_bulk_edit([web, db], BulkEdit(RENAME_PATTERN, pattern=r"^web$", replacement=""))
+    assert changed == [web]
+    assert web.patterns == ["web.example.com"]
+
+    # A host is never left without patterns
+    changed = apply_bulk_edit([web, db], BulkEdit(RENAME_PATTERN, pattern=".*", replacement=""))
+    assert changed == []
+    assert web.patterns == ["web.example.com"] and db.patterns == ["db"]
+
+    changed = apply_bulk_edit([web, db], BulkEdit(RENAME_PATTERN, pattern=r"\.example\.com$", replacement=".example.org"))
+    assert changed == [web]
+    assert web.patterns == ["web.example.org"]
@@ -0,0 +1,181 @@
+import json
+
+import pytest
+
+import cli
+
+CONFIG = """# Managed by hand; keep this comment
+User admin
+
+Host web
+    HostName web.example.com
+    Include web.d/*.conf
+    User deploy
+
+Host db db-primary
+    HostName 10.0.0.5
+    # The replica shares this key
+    IdentityFile ~/.ssh/db
+    Port 5022
+
+Host *.internal
+    ProxyJump bastion
+"""
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "config"
+    path.write_text(CONFIG)
+    return path
+
+
+def run(capsys, *argv):
+    """Exit status and the JSON records printed on stdout and stderr."""
+    status = cli.main(list(argv))
+    captured = capsys.readouterr()
+    records = lambda text: [json.loads(line) for line in text.splitlines()]
+    return status, records(captured.out), records(captured.err)
+
+
+def test_list(config, capsys):
+    status, out, err = run(capsys, "list", "--config", str(config))
+    assert status == 0 and err == []
+    assert [record["patterns"] for record in out] == [["web"], ["db", "db-primary"], ["*.internal"]]
+    assert out[0]["options"] == [{"key": "HostName", "value": "web.example.com"},
+                                 {"key": "User", "value": "deploy"}]
+
+    status, out, _err = run(capsys, "list", "db*", "--config", str(config))
+    assert [record["patterns"] for record in out] == [["db", "db-primary"]]
+
+
+def test_get(config, capsys):
+    status, out, _err = run(capsys, "get", "db-primary", "Port", "--config", str(config))
+    assert status == 0
+    assert out == [{"host": "db-primary", "key": "Port", "value": "5022"}]
+
+    status, out, _err = run(capsys, "get", "web", "Port", "--config", str(config))
+    assert status == 1
+    assert out == [{"host": "web", "key": "Port", "value": None}]
+
+    status, out, err = run(capsys, "get", "mail", "--config", str(config))
+    assert status == 1 and out == []
+    assert err == [{"error": "no Host block with the alias mail"}]
+
+
+def test_get_without_host_is_a_usage_error(config, capsys):
+    with pytest.raises(SystemExit) as raised:
+        cli.main(["get", "--config", str(config)])
+    assert raised.value.code == 2
+    message = capsys.readouterr().err
+    assert "required: host" in message and "KEY" not in message.splitlines()[-1]
+
+
+def test_set_rewrites_only_the_touched_host(config, capsys):
+    status, out, _err = run(capsys, "set", "db", "Port", "22", "User", "postgres",
+                            "--config", str(config), "--no-backup")
+    assert status == 0
+    assert out[0]["options"][-2:] == [{"key": "Port", "value": "22"}, {"key": "User", "value": "postgres"}]
+    assert config.read_text() == CONFIG.replace("    Port 5022\n", "    Port 22\n    User postgres\n")
+
+
+def test_set_adds_a_missing_host_at_the_end(config, capsys):
+    status, _out, _err = run(capsys, "set", "mail", "HostName", "mail.example.com",
+                             "--config", str(config), "--no-backup")
+    assert status == 0
+    assert config.read_text() == CONFIG + "\nHost mail\n    HostName mail.example.com\n"
+
+
+def test_set_refuses_invalid_values_unless_forced(config, capsys):
+    status, out, err = run(capsys, "set", "web", "Port", "http", "--config", str(config), "--no-backup")
+    assert status == 1 and out == []
+    assert err == [{"error": "Port is not an integer"}]
+    assert config.read_text() == CONFIG
+
+    status, _out, _err = run(capsys, "set", "web", "Port", "http", "--force", "--config", str(config), "--no-backup")
+    assert status == 0
+    assert "    Port http\n" in config.read_text()
+
+
+def test_set_warns_about_unknown_keywords(config, capsys):
+    status, _out, err = run(capsys, "set", "web", "Frobnicate", "yes", "--config", str(config), "--no-backup")
+    assert status == 0
+    assert err == [{"warning": "Unknown option Frobnicate"}]
+
+
+def test_set_expects_pairs(config, capsys):
+    status, _out, err = run(capsys, "set", "web", "Port", "--config", str(config))
+    assert status == 1
+    assert err == [{"error": "expected KEY VALUE pairs"}]
+
+
+def test_rm_options_and_hosts(config, capsys):
+    status, out, _err = run(capsys, "rm", "db", "Port", "Ciphers", "--config", str(config), "--no-backup")
+    assert status == 0
+    assert out == [{"host": "db", "key": "Port", "removed": True},
+                   {"host": "db", "key": "Ciphers", "removed": False}]
+    assert config.read_text() == CONFIG.replace("    Port 5022\n", "")
+
+    status, out, _err = run(capsys, "rm", "web", "--config", str(config), "--no-backup")
+    assert status == 0
+    assert out == [{"host": "web", "removed": True}]
+    text = config.read_text()
+    assert "Host web" not in text and "HostName web.example.com" not in text
+    # The Include was conditional on the removed block and goes with it; the rest stays
+    assert "Include" not in text
+    assert text == CONFIG.replace("    Port 5022\n", "").replace(
+        "Host web\n    HostName web.example.com\n    Include web.d/*.conf\n    User deploy\n\n", "")
+
+
+def test_writes_back_up_the_file(config, capsys):
+    run(capsys, "set", "web", "Port", "22", "--config", str(config))
+    backups = list(config.parent.glob("config.*.bak"))
+    assert len(backups) == 1
+    assert backups[0].read_text() == CONFIG
+
+
+def test_validate(config, capsys, tmp_path):
+    status, out, _err = run(capsys, "validate", "--config", str(config))
+    assert status == 1
+    assert {"error": "IdentityFile not found for host db: ~/.ssh/db"} in out
+
+    valid = tmp_path / "valid"
+    valid.write_text("Host web\n    Compression false\n    Frobnicate 1\n")
+    status, out, _err = run(capsys, "validate", "--config", str(valid))
+    assert status == 0
+    assert out == [{"warning": "Unknown option for host web: Frobnicate"}]
+
+
+def test_resolve(config, capsys):
+    status, out, _err = run(capsys, "resolve", "cache.internal", "--config", str(config))
+    assert status == 0
+    assert out == [
+        {"key": "User", "value": "admin", "host": None},
+        {"key": "ProxyJump", "value": "bastion", "host": "*.internal"},
+    ]
+
+
+def test_fmt(config, capsys):
+    messy = "Host   web  web2\n  HostName    web.example.com\n\n\n\n# web\nHost db\nUser root   \n"
+    config.write_text(messy)
+
+    status, out, _err = run(capsys, "fmt", "--check", "--config", str(config))
+    assert status == 1
+    assert out == [{"path": str(config), "changed": True}]
+    assert config.read_text() == messy
+
+    status, _out, _err = run(capsys, "fmt", "--config", str(config), "--no-backup")
+    assert status == 0
+    assert config.read_text() == (
+        "Host web web2\n    HostName web.example.com\n\n# web\nHost db\n    User root\n"
+    )
+    status, out, _err = run(capsys, "fmt", "--check", "--config", str(config))
+    assert status == 0
+    assert out == [{"path": str(config), "changed": False}]
+
+
+def test_missing_config(tmp_path, capsys):
+    status, _out, err = run(capsys, "list", "--config", str(tmp_path / "none"))
+    assert status == 1
+    assert err == [{"error": f"{tmp_path / 'none'} does not exist"}]
@@ -0,0 +1,90 @@
+from completion import ALIASES, HOSTNAMES, IDENTITIES, KEYWORDS, CompletionIndex, PrefixTrie
+from ssh_config_parser import SSHHost
+
+
+def test_complete_in_order_up_to_limit():
+    trie = PrefixTrie(["web-2", "Web-10", "db", "web-1", "web"])
+    assert trie.complete("WEB") == ["web", "web-1", "Web-10", "web-2"]
+    assert trie.complete("web-", limit=2) == ["web-1", "Web-10"]
+    assert trie.complete("mail") == []
+    assert trie.complete("") == ["db", "web", "web-1", "Web-10", "web-2"]
+
+
+def test_words_are_counted():
+    trie = PrefixTrie()
+    trie.add("Web")
+    trie.add("web")
+    assert len(trie) == 1
+
+    trie.remove("WEB")
+    # The first spelling stays until the last reference goes
+    assert "web" in trie and trie.complete("w") == ["Web"]
+    trie.remove("web")
+    assert "web" not in trie and len(trie) == 0
+    # Removing a word that is not there changes nothing
+    trie.remove("web")
+    trie.remove("we")
+    assert len(trie) == 0
+
+
+def test_removal_keeps_words_sharing_a_prefix():
+    trie = PrefixTrie(["web", "web-1", "webmail"])
+
+    trie.remove("web")
+    assert trie.complete("web") == ["web-1", "webmail"]
+    assert "web" not in trie
+
+    trie.remove("web-1")
+    assert trie.complete("web") == ["webmail"]
+    # The branch only "web-1" used is pruned
+    assert trie.complete("web-") == []
+
+    trie.remove("webmail")
+    assert trie.complete("") == []
+    assert trie._root.children == {}
+
+
+def host(patterns, **options):
+    result = SSHHost(patterns=patterns)
+    for key, value in options.items():
+        result.set_option(key, value)
+    return result
+
+
+def test_index_counts_terms_shared_between_hosts():
+    web = host(["web", "web.example.com"], HostName="10.0.0.5", IdentityFile="~/.ssh/deploy")
+    api = host(["api", "*.internal"], HostName="10.0.0.5", IdentityFile="~/.ssh/deploy")
+    index = CompletionIndex()
+    index.load([web, api])
+
+    assert index.complete(ALIASES, "") == ["api", "web", "web.example.com"]
+    assert index.complete(HOSTNAMES, "10") == ["10.0.0.5"]
+
+    index.remove_host(web)
+    # api still uses the hostname and the key
+    assert index.complete(ALIASES, "") == ["api"]
+    assert index.complete(HOSTNAMES, "10") == ["10.0.0.5"]
+    assert index.complete(IDENTITIES, "~") == ["~/.ssh/deploy"]
+
+    api.set_option("HostName", "10.0.0.6")
+    index.update_host(api)
+    assert index.complete(HOSTNAMES, "10") == ["10.0.0.6"]
+
+    index.remove_host(api)
+    index.remove_host(api)
+    assert index.complete(HOSTNAMES, "") == [] and index.complete(IDENTITIES, "") == []
+
+
+def test_index_add_host_twice_updates_it():
+    web = host(["web"], HostName="web.example.com")
+    index = CompletionIndex()
+    index.add_host(web)
+    web.patterns = ["www"]
+    index.add_host(web)
+    assert index.complete(ALIASES, "") == ["www"]
+
+
+def test_index_completes_keywords():
+    index = CompletionIndex()
+    assert index.complete(KEYWORDS, "hostn") == ["HostName"]
+    assert "IdentityFile" in index.complete(KEYWORDS, "ident")
@@ -0,0 +1,58 @@
+import pytest
+
+from ssh_config_parser import SSHConfigParser
+
+CONFIG = """User admin
+
+Host web-*
+    User deploy
+    Port 2222
+
+Host db
+    HostName 10.0.0.5
+    User deploy
+"""
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "config"
+    path.write_text(CONFIG)
+    return path
+
+
+def parsed(path):
+    parser = SSHConfigParser(path)
+    parser.parse(use_cache=True)
+    return parser
+
+
+def test_snapshot_restores_the_parse(config):
+    fresh = parsed(config)
+    restored = parsed(config)
+
+    assert restored.config.hosts == fresh.config.hosts
+    assert restored.config.global_options == fresh.config.global_options
+    assert restored.generate() == fresh.generate()
+    # Equal options are shared between hosts
+    web, db = restored.config.hosts
+    assert web.options[0] is db.options[1]
+
+
+def test_restored_hosts_can_be_edited(config):
+    parsed(config)
+    host = parsed(config).config.get_host("db")
+    before = host.snapshot()
+
+    host.set_option("Port", "22")
+    assert host.get_option("Port") == "22"
+    host.restore(before)
+    assert host.get_option("Port") is None
+
+
+def test_edited_file_is_parsed_again(config):
+    parsed(config)
+    config.write_text(CONFIG.replace("10.0.0.5", "10.0.0.66"))
+
+    assert parsed(config).config.get_host("db").get_option("HostName") == "10.0.0.66"
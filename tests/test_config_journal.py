@@ -0,0 +1,164 @@
+from pathlib import Path
+
+import pytest
+
+import config_journal
+from config_journal import AddHosts, Batch, ConfigJournal, RemoveHosts, ReplaceHostState
+from ssh_config_parser import SSHConfig, SSHConfigParser, SSHHost
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(config_journal.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def config():
+    config = SSHConfig(file_path=Path("config"))
+    config.add_hosts([SSHHost(patterns=[name]) for name in ("a", "b", "c", "d")])
+    return config
+
+
+def edit(journal, host, key, value, coalesce=True):
+    before = host.snapshot()
+    host.set_option(key, value)
+    journal.record(ReplaceHostState(host, before, host.snapshot()), coalesce=coalesce)
+
+
+def names(config):
+    return [host.patterns[0] for host in config.hosts]
+
+
+def test_undo_and_redo_restore_generations(config, clock):
+    journal = ConfigJournal()
+    host = config.hosts[0]
+    loaded = host.generation
+
+    edit(journal, host, "Port", "22")
+    edited = host.generation
+    assert edited != loaded
+
+    journal.undo(config)
+    assert host.get_option("Port") is None
+    assert host.generation == loaded
+    assert journal.can_redo()
+
+    journal.redo(config)
+    assert host.get_option("Port") == "22"
+    assert host.generation == edited
+    assert not journal.can_redo()
+
+
+def test_edits_within_the_window_coalesce(config, clock):
+    journal = ConfigJournal()
+    host = config.hosts[0]
+    loaded = host.generation
+
+    edit(journal, host, "Port", "2")
+    clock.now += journal.COALESCE_SECONDS / 2
+    edit(journal, host, "Port", "22")
+    # Every edit is a new generation, even when it joins the previous step
+    assert host.generation != loaded
+
+    journal.undo(config)
+    assert host.get_option("Port") is None
+    assert host.generation == loaded
+    assert not journal.can_undo()
+
+
+def test_edits_apart_do_not_coalesce(config, clock):
+    journal = ConfigJournal()
+    host, other = config.hosts[:2]
+
+    edit(journal, host, "Port", "2")
+    clock.now += journal.COALESCE_SECONDS
+    edit(journal, host, "Port", "22")
+    edit(journal, other, "Port", "22")
+    edit(journal, other, "User", "root", coalesce=False)
+
+    journal.undo(config)
+    assert other.get_option("User") is None and other.get_option("Port") == "22"
+    journal.undo(config)
+    assert other.get_option("Port") is None
+    journal.undo(config)
+    assert host.get_option("Port") == "2"
+
+
+def test_seal_starts_a_new_step(config, clock):
+    journal = ConfigJournal()
+    host = config.hosts[0]
+
+    edit(journal, host, "Port", "2")
+    journal.seal()
+    edit(journal, host, "Port", "22")
+
+    journal.undo(config)
+    assert host.get_option("Port") == "2"
+    # The step left on top stays sealed, so the next edit does not merge into it
+    edit(journal, host, "Port", "222")
+    assert not journal.can_redo()
+    journal.undo(config)
+    assert host.get_option("Port") == "2"
+
+
+def test_remove_hosts_reinserts_them_where_they_were(config):
+    journal = ConfigJournal()
+    b, d = config.hosts[1], config.hosts[3]
+
+    journal.execute(config, RemoveHosts([d, b]))
+    assert names(config) == ["a", "c"]
+
+    journal.undo(config)
+    assert names(config) == ["a", "b", "c", "d"]
+    assert config.hosts[1] is b and config.hosts[3] is d
+
+    journal.redo(config)
+    assert names(config) == ["a", "c"]
+
+
+def test_batch_undoes_as_one_step(config):
+    journal = ConfigJournal()
+    added = SSHHost(patterns=["e"])
+
+    journal.execute(config, Batch([RemoveHosts([config.hosts[0]]), AddHosts([added])]))
+    assert names(config) == ["b", "c", "d", "e"]
+
+    journal.undo(config)
+    assert names(config) == ["a", "b", "c", "d"]
+    assert not journal.can_undo()
+
+
+def test_parse_lines_is_one_undoable_step(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = tmp_path / "config"
+    path.write_text("User admin\n\nHost a\n    Port 22\n")
+    parser = SSHConfigParser(path)
+    config = parser.parse()
+    loaded = config.hosts[0]
+    edit(config.journal, loaded, "Port", "2222")
+
+    parser.parse_lines(["Host a", "    Port 2222", "", "Host b", "    User root"], coalesce=True)
+    parser.parse_lines(["Host a", "    Port 2222", "", "Host b", "    User deploy"], coalesce=True)
+    assert names(config) == ["a", "b"] and config.global_options == []
+
+    config.journal.undo(config)
+    # The re-parses merged into one step, and the hosts before them come back as they were
+    assert config.hosts == [loaded] and config.hosts[0] is loaded
+    assert [str(option) for option in config.global_options] == ["User admin"]
+    config.journal.undo(config)
+    assert loaded.get_option("Port") == "22"
+
+    config.journal.redo(config)
+    config.journal.redo(config)
+    assert names(config) == ["a", "b"]
+    assert config.hosts[1].get_option("User") == "deploy"
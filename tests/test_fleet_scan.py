@@ -0,0 +1,68 @@
+import threading
+import time
+
+from fleet_scan import REACHABLE, UNREACHABLE, FleetScanner, scannable
+from ssh_config_parser import SSHHost
+
+
+def host(*patterns):
+    return SSHHost(patterns=list(patterns))
+
+
+def run_scan(scanner, hosts, timeout=10.0):
+    results = {}
+    finished = threading.Event()
+    scanner.scan(hosts, lambda h, result: results.__setitem__(h.patterns[0], result), finished.set)
+    assert finished.wait(timeout)
+    return results
+
+
+def test_scan_runs_probes_concurrently(fake_ssh, runner):
+    hosts = [host(f"up-{i}") for i in range(48)] + [host(f"down-{i}") for i in range(16)]
+    scanner = FleetScanner(runner, concurrency=32, ssh_binary=str(fake_ssh.path), preflight=False)
+
+    started = time.monotonic()
+    results = run_scan(scanner, hosts)
+    elapsed = time.monotonic() - started
+
+    assert len(results) == 64
+    assert all(results[f"up-{i}"].status == REACHABLE for i in range(48))
+    assert all(results[f"down-{i}"].status == UNREACHABLE for i in range(16))
+    assert all(results[f"down-{i}"].returncode == 255 for i in range(16))
+    # Two rounds of half a second; one at a time would take 32 seconds
+    assert elapsed < 4.0
+    assert len(fake_ssh.invocations()) == 64
+
+
+def test_scan_answers_repeated_hosts_from_cache(fake_ssh, runner):
+    scanner = FleetScanner(runner, ssh_binary=str(fake_ssh.path), preflight=False)
+    hosts = [host("up-a"), host("up-b")]
+
+    first = run_scan(scanner, hosts)
+    second = run_scan(scanner, hosts)
+
+    assert second == first
+    assert len(fake_ssh.invocations()) == 2
+
+
+def test_scan_skips_wildcard_and_negated_hosts(fake_ssh, runner):
+    hosts = [host("*"), host("*.example.com"), host("web-?"), host("!bastion"), host("up-a")]
+    assert scannable(hosts) == [hosts[-1]]
+
+    scanner = FleetScanner(runner, ssh_binary=str(fake_ssh.path), preflight=False)
+    results = run_scan(scanner, hosts)
+
+    assert list(results) == ["up-a"]
+    assert [destination for _pid, destination in fake_ssh.invocations()] == ["up-a"]
+
+
+def test_cancel_kills_every_probe(fake_ssh, runner):
+    scanner = FleetScanner(runner, concurrency=32, ssh_binary=str(fake_ssh.path), preflight=False)
+    finished = threading.Event()
+    handle = scanner.scan([host(f"hang-{i}") for i in range(16)], lambda h, result: None, finished.set)
+
+    fake_ssh.wait_for_runs(16)
+    handle.cancel()
+
+    fake_ssh.wait_until_gone([pid for pid, _destination in fake_ssh.invocations()])
+    assert not finished.is_set()
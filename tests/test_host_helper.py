@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+
+from host_helper import LOCAL_LAUNCHER, HelperUnavailable, HostHelper
+from probe_helper import MAX_FRAME, encode_frame, read_frame
+from probe_runner import ProbeRunner
+
+
+def reader_of(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def test_frames_round_trip():
+    async def scenario():
+        messages = [{"op": "run", "id": 1, "argv": ["ssh", "héllo"]}, {"op": "cancel", "id": 1}]
+        reader = reader_of(b"".join(encode_frame(message) for message in messages))
+        return [await read_frame(reader) for _ in range(3)]
+
+    first, second, end = asyncio.run(scenario())
+    assert first == {"op": "run", "id": 1, "argv": ["ssh", "héllo"]}
+    assert second == {"op": "cancel", "id": 1}
+    assert end is None
+
+
+def test_truncated_frame_ends_the_stream():
+    async def scenario():
+        return await read_frame(reader_of(encode_frame({"id": 1, "event": "exit"})[:-3]))
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_oversized_frame_is_rejected():
+    async def scenario():
+        return await read_frame(reader_of((MAX_FRAME + 1).to_bytes(4, "big")))
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+
+
+def with_helper(scenario, launcher=LOCAL_LAUNCHER):
+    async def run():
+        helper = HostHelper(launcher)
+        try:
+            return await scenario(helper)
+        finally:
+            await helper.close()
+    return asyncio.run(run())
+
+
+def test_helper_runs_a_command_and_streams_its_output(fake_ssh):
+    events = []
+
+    async def scenario(helper):
+        return await helper.run([str(fake_ssh.path), "up-a", "exit"], 10.0, events.append)
+
+    exit_event = with_helper(scenario)
+    assert exit_event["returncode"] == 0
+    assert not exit_event["timed_out"]
+    assert events[0]["event"] == "spawned"
+    lines = {(event["stream"], event["data"]) for event in events if event["event"] == "line"}
+    assert lines == {("stdout", "hello from up-a"), ("stderr", "debug1: Connecting to up-a")}
+
+
+def test_helper_runs_commands_concurrently(fake_ssh):
+    async def scenario(helper):
+        runs = [helper.run([str(fake_ssh.path), f"up-{i}", "exit"], 10.0, lambda event: None) for i in range(16)]
+        return await asyncio.gather(*runs)
+
+    started = time.monotonic()
+    exits = with_helper(scenario)
+    elapsed = time.monotonic() - started
+
+    assert [event["returncode"] for event in exits] == [0] * 16
+    # Each run takes half a second; one at a time would take eight
+    assert elapsed < 4.0
+    assert len(fake_ssh.invocations()) == 16
+
+
+def test_helper_reports_timeouts(fake_ssh):
+    async def scenario(helper):
+        return await helper.run([str(fake_ssh.path), "hang-a", "exit"], 0.5, lambda event: None)
+
+    exit_event = with_helper(scenario)
+    assert exit_event["timed_out"]
+    fake_ssh.wait_until_gone([pid for pid, _destination in fake_ssh.invocations()])
+
+
+def test_cancelling_a_run_kills_its_command(fake_ssh):
+    async def scenario(helper):
+        run = asyncio.ensure_future(helper.run([str(fake_ssh.path), "hang-a", "exit"], 30.0, lambda event: None))
+        while not fake_ssh.invocations():
+            await asyncio.sleep(0.05)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+        # The helper stays up for the next command
+        return await helper.run([str(fake_ssh.path), "up-b", "exit"], 10.0, lambda event: None)
+
+    exit_event = with_helper(scenario)
+    assert exit_event["returncode"] == 0
+    fake_ssh.wait_until_gone([pid for pid, destination in fake_ssh.invocations() if destination == "hang-a"])
+
+
+def test_closing_the_helper_kills_running_commands(fake_ssh):
+    async def scenario(helper):
+        runs = [asyncio.ensure_future(helper.run([str(fake_ssh.path), f"hang-{i}", "exit"], 30.0, lambda event: None))
+                for i in range(4)]
+        while len(fake_ssh.invocations()) < 4:
+            await asyncio.sleep(0.05)
+        await helper.close()
+        return await asyncio.gather(*runs, return_exceptions=True)
+
+    outcomes = with_helper(scenario)
+    # The helper reports the kills on its way out
+    assert [outcome["returncode"] for outcome in outcomes] == [-9] * 4
+    fake_ssh.wait_until_gone([pid for pid, _destination in fake_ssh.invocations()])
+
+
+def test_missing_command_is_an_error_of_the_command(tmp_path):
+    async def scenario(helper):
+        with pytest.raises(OSError) as raised:
+            await helper.run([str(tmp_path / "no-ssh"), "up-a", "exit"], 10.0, lambda event: None)
+        return raised.value
+
+    error = with_helper(scenario)
+    assert not isinstance(error, HelperUnavailable)
+
+
+def test_missing_launcher_makes_the_helper_unavailable(tmp_path):
+    async def scenario(helper):
+        with pytest.raises(HelperUnavailable):
+            await helper.run(["true"], 10.0, lambda event: None)
+
+    with_helper(scenario, launcher=(str(tmp_path / "no-python"),))
+
+
+def test_runner_probes_through_the_helper(fake_ssh):
+    runner = ProbeRunner(helper=HostHelper(LOCAL_LAUNCHER))
+    try:
+        result = runner.run_coroutine(runner.probe([str(fake_ssh.path), "up-a", "exit"])).result(timeout=10)
+        helper = runner.helper
+    finally:
+        runner.shutdown()
+
+    assert helper is not None
+    assert result.ok
+    assert ("stdout", "hello from up-a") in result.lines
+    assert {"spawn", "exit"} <= set(result.phases)
@@ -0,0 +1,135 @@
+import difflib
+import random
+
+from line_diff import ADDED, CHANGED, IncrementalLineDiff, line_edits
+
+ORIGINAL = ["Host web", "    HostName web.example.com", "    User deploy", "    Port 22"]
+
+
+def is_subsequence(items, sequence):
+    remaining = iter(sequence)
+    return all(item in remaining for item in items)
+
+
+def test_loaded_text_has_no_highlight():
+    diff = IncrementalLineDiff(ORIGINAL)
+    assert diff.update(ORIGINAL) == [(index, None) for index in range(len(ORIGINAL))]
+    assert diff.statuses == [None] * 4
+    # Nothing changed, nothing to redo
+    assert diff.update(ORIGINAL) == []
+
+
+def test_edits_are_highlighted_and_reverted():
+    diff = IncrementalLineDiff(ORIGINAL)
+    diff.update(ORIGINAL)
+
+    edited = ORIGINAL[:2] + ["    User root"] + ORIGINAL[3:]
+    assert diff.update(edited) == [(2, CHANGED)]
+
+    inserted = edited + ["    ForwardAgent yes"]
+    assert diff.update(inserted) == [(4, ADDED)]
+    assert diff.statuses == [None, None, CHANGED, None, ADDED]
+
+    assert diff.update(ORIGINAL) == [(2, None), (3, None)]
+    assert diff.statuses == [None] * 4
+
+
+def test_new_host_is_all_added():
+    diff = IncrementalLineDiff([])
+    assert diff.update(["Host db", "    Port 5022"]) == [(0, ADDED), (1, ADDED)]
+
+
+def common_affixes(old, new):
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return prefix, suffix
+
+
+def test_reported_changes_keep_a_buffer_in_step():
+    """Redoing only the reported lines, like the editor does, always shows the current statuses."""
+    rnd = random.Random(30)
+    for _ in range(200):
+        original = [f"    Option{i} {rnd.choice('ab')}" for i in range(rnd.randint(0, 12))]
+        diff = IncrementalLineDiff(original)
+        lines, shown = [], []
+        for _ in range(12):
+            edited = list(lines or original)
+            for _ in range(rnd.randint(1, 3)):
+                choice = rnd.random()
+                if choice < 0.35 and edited:
+                    edited[rnd.randrange(len(edited))] = f"    Edited {rnd.randint(0, 3)}"
+                elif choice < 0.7 or not edited:
+                    edited.insert(rnd.randint(0, len(edited)), rnd.choice(original or ["    New"]))
+                else:
+                    del edited[rnd.randrange(len(edited))]
+            # Text outside the edited span keeps its tags; the span itself is new text
+            prefix, suffix = common_affixes(lines, edited)
+            shown = shown[:prefix] + ["?"] * (len(edited) - prefix - suffix) + shown[len(shown) - suffix:]
+            for index, status in diff.update(edited):
+                shown[index] = status
+            lines = edited
+
+            assert shown == diff.statuses
+            assert len(diff.statuses) == len(lines)
+            unchanged = [line for line, status in zip(lines, diff.statuses) if status is None]
+            assert is_subsequence(unchanged, original)
+
+
+def apply_edits(lines, edits):
+    result = list(lines)
+    for start, end, replacement in reversed(edits):
+        result[start:end] = replacement
+    return result
+
+
+def edit_cost(edits):
+    return sum((end - start) + len(replacement) for start, end, replacement in edits)
+
+
+def minimal_cost(old, new):
+    """Lines deleted plus lines inserted by a longest-common-subsequence diff."""
+    previous = [0] * (len(new) + 1)
+    for item in old:
+        current = [0]
+        for index, other in enumerate(new):
+            current.append(previous[index] + 1 if item == other else max(previous[index + 1], current[index]))
+        previous = current
+    return len(old) + len(new) - 2 * previous[-1]
+
+
+def test_line_edits():
+    assert line_edits(ORIGINAL, ORIGINAL) == []
+    assert line_edits(ORIGINAL, ORIGINAL[:2] + ["    User root"] + ORIGINAL[3:]) == [(2, 3, ["    User root"])]
+    assert line_edits(ORIGINAL, ORIGINAL + ["    Compression yes"]) == [(4, 4, ["    Compression yes"])]
+    assert line_edits(ORIGINAL, ORIGINAL[:1] + ORIGINAL[2:]) == [(1, 2, [])]
+    assert line_edits([], ORIGINAL) == [(0, 0, ORIGINAL)]
+    # Repeated lines next to the edit do not widen it
+    assert line_edits(["a", "b", "b", "c"], ["a", "b", "b", "b", "c"]) == [(3, 3, ["b"])]
+
+
+def test_line_edits_are_minimal():
+    rnd = random.Random(31)
+    for _ in range(500):
+        old = [f"    Option{i} value" for i in range(rnd.randint(0, 30))]
+        new = list(old)
+        for serial in range(rnd.randint(0, 4)):
+            choice = rnd.random()
+            if choice < 0.4 and new:
+                new[rnd.randrange(len(new))] = f"    Edited{serial} value"
+            elif choice < 0.7 or not new:
+                new.insert(rnd.randint(0, len(new)), f"    Added{serial} value")
+            else:
+                del new[rnd.randrange(len(new))]
+
+        edits = line_edits(old, new)
+        assert apply_edits(old, edits) == new
+        assert all(end <= start for (_s, end, _r), (start, _e, _r2) in zip(edits, edits[1:]))
+        assert edit_cost(edits) == minimal_cost(old, new)
+        # Never more than difflib on the whole text
+        opcodes = difflib.SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+        assert edit_cost(edits) <= sum(i2 - i1 + j2 - j1 for tag, i1, i2, j1, j2 in opcodes if tag != "equal")
@@ -0,0 +1,106 @@
+import asyncio
+import socket
+
+import pytest
+
+from dns_cache import DnsCache
+from preflight import LatencyStore, preflight_target, tcp_preflight
+from ssh_config_parser import SSHHost
+
+
+@pytest.fixture
+def listener():
+    """A local port that accepts connections."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    yield server.getsockname()[1]
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    """A local port nothing listens on."""
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    return port
+
+
+def host(patterns, **options):
+    result = SSHHost(patterns=patterns)
+    for key, value in options.items():
+        result.set_option(key, value)
+    return result
+
+
+def test_preflight_target():
+    assert preflight_target(host(["web"])) == ("web", 22)
+    assert preflight_target(host(["web"], HostName="10.0.0.5", Port="2222")) == ("10.0.0.5", 2222)
+    assert preflight_target(host(["*.example.com"])) is None
+    assert preflight_target(host(["!bastion"])) is None
+    assert preflight_target(host(["web"], HostName="%h.internal")) is None
+    assert preflight_target(host(["web"], Port="ssh")) is None
+    assert preflight_target(host(["web"], ProxyJump="bastion")) is None
+    assert preflight_target(host(["web"], ProxyCommand="nc %h %p")) is None
+
+
+def test_preflight_accepted(listener):
+    result = asyncio.run(tcp_preflight("127.0.0.1", listener))
+    assert result.ok
+    assert result.target == ("127.0.0.1", listener)
+    assert 0 < result.latency < 1
+
+
+def test_preflight_refused(closed_port):
+    result = asyncio.run(tcp_preflight("127.0.0.1", closed_port))
+    assert not result.ok
+    assert result.error
+
+
+def test_preflight_through_resolver(listener):
+    resolver = DnsCache()
+    try:
+        result = asyncio.run(tcp_preflight("localhost", listener, resolver=resolver))
+        missing = asyncio.run(tcp_preflight("no-such-host.invalid", listener, resolver=resolver))
+    finally:
+        resolver.shutdown()
+    assert result.ok
+    assert not missing.ok
+    assert missing.error.startswith("cannot resolve no-such-host.invalid")
+
+
+def test_failed_preflight_skips_ssh(fake_ssh, runner, closed_port):
+    lines = []
+    command = [str(fake_ssh.path), "up-a", "exit"]
+    result = runner.run_coroutine(runner.probe(
+        command, on_line=lambda stream, line: lines.append((stream, line)), preflight=("127.0.0.1", closed_port)
+    )).result(timeout=10)
+
+    assert not result.preflight.ok
+    assert "preflight" in result.phases
+    assert fake_ssh.invocations() == []
+    assert lines and lines[0][0] == "preflight"
+
+
+def test_passed_preflight_runs_ssh_and_records_latency(fake_ssh, runner, listener):
+    command = [str(fake_ssh.path), "up-a", "exit"]
+    result = runner.run_coroutine(runner.probe(command, preflight=("127.0.0.1", listener))).result(timeout=10)
+
+    assert result.preflight.ok
+    assert result.ok
+    assert [destination for _pid, destination in fake_ssh.invocations()] == ["up-a"]
+    assert runner.latencies.median(("127.0.0.1", listener)) == result.preflight.latency
+
+
+def test_latency_store_summary():
+    store = LatencyStore(window=4)
+    target = ("web", 22)
+    assert store.summary(target) == []
+    for seconds in (0.004, 0.012, 0.030, 0.400, 0.008):
+        store.record(target, seconds)
+    summary = store.summary(target)
+    # The oldest sample fell out of the window
+    assert summary[0] == "4 samples, p50 30.0 ms, p95 400.0 ms"
+    assert len(summary) > 1
@@ -0,0 +1,79 @@
+import pytest
+
+from ssh_config_parser import SSHHost, SSHOption
+from ssh_keywords import unknown_keywords, validate_hosts, validate_option
+
+
+@pytest.mark.parametrize("key, value", [
+    ("Compression", "yes"),
+    ("Compression", "false"),
+    ("BatchMode", "TRUE"),
+    ("StrictHostKeyChecking", "false"),
+    ("StrictHostKeyChecking", "accept-new"),
+    ("ControlMaster", "true"),
+    ("ControlMaster", "autoask"),
+    ("ControlPersist", "false"),
+    ("ControlPersist", "10m"),
+    ("RequestTTY", "false"),
+    ("Tunnel", "true"),
+    ("UpdateHostKeys", "false"),
+    ("VerifyHostKeyDNS", "true"),
+    ("AddKeysToAgent", "true"),
+    ("CanonicalizeHostname", "false"),
+    ("PubkeyAuthentication", "true"),
+    ("ForwardAgent", "false"),
+    ("ForwardAgent", "$SSH_AUTH_SOCK"),
+    ("ConnectTimeout", "1m30s"),
+    ("ServerAliveInterval", "30"),
+    ("Port", "2222"),
+    ("LocalForward", "8080 localhost:80"),
+    ("RemoteForward", "[::1]:9000 /run/app.sock"),
+    ("DynamicForward", "1080"),
+    ("IdentityFile", "~/.ssh/%r@%h"),
+    ("PubkeyAcceptedKeyTypes", "+ssh-rsa"),
+    ("UseKeychain", "yes"),
+    ("User", '"deploy"'),
+])
+def test_valid_values(key, value):
+    assert validate_option(key, value) is None
+
+
+@pytest.mark.parametrize("key, value, error", [
+    ("Compression", "maybe", "Expected yes or no"),
+    ("StrictHostKeyChecking", "sometimes", "Expected one of: yes, no, ask, accept-new, off"),
+    ("AddressFamily", "true", "Expected one of: any, inet, inet6"),
+    ("LogLevel", "false", "Expected one of"),
+    ("ConnectTimeout", "soon", "Expected a time interval"),
+    ("Port", "70000", "Port must be between 1 and 65535"),
+    ("Port", "ssh", "Port is not an integer"),
+    ("ConnectionAttempts", "0", "Must be at least 1"),
+    ("LocalForward", "8080", "Expected [bind_address:]port host:hostport"),
+    ("IdentityFile", "~/.ssh/%z", "Unknown token %z"),
+    ("Ciphers", "aes128-ctr,,aes256-ctr", "List contains an empty item"),
+    ("User", "  ", "Value is empty"),
+])
+def test_invalid_values(key, value, error):
+    assert validate_option(key, value).startswith(error)
+
+
+def test_keywords_ignore_case():
+    assert validate_option("compression", "False") is None
+    assert validate_option("STRICTHOSTKEYCHECKING", "maybe") is not None
+
+
+def test_unknown_keywords_are_warnings_not_errors():
+    host = SSHHost(patterns=["web"], options=[SSHOption("Frobnicate", "1"), SSHOption("Port", "x")])
+    assert validate_option("Frobnicate", "1") is None
+    assert validate_hosts([host]) == ["Port is not an integer for host web: Port x"]
+    assert unknown_keywords([host]) == ["Unknown option for host web: Frobnicate"]
+
+
+def test_ignore_unknown():
+    web = SSHHost(patterns=["web"], options=[SSHOption("IgnoreUnknown", "frob*,!frobx"),
+                                             SSHOption("Frobnicate", "1"), SSHOption("FrobX", "1")])
+    db = SSHHost(patterns=["db"], options=[SSHOption("UseFoo", "1"), SSHOption("Frobnicate", "1")])
+    global_options = [SSHOption("IgnoreUnknown", "UseFoo")]
+    assert unknown_keywords([web, db], global_options) == [
+        "Unknown option for host web: FrobX",
+        "Unknown option for host db: Frobnicate",
+    ]
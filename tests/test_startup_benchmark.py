@@ -0,0 +1,21 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BENCHMARK = Path(__file__).resolve().parent.parent / "tools" / "startup_benchmark.py"
+
+
+def test_modules_without_gtk_start_within_budget():
+    # The window and a full launch need GTK; the entry point, parser and
+    # command line must start without it, within their budgets
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARK), "--skip", "ui.main_window", "--skip", "gui", "--runs", "5", "--json"],
+        capture_output=True, text=True, timeout=120,
+    )
+    records = json.loads(result.stdout)
+    assert [record["name"] for record in records] == ["main", "ssh_config_parser", "cli"]
+    assert result.returncode == 0, "\n".join(
+        f"{record['name']}: {record['ms']} ms, budget {record['budget_ms']} ms {' '.join(record['error'])}"
+        for record in records
+    )
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Startup benchmark for SSH Config Studio.
+
+Each target is imported in a fresh interpreter, from the source tree:
+
+- wall clock: median of --runs imports, minus the cost of a bare interpreter
+- -X importtime: the target's cumulative import time and the modules that
+  contribute most to it
+
+With --gui the whole application is launched as well and timed until it
+quits after painting its first frame (SSH_CONFIG_STUDIO_EXIT_AFTER_FIRST_FRAME).
+
+Every measurement has a budget in milliseconds; the script exits with status
+1 when one is exceeded, or when a budgeted target cannot be measured at all
+(say GTK is missing), so it can guard against startup regressions. Targets
+that cannot run in an environment are left out with --skip:
+
+    python3 tools/startup_benchmark.py --runs 15
+    python3 tools/startup_benchmark.py --budget main=20 --gui
+    python3 tools/startup_benchmark.py --skip ui.main_window
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SOURCE_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Milliseconds above a bare interpreter. The entry point and the command line
+# interface must not pull in GTK, and the window module must not pull in the
+# probe machinery or the editor.
+BUDGETS = {
+    "main": 30.0,
+    "ssh_config_parser": 90.0,
+    "cli": 110.0,
+    "ui.main_window": 400.0,
+    "gui": 1500.0,
+}
+
+TARGETS = ("main", "ssh_config_parser", "cli", "ui.main_window")
+
+
+def _environment(extra=None):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SOURCE_DIR), env.get("PYTHONPATH")]))
+    env.update(extra or {})
+    return env
+
+
+def _timed_run(argv, env):
+    started = time.perf_counter()
+    result = subprocess.run(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - started, result
+
+
+def wall_clock(module, runs):
+    """Median milliseconds to import module, above a bare interpreter; None when it cannot be imported."""
+    env = _environment()
+    baseline = statistics.median(_timed_run([sys.executable, "-c", "pass"], env)[0] for _ in range(runs))
+    samples = []
+    for _ in range(runs):
+        elapsed, result = _timed_run([sys.executable, "-c", f"import {module}"], env)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1:]
+        samples.append(elapsed)
+    return max(0.0, statistics.median(samples) - baseline) * 1000, []
+
+
+def import_profile(module, top):
+    """The cumulative import time of module in ms and the top slowest imports beneath it."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=_environment(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        # "import time:   self |  cumulative |   name", nesting shown by indenting the name
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        try:
+            entries.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            # The header line
+            continue
+    total = next((cumulative for name, _self, cumulative in entries if name == module), None)
+    slowest = sorted(entries, key=lambda entry: entry[1], reverse=True)[:top]
+    return (total / 1000 if total is not None else None), [(name, self_us / 1000) for name, self_us, _c in slowest]
+
+
+def gui_launch(runs):
+    """Median milliseconds from launch until the app quits after its first frame."""
+    env = _environment({"SSH_CONFIG_STUDIO_EXIT_AFTER_FIRST_FRAME": "1"})
+    samples = []
+    for _ in range(runs):
+        elapsed, result = _timed_run([sys.executable, str(SOURCE_DIR / "main.py")], env)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1:]
+        samples.append(elapsed)
+    return statistics.median(samples) * 1000, []
+
+
+def parse_budgets(values):
+    budgets = dict(BUDGETS)
+    for value in values or []:
+        name, _sep, limit = value.partition("=")
+        try:
+            budgets[name] = float(limit)
+        except ValueError:
+            raise SystemExit(f"invalid budget {value!r}, expected NAME=MS")
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="imports per target (default 10)")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list per target")
+    parser.add_argument("--budget", action="append", metavar="NAME=MS", help="override a budget")
+    parser.add_argument("--gui", action="store_true", help="also time full launches to the first frame")
+    parser.add_argument("--skip", action="append", default=[], metavar="NAME",
+                        choices=TARGETS + ("gui",), help="do not measure this target")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    budgets = parse_budgets(args.budget)
+
+    results = []
+    for module in TARGETS:
+        if module in args.skip:
+            continue
+        elapsed, error = wall_clock(module, args.runs)
+        cumulative, slowest = import_profile(module, args.top) if elapsed is not None else (None, [])
+        results.append({"name": module, "ms": elapsed, "importtime_ms": cumulative,
+                        "slowest": slowest, "error": error})
+    if args.gui and "gui" not in args.skip:
+        elapsed, error = gui_launch(max(1, args.runs // 2))
+        results.append({"name": "gui", "ms": elapsed, "importtime_ms": None, "slowest": [], "error": error})
+
+    over_budget = []
+    unavailable = []
+    for result in results:
+        budget = budgets.get(result["name"])
+        result["budget_ms"] = budget
+        if budget is None:
+            continue
+        if result["ms"] is None:
+            unavailable.append(result["name"])
+        elif result["ms"] > budget:
+            over_budget.append(result["name"])
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            if result["ms"] is None:
+                status = "FAILED" if result["name"] in unavailable else "unavailable"
+                print(f"{result['name']:<20} {status}: {' '.join(result['error'])}")
+                continue
+            status = "OVER" if result["name"] in over_budget else "ok"
+            line = f"{result['name']:<20} {result['ms']:8.1f} ms  (budget {result['budget_ms']:.0f} ms, {status})"
+            if result["importtime_ms"] is not None:
+                line += f"  importtime {result['importtime_ms']:.1f} ms"
+            print(line)
+            for name, self_ms in result["slowest"]:
+                print(f"    {self_ms:7.2f} ms  {name}")
+    return 1 if over_budget or unavailable else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())